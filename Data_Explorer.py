@@ -1,16 +1,39 @@
 import streamlit as st
 import os
+import copy
 import json
 import polars as pl
-import datetime
-from dateutil.relativedelta import relativedelta
 import math
-import html
-import glob
-import re
+import uuid
 from component_generation import generate_component
+from component_state import STATE_SYNC_SCRIPT, component_state_info, receive_component_state
+from dataset_registry import ROW_ID_COLUMN, Dataset, get_dataset_or_stop
+from explorer_query import (
+    CATEGORICAL_FILTERS, DATE_FILTER_COLUMN, RANGE_FILTERS, RELEVANCE_SORT_ORDER, SORT_ORDERS, covers_rows, facet_counts, get_sort_spec, page_cursor, plan_explorer_results, plan_facet_counts, plan_permuted_results,
+    partition_predicate, plan_refined_results, plan_relevance_results, prefers_refinement, query_page_after, query_permuted_page_after, refinement_filters, selection_limit
+)
+from explorer_render import RENDER_SOURCE_COLUMNS, VISIBLE_COLUMNS, display_column_exprs, render_rows_html, rows_payload, table_header_html
+from page_prefetch import PagePrefetcher
+from query_cache import ResultCache, canonical_query_key, canonicalize_filters
+from query_coordinator import SLOT_TIMEOUT_SECONDS, QueryCoordinator, QueryScheduler, QueryShed, get_query_scheduler, run_queries, run_query
+from search_index import SEARCH_COLUMNS
 
 PAGE_SIZE = 10
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+TABLE_VIEWS = ['pages', 'scroll']  # 'scroll' is a virtualized infinite-scroll table fed by row blocks
+SCROLL_BLOCK_ROWS = 100
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = 15 * 60
+PAGINATION_MODE = 'cursor'
+ROW_PAYLOAD_MODE = 'json'  # 'json' sends columnar rows for the component's row template, 'html' pre-rendered rows
+MAX_PAGE_CURSORS = 100
+PAGE_WINDOW_PAGES = 10
+PAGE_WINDOW_CACHE_SIZE = 8
+PREFETCH_PAGE_RADIUS = 1
+PREFETCH_MAX_WORKERS = 2
+PREFETCH_MAX_PENDING = 8
+PREFETCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+COMPONENT_KEY = 'kickstarter_state'
 
 st.set_page_config(
     layout="wide",
@@ -32,29 +55,27 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-parquet_source_path = None
-dataset_creation_date = None
-
-parquet_files = glob.glob("*.parquet")
-if len(parquet_files) == 1:
-    parquet_source_path = parquet_files[0]
-    match = re.search(r'_(\d{4}-\d{2}-\d{2})T', parquet_source_path)
-    if match:
-        try:
-            dataset_creation_date = datetime.datetime.strptime(match.group(1), '%Y-%m-%d').date()
-            st.session_state.dataset_creation_date = dataset_creation_date
-        except ValueError:
-            st.error(f"Could not parse date from filename: {parquet_source_path}. Using today's date for filtering.")
-            st.session_state.dataset_creation_date = datetime.date.today()
-    else:
-        st.warning(f"Could not extract date from filename: {parquet_source_path}. Using today's date for filtering.")
-        st.session_state.dataset_creation_date = datetime.date.today()
-elif len(parquet_files) == 0:
-    st.error("No Parquet file found in the root directory.")
-    st.stop()
+dataset = get_dataset_or_stop()
+
+def prepare_dataset(target: Dataset):
+    """Builds the indexes and display columns the explorer's queries and rendering read."""
+    target.prepare_indexes(
+        sort_specs=[get_sort_spec(order) for order in SORT_ORDERS],
+        bitmap_columns=list(CATEGORICAL_FILTERS),
+        range_columns=[*RANGE_FILTERS, DATE_FILTER_COLUMN],
+        search_columns=SEARCH_COLUMNS
+    )
+    if all(col in target.columns for col in RENDER_SOURCE_COLUMNS):
+        target.prepare_columns(display_column_exprs(target.lazy().collect_schema().names()))
+
+# A partitioned snapshot is indexed in the background; meanwhile its queries
+# are scans reading only the partitions the category and date filters match.
+if dataset.is_partitioned:
+    dataset.prepare_in_background(prepare_dataset)
+    if dataset.is_preparing:
+        st.info("The search and sort indexes are still being built. Until they are ready, results are read from the matching partitions and Most Relevant sorts by popularity.")
 else:
-    st.error(f"Multiple Parquet files found: {parquet_files}. Please ensure only one exists in the root directory.")
-    st.stop()
+    prepare_dataset(dataset)
 
 filter_metadata_path = "filter_metadata.json"
 
@@ -135,223 +156,258 @@ DEFAULT_FILTERS = {
 DEFAULT_COMPONENT_STATE = {
     "page": 1,
     "filters": DEFAULT_FILTERS,
-    "sort_order": 'popularity'
+    "sort_order": 'popularity',
+    "cursor": None,
+    "page_size": PAGE_SIZE,
+    "view": 'pages',
+    "row_start": 0
 }
 
 if 'filters' not in st.session_state:
-    st.session_state.filters = json.loads(json.dumps(DEFAULT_FILTERS))
+    st.session_state.filters = copy.deepcopy(DEFAULT_FILTERS)
 if 'sort_order' not in st.session_state:
     st.session_state.sort_order = DEFAULT_COMPONENT_STATE['sort_order']
 if 'current_page' not in st.session_state:
     st.session_state.current_page = DEFAULT_COMPONENT_STATE['page']
+if 'page_size' not in st.session_state:
+    st.session_state.page_size = DEFAULT_COMPONENT_STATE['page_size']
+if 'table_view' not in st.session_state:
+    st.session_state.table_view = DEFAULT_COMPONENT_STATE['view']
+if 'row_start' not in st.session_state:
+    st.session_state.row_start = DEFAULT_COMPONENT_STATE['row_start']
 if 'total_rows' not in st.session_state:
     st.session_state.total_rows = 0
-if 'kickstarter_state_value' not in st.session_state:
-    st.session_state.kickstarter_state_value = None
-if 'state_sent_to_component' not in st.session_state:
-    st.session_state.state_sent_to_component = DEFAULT_COMPONENT_STATE.copy()
-
-if 'base_lf' not in st.session_state:
-    if not os.path.exists(parquet_source_path):
-        st.error(f"Parquet data source not found at '{parquet_source_path}'. Please ensure the file/directory exists.")
-        st.stop()
+if 'page_cursor' not in st.session_state:
+    st.session_state.page_cursor = None
+if 'page_cursors' not in st.session_state:
+    st.session_state.page_cursors = {'query': None, 'pages': {}}
+if 'last_query' not in st.session_state:
+    st.session_state.last_query = None
+if 'prefetch_session_id' not in st.session_state:
+    st.session_state.prefetch_session_id = uuid.uuid4().hex
+if 'query_coordinator' not in st.session_state:
+    st.session_state.query_coordinator = QueryCoordinator()
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Sorted row-id selections shared by every explorer session in the process."""
+    return ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+
+def get_explorer_results(query_key: str, filters: dict, sort_order: str, rows_needed: int, result_cache: ResultCache | None = None, base_query: dict | None = None, priority: str = 'page', scheduler: QueryScheduler | None = None) -> dict:
+    """
+    Returns the query result for `filters` in `sort_order` with at least the
+    first `rows_needed` sorted row ids (see `query_explorer_results`). Results
+    are cached across sessions under `query_key`, so page flips, state echoes
+    and repeated queries slice a cached selection instead of re-running the
+    plan. Searches sorted by relevance are ranked with BM25; sort orders with
+    a precomputed permutation are answered completely by walking it;
+    otherwise a cached top-k selection is widened only when a deeper page is
+    requested. The dropdown facet counts (see `facet_counts`) are cached with
+    the selection and carried over when it is widened.
+
+    `base_query` is the session's previous query (`query`, canonical
+    `filters`, `sort_order`). When its complete result is still cached, the
+    new filters only narrow it and that is cheaper (see
+    `prefers_refinement`), only the added filters are evaluated over its
+    rows (see `query_refined_results`).
+
+    Queries run in a slot of the process-wide scheduler (or `scheduler`)
+    under `priority` (see `QueryScheduler`). While it is overloaded, an expired cached result
+    is served rather than recomputed and the facet counts are skipped, as
+    they are when their own query waits longer than its slot timeout; they
+    are filled in by a later request once the load drops.
+    """
+    if result_cache is None:
+        result_cache = get_result_cache()
+    if scheduler is None:
+        scheduler = get_query_scheduler()
+    overloaded = scheduler.overloaded('facets')
+    results = result_cache.get(query_key, allow_stale=overloaded)
+    if results is None or not covers_rows(results, rows_needed):
+        cached_facets = results['facets'] if results is not None else None
+        canonical_filters = canonicalize_filters(filters)
+        sort_permutation = dataset.sort_permutations.get(get_sort_spec(sort_order))
+        with scheduler.slot(priority):
+            plan = None
+            if base_query is not None and base_query['sort_order'] == sort_order:
+                base_results = result_cache.get(base_query['query'])
+                added_filters = None
+                if base_results is not None and dataset.is_materialized and prefers_refinement(base_results, sort_permutation):
+                    added_filters = refinement_filters(base_query['filters'], canonical_filters, dataset.creation_date)
+                # Relevance scores depend on the search, so a changed search re-ranks instead of refining.
+                if added_filters is not None and not (sort_order == RELEVANCE_SORT_ORDER and added_filters['search']):
+                    plan = plan_refined_results(dataset, base_results, added_filters)
+            if plan is None and sort_order == RELEVANCE_SORT_ORDER:
+                plan = plan_relevance_results(dataset, canonical_filters, limit=selection_limit(rows_needed))
+            if plan is None and sort_permutation is not None:
+                plan = plan_permuted_results(dataset, sort_permutation, canonical_filters)
+            elif plan is None:
+                plan = plan_explorer_results(
+                    dataset.lazy(partition_predicate(canonical_filters, dataset.creation_date)),
+                    canonical_filters, sort_order, dataset.creation_date, limit=selection_limit(rows_needed)
+                )
+            # The result and the facet counts are independent queries, collected together.
+            if cached_facets is None and not overloaded:
+                results, cached_facets = run_queries([plan, plan_facet_counts(dataset, canonical_filters)])
+            else:
+                if cached_facets is None:
+                    scheduler.record_shed('facets')
+                results = run_query(plan)
+        results['facets'] = cached_facets
+        result_cache.put(query_key, results, results['row_ids'].estimated_size())
+    elif results['facets'] is None and not overloaded:
+        # The facets of a result cached while overloaded; they wait for a slot only so long.
+        try:
+            with scheduler.slot('facets', timeout=SLOT_TIMEOUT_SECONDS['facets']):
+                facets = facet_counts(dataset, canonicalize_filters(filters))
+        except QueryShed as e:
+            print(f"Warning: Skipped the facet counts: {e}")
+            return results
+        results = {**results, 'facets': facets}
+        result_cache.put(query_key, results, results['row_ids'].estimated_size())
+    return results
+
+@st.cache_resource
+def get_page_prefetcher() -> PagePrefetcher:
+    """Background prefetcher for neighbouring explorer pages, shared by every session in the process."""
+    return PagePrefetcher(
+        max_workers=PREFETCH_MAX_WORKERS, max_pending=PREFETCH_MAX_PENDING,
+        max_bytes=PREFETCH_CACHE_MAX_BYTES, ttl_seconds=RESULT_CACHE_TTL_SECONDS
+    )
+
+def fetch_page(query_key: str, filters: dict, sort_order: str, page: int, cursor: dict | None, result_cache: ResultCache, page_count: int = 1, page_size: int = PAGE_SIZE, priority: str = 'page', scheduler: QueryScheduler | None = None) -> pl.DataFrame:
+    """
+    Returns the rows of the `page_count` pages of `page_size` rows starting
+    at `page`, sliced from the cached sorted selection when it covers them,
+    otherwise continued from the keyset `cursor` when one is known,
+    otherwise by widening the selection. Queries run under the scheduler
+    class `priority`. Touches no session state, so the prefetcher can run it
+    off the script thread, passing the `scheduler` it looked up. Display columns the dataset has not prepared yet
+    are computed for the page's rows only.
+    """
+    if scheduler is None:
+        scheduler = get_query_scheduler()
+    offset = (page - 1) * page_size
+    row_count = page_count * page_size
+    explorer_results = get_explorer_results(
+        query_key, filters, sort_order, row_count if cursor else offset + row_count, result_cache, priority=priority, scheduler=scheduler
+    )
+    page_row_ids = None
+    if covers_rows(explorer_results, offset + row_count):
+        page_row_ids = explorer_results['row_ids'].slice(offset, row_count)
+    elif cursor:
+        sort_permutation = dataset.sort_permutations.get(get_sort_spec(sort_order))
+        with scheduler.slot(priority):
+            if sort_permutation is not None:
+                page_row_ids = query_permuted_page_after(dataset, sort_permutation, canonicalize_filters(filters), cursor, row_count)
+            else:
+                canonical_filters = canonicalize_filters(filters)
+                page_row_ids = query_page_after(
+                    dataset.lazy(partition_predicate(canonical_filters, dataset.creation_date)), canonical_filters,
+                    sort_order, dataset.creation_date, cursor, row_count
+                )
+    if page_row_ids is None:
+        explorer_results = get_explorer_results(query_key, filters, sort_order, offset + row_count, result_cache, priority=priority, scheduler=scheduler)
+        page_row_ids = explorer_results['row_ids'].slice(offset, row_count)
+    rows = dataset.take(page_row_ids)
+    if all(col in rows.columns for col in RENDER_SOURCE_COLUMNS):
+        missing = {name: expr for name, expr in display_column_exprs(rows.columns).items() if name not in rows.columns}
+        if missing:
+            rows = rows.with_columns(**missing)
+    return rows
+
+def page_window_start(page: int, window_pages: int) -> int:
+    """The first page of the aligned window of `window_pages` pages holding `page`."""
+    return (page - 1) // window_pages * window_pages + 1
+
+def prefetch_neighbour_pages(session_id: str, query_key: str, pages_key: str, filters: dict, sort_order: str, first_page: int, window_pages: int, page_size: int, total_pages: int, known_cursors: dict):
+    """
+    Schedules the page windows around the one starting at `first_page` on
+    the prefetcher once it has been sent, cached under `pages_key` (the
+    query and its page size). Skipped while the query scheduler is
+    overloaded; prefetches run in its background class, which never holds
+    every slot.
+    """
+    scheduler = get_query_scheduler()
+    if scheduler.overloaded('prefetch'):
+        scheduler.record_shed('prefetch')
+        return
+    result_cache = get_result_cache()
+    filters = copy.deepcopy(filters)
+    neighbours = [
+        first_page + step * window_pages
+        for distance in range(1, PREFETCH_PAGE_RADIUS + 1) for step in (distance, -distance)
+        if 1 <= first_page + step * window_pages <= total_pages
+    ]
+    cursors = {neighbour: known_cursors.get(neighbour) for neighbour in neighbours}
 
-    try:
-        base_lf = pl.scan_parquet(parquet_source_path)
-        st.session_state.base_lf = base_lf
-        schema = st.session_state.base_lf.collect_schema()
-        if len(schema) == 0:
-             st.error(f"Loaded data from '{parquet_source_path}' has no columns.")
-             st.stop()
-        if len(schema.names()) != len(set(schema.names())):
-             st.error(f"Parquet source '{parquet_source_path}' contains duplicate column names. Please clean the source data.")
-             from collections import Counter
-             counts = Counter(schema.names())
-             duplicates = [name for name, count in counts.items() if count > 1]
-             st.error(f"Duplicate columns found: {duplicates}")
-             st.stop()
+    def fetch_neighbour(neighbour: int):
+        df_neighbour = fetch_page(
+            query_key, filters, sort_order, neighbour, cursors.get(neighbour), result_cache,
+            page_count=window_pages, page_size=page_size, priority='prefetch', scheduler=scheduler
+        )
+        return df_neighbour, df_neighbour.estimated_size()
 
-    except Exception as e:
-        st.error(f"Error scanning Parquet '{parquet_source_path}' or initial processing: {e}")
-        if hasattr(e, 'context'):
-            st.error(f"Context: {e.context()}")
-        st.stop()
-
-def apply_filters_and_sort(lf: pl.LazyFrame, filters: dict, sort_order: str) -> pl.LazyFrame:
-    column_names = lf.collect_schema().names()
-    dataset_creation_date = st.session_state.get('dataset_creation_date')
-    if not dataset_creation_date:
-        st.warning("Dataset creation date not found in session state. Using today's date for filtering.")
-        dataset_creation_date = datetime.date.today()
-
-    search_term = filters.get('search', '')
-    if search_term:
-        search_cols = ['Project Name', 'Creator', 'Category', 'Subcategory']
-        valid_search_cols = [col for col in search_cols if col in column_names]
-        if valid_search_cols:
-            search_expr = None
-            for col in valid_search_cols:
-                 current_expr = pl.col(col).cast(pl.Utf8).str.contains(f"(?i){search_term}")
-                 if search_expr is None:
-                     search_expr = current_expr
-                 else:
-                     search_expr = search_expr | current_expr
-            if search_expr is not None:
-                 lf = lf.filter(search_expr)
-
-    if 'Category' in column_names and filters['categories'] != ['All Categories']:
-        lf = lf.filter(pl.col('Category').is_in(filters['categories']))
-    if 'Subcategory' in column_names and filters['subcategories'] != ['All Subcategories']:
-        lf = lf.filter(pl.col('Subcategory').is_in(filters['subcategories']))
-    if 'Country' in column_names and filters['countries'] != ['All Countries']:
-        lf = lf.filter(pl.col('Country').is_in(filters['countries']))
-    if 'State' in column_names and filters['states'] != ['All States']:
-        lf = lf.filter(pl.col('State').cast(pl.Utf8).str.to_lowercase().is_in([s.lower() for s in filters['states']]))
-
-    ranges = filters.get('ranges', {})
-    if 'Raw Pledged' in column_names and 'pledged' in ranges:
-        min_p, max_p = ranges['pledged']['min'], ranges['pledged']['max']
-        lf = lf.filter((pl.col('Raw Pledged') >= min_p) & (pl.col('Raw Pledged') <= max_p))
-    if 'Raw Goal' in column_names and 'goal' in ranges:
-        min_g, max_g = ranges['goal']['min'], ranges['goal']['max']
-        lf = lf.filter((pl.col('Raw Goal') >= min_g) & (pl.col('Raw Goal') <= max_g))
-    if 'Raw Raised' in column_names and 'raised' in ranges:
-        min_r, max_r = ranges['raised']['min'], ranges['raised']['max']
-        lf = lf.filter((pl.col('Raw Raised') >= min_r) & (pl.col('Raw Raised') <= max_r))
-
-
-    date_filter = filters.get('date', 'All Time')
-    if date_filter != 'All Time' and 'Raw Date' in column_names:
-        end_date = dataset_creation_date
-        start_date = None
-
-        if date_filter == 'Last Month':
-            start_date = end_date - relativedelta(months=1)
-        elif date_filter == 'Last 6 Months':
-            start_date = end_date - relativedelta(months=6)
-        elif date_filter == 'Last Year':
-            start_date = end_date - relativedelta(years=1)
-        elif date_filter == 'Last 5 Years':
-            start_date = end_date - relativedelta(years=5)
-        elif date_filter == 'Last 10 Years':
-            start_date = end_date - relativedelta(years=10)
-
-        if start_date:
-            start_date_dt = datetime.datetime.combine(start_date, datetime.time.min)
-            end_date_dt = datetime.datetime.combine(end_date, datetime.time.max)
-
-            if 'Raw Date_dt' not in column_names:
-                 lf = lf.with_columns(pl.col("Raw Date").cast(pl.Datetime, strict=False).alias("Raw Date_dt"))
-
-            lf = lf.filter(
-                (pl.col('Raw Date_dt') >= start_date_dt) &
-                (pl.col('Raw Date_dt') <= end_date_dt)
-            )
-
-    sort_descending = True
-    sort_col = 'Popularity Score'
-
-    if sort_order == 'newest':
-        sort_col = 'Raw Date'
-        sort_descending = True
-    elif sort_order == 'oldest':
-        sort_col = 'Raw Date'
-        sort_descending = False
-    elif sort_order == 'mostfunded':
-        sort_col = 'Raw Pledged'
-        sort_descending = True
-    elif sort_order == 'mostbacked':
-        sort_col = 'Backer Count'
-        sort_descending = True
-    elif sort_order == 'enddate':
-        sort_col = 'Raw Deadline'
-        sort_descending = True
-
-    if sort_col in column_names:
-        lf = lf.sort(sort_col, descending=sort_descending, nulls_last=True)
-    else:
-        print(f"Warning: Sort column '{sort_col}' not found in LazyFrame.")
+    get_page_prefetcher().prefetch(session_id, pages_key, neighbours, fetch_neighbour)
 
-    return lf
+def resolve_page_cursor(cursor, query_key: str, page: int, known_cursors: dict) -> dict | None:
+    """
+    Returns the keyset cursor that starts `page` of the current query: the
+    one sent by the component if it was issued for this query and page and
+    names a valid row id, otherwise one recorded earlier in this session, if
+    any.
+    """
+    if (isinstance(cursor, dict) and cursor.get('query') == query_key and cursor.get('page') == page
+            and type(cursor.get('id')) is int and cursor['id'] >= 0 and 'key' in cursor):
+        return cursor
+    return known_cursors.get(page)
+
+def record_page_cursor(known_cursors: dict, query_key: str, page: int, df_page: pl.DataFrame, sort_order: str):
+    """Remembers where `page + 1` starts so the next page and later jumps back to it use keyset pagination."""
+    cursor = page_cursor(df_page, sort_order)
+    if cursor is None:
+        return
+    known_cursors[page + 1] = {**cursor, 'query': query_key, 'page': page + 1}
+    while len(known_cursors) > MAX_PAGE_CURSORS:
+        known_cursors.pop(next(iter(known_cursors)))
 
 def generate_table_html_for_page(df_page: pl.DataFrame):
-    visible_columns = ['Project Name', 'Creator', 'Pledged Amount', 'Link', 'Country', 'State']
-    header_html = ''.join(f'<th scope="col">{column}</th>' for column in visible_columns)
+    header_html = table_header_html()
 
     if df_page.is_empty():
-        colspan = len(visible_columns) if visible_columns else 1
+        colspan = len(VISIBLE_COLUMNS) if VISIBLE_COLUMNS else 1
         return header_html, f'<tr><td colspan="{colspan}">No projects match the current filters.</td></tr>'
 
-    required_data_cols = [
-        'Category', 'Subcategory', 'Raw Pledged', 'Raw Goal', 'Raw Raised',
-        'Raw Date', 'Raw Deadline', 'Backer Count', 'Popularity Score'
-    ]
-    all_needed_cols = list(set(visible_columns + required_data_cols + ['State']))
-
-    missing_cols = [col for col in all_needed_cols if col not in df_page.columns]
+    missing_cols = [col for col in RENDER_SOURCE_COLUMNS + ['Link'] if col not in dataset.columns]
     if missing_cols:
         st.error(f"FATAL: Missing required columns in fetched data page: {missing_cols}. Check base Parquet schema and processing.")
-        colspan = len(visible_columns) if visible_columns else 1
-        header_html_error = ''.join(f'<th scope="col">{col}</th>' for col in visible_columns if col in df_page.columns)
+        colspan = len(VISIBLE_COLUMNS) if VISIBLE_COLUMNS else 1
+        header_html_error = ''.join(f'<th scope="col">{col}</th>' for col in VISIBLE_COLUMNS if col in df_page.columns)
         return header_html_error, f'<tr><td colspan="{colspan}">Error: Missing critical data columns: {missing_cols}.</td></tr>'
 
-    rows_html = ''
-
     try:
-        data_dicts = df_page.to_dicts()
+        rows_html = render_rows_html(df_page)
     except Exception as e:
-        st.error(f"Error converting page DataFrame to dictionaries: {e}")
-        return header_html, f'<tr><td colspan="{len(visible_columns)}">Error rendering rows.</td></tr>'
-
-    for row in data_dicts:
-        state_value = row.get('State')
-        state_value_str = str(state_value) if state_value is not None else 'unknown'
-        state_class = state_value_str.lower().replace(' ', '-') if state_value_str != 'unknown' else 'unknown'
-        styled_state_html = f'<div class="state_cell state-{html.escape(state_class)}">{html.escape(state_value_str)}</div>' if state_value is not None else '<div class="state_cell state-unknown">unknown</div>'
-
-        raw_date = row.get('Raw Date')
-        raw_deadline = row.get('Raw Deadline')
-        raw_date_str = raw_date.strftime('%Y-%m-%d') if raw_date else 'N/A'
-        raw_deadline_str = raw_deadline.strftime('%Y-%m-%d') if raw_deadline else 'N/A'
-        data_attrs = f'''
-            data-category="{html.escape(str(row.get('Category', 'N/A')))}"
-            data-subcategory="{html.escape(str(row.get('Subcategory', 'N/A')))}"
-            data-pledged="{row.get('Raw Pledged', 0.0):.2f}"
-            data-goal="{row.get('Raw Goal', 0.0):.2f}"
-            data-raised="{row.get('Raw Raised', 0.0):.2f}"
-            data-date="{raw_date_str}"
-            data-deadline="{raw_deadline_str}"
-            data-backers="{row.get('Backer Count', 0)}"
-            data-popularity="{row.get('Popularity Score', 0.0):.6f}"
-        '''
-        visible_cells = ''
-        for col in visible_columns:
-            value = row.get(col)
-
-            if col == 'Link':
-                url = str(value) if value else '#'
-                display_url = url if len(url) < 60 else url[:57] + '...'
-                visible_cells += f'<td><a href="{html.escape(url)}" target="_blank" title="{html.escape(url)}">{html.escape(display_url)}</a></td>'
-            elif col == 'Pledged Amount':
-                 raw_pledged_val = row.get('Raw Pledged')
-                 formatted_value = 'N/A'
-                 if raw_pledged_val is not None:
-                     try:
-                         amount = int(float(raw_pledged_val))
-                         formatted_value = f"${amount:,}"
-                     except (ValueError, TypeError):
-                         pass
-                 visible_cells += f'<td>{html.escape(formatted_value)}</td>'
-            elif col == 'State':
-                 visible_cells += f'<td>{styled_state_html}</td>'
-            else:
-                display_value = str(value) if value is not None else 'N/A'
-                visible_cells += f'<td>{html.escape(display_value)}</td>'
-
-        rows_html += f'<tr class="table-row" {data_attrs}>{visible_cells}</tr>'
+        st.error(f"Error rendering page rows: {e}")
+        return header_html, f'<tr><td colspan="{len(VISIBLE_COLUMNS)}">Error rendering rows.</td></tr>'
 
     return header_html, rows_html
 
+def generate_table_rows_for_window(df_window: pl.DataFrame) -> dict | None:
+    """
+    The rows of the page window as the columnar JSON the component caches
+    and renders from its row template (see `rows_payload`), or None to send
+    the current page as server-rendered HTML: in 'html' mode, for an empty
+    window or when the rows cannot be encoded.
+    """
+    if ROW_PAYLOAD_MODE != 'json' or df_window.is_empty() or any(col not in dataset.columns for col in RENDER_SOURCE_COLUMNS + ['Link']):
+        return None
+    try:
+        return rows_payload(df_window)
+    except Exception as e:
+        print(f"Warning: Could not encode page rows as JSON, sending rendered HTML instead: {e}")
+        return None
+
 css = """
 <style>
     .title-wrapper {
@@ -382,6 +438,35 @@ css = """
         border-radius: 20px;
     }
 
+    .stats-bar {
+        display: flex;
+        justify-content: space-around;
+        align-items: center;
+        gap: 20px;
+        padding: 12px 20px;
+        margin-bottom: 1rem;
+        background: #ffffff;
+        border-radius: 20px;
+        font-family: 'Poppins';
+    }
+
+    .stat-item {
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+    }
+
+    .stat-value {
+        font-size: 20px;
+        font-weight: 600;
+        color: black;
+    }
+
+    .stat-label {
+        font-size: 12px;
+        color: #B5B7C0;
+    }
+
     .table-container {
         position: relative;
         flex: 1;
@@ -423,6 +508,18 @@ css = """
         text-align: center;
     }
 
+    th.sortable {
+        cursor: pointer;
+    }
+
+    th.sorted-asc::after {
+        content: ' \\25B2';
+    }
+
+    th.sorted-desc::after {
+        content: ' \\25BC';
+    }
+
     td {
         padding: 8px;
         text-align: left;
@@ -681,6 +778,39 @@ css = """
         color: black;
     }
 
+    .table-options {
+        display: flex;
+        align-items: center;
+        gap: 8px;
+    }
+
+    .virtual-scroll .table-container {
+        height: 600px;
+        flex: none;
+    }
+
+    .virtual-scroll tr.table-row {
+        height: 48px;
+    }
+
+    .virtual-scroll td {
+        overflow: hidden;
+        text-overflow: ellipsis;
+    }
+
+    .virtual-scroll .pagination-controls {
+        display: none;
+    }
+
+    tr.virtual-spacer td {
+        padding: 0;
+        border: none;
+    }
+
+    tr.placeholder-row td {
+        color: #B5B7C0;
+    }
+
     td a {
         text-decoration: underline;
         overflow: hidden;
@@ -918,6 +1048,20 @@ css = """
         padding-bottom: 12px;
     }
 
+    .category-option[data-count]::after,
+    .subcategory-option[data-count]::after,
+    .country-option[data-count]::after,
+    .state-option[data-count]::after {
+        content: attr(data-count);
+        float: right;
+        margin-left: 12px;
+        opacity: 0.6;
+    }
+
+    .facet-empty {
+        opacity: 0.45;
+    }
+
     body { 
         font-family: 'Poppins', 
         sans-serif; margin: 0; 
@@ -967,6 +1111,20 @@ function debounce(func, wait) {
     };
 }
 
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;' };
+// Row field each column header re-sorts the current page by, in column order.
+const PAGE_SORT_FIELDS = ['name', 'creator', 'pledged', 'link', 'country', 'state'];
+// Scroll view: rows have a fixed height so the visible range follows from the scroll offset alone.
+const VIRTUAL_ROW_HEIGHT = 48;
+const VIRTUAL_OVERSCAN_ROWS = 10;
+// Browsers cap element heights; past this the scroll offset maps to rows proportionally.
+const VIRTUAL_MAX_HEIGHT = 8000000;
+const ROW_REQUEST_DELAY_MS = 150;
+
+function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, char => HTML_ESCAPES[char]);
+}
+
 class TableManager {
     constructor(initialData) {
         this.componentRoot = document.getElementById('component-root');
@@ -977,12 +1135,21 @@ class TableManager {
 
         this.currentPage = initialData.current_page || 1;
         this.pageSize = initialData.page_size || 10;
+        this.pageSizeOptions = initialData.page_size_options || [this.pageSize];
+        this.view = initialData.table_view || 'pages';
+        this.scrollBlockRows = initialData.scroll_block_rows || 100;
         this.totalRows = initialData.total_rows || 0;
         this.currentFilters = initialData.filters || {};
         this.currentSort = initialData.sort_order || 'popularity';
         this.filterOptions = initialData.filter_options || {};
         this.categorySubcategoryMap = initialData.category_subcategory_map || {};
         this.minMaxValues = initialData.min_max_values || {};
+        this.summary = initialData.summary || {};
+        this.facetCounts = initialData.facet_counts || {};
+        this.paginationMode = initialData.pagination_mode || 'offset';
+        this.pageCursors = initialData.page_cursors || {};
+        this.stateSync = new ComponentStateSync(initialData.component_state);
+        this.stateSync.receive(initialData.component_state, TableManager.componentState(initialData));
 
         this.subcategoryParentMap = {};
         for (const category in this.categorySubcategoryMap) {
@@ -995,6 +1162,17 @@ class TableManager {
             }
         }
 
+        this.pageRows = null;
+        this.pageSort = null;
+        // Page windows (several pages of rows of one query), least recently used first.
+        this.pageWindows = new Map();
+        this.pageWindowCacheSize = initialData.page_window_cache_size || 8;
+        this.queryKey = null;
+        this.virtualRange = null;
+        this.virtualFrame = null;
+        this.rowRequestTimeout = null;
+        this.requestedRowStart = null;
+
         this.openDropdown = null;
         this.hideDropdownTimeout = null;
         this._boundHandleScroll = this._handleScroll.bind(this); 
@@ -1003,7 +1181,7 @@ class TableManager {
         this.renderHTMLStructure(initialData.header_html);
         this.bindStaticElements(); 
         this.updateUIState(initialData); 
-        this.updateTableContent(initialData.rows_html);
+        this.updateTableContent(initialData.rows_html, initialData.rows, initialData.page_window);
         this.updatePagination();
         this.adjustHeight();
     }
@@ -1059,6 +1237,7 @@ class TableManager {
                             </div>
                             <span class="filter-label">Sorted By</span>
                             <select id="sortFilter" class="filter-select">
+                                <option value="relevance">Most Relevant</option>
                                 <option value="popularity">Most Popular</option>
                                 <option value="newest">Newest First</option>
                                 <option value="oldest">Oldest First</option>
@@ -1148,8 +1327,18 @@ class TableManager {
             <div class="table-wrapper">
                 <div class="table-controls">
                     <span class="filtered-text">Filtered Projects</span>
-                    <input type="text" id="table-search" class="search-input" placeholder="Search table...">
+                    <div class="table-options">
+                        <select id="viewSelect" class="filter-select">
+                            <option value="pages">Pages</option>
+                            <option value="scroll">Scroll</option>
+                        </select>
+                        <select id="pageSizeSelect" class="filter-select">
+                            ${this.pageSizeOptions.map(size => `<option value="${size}">${size} per page</option>`).join('')}
+                        </select>
+                        <input type="text" id="table-search" class="search-input" placeholder="Search table...">
+                    </div>
                 </div>
+                <div class="stats-bar" id="stats-bar"></div>
                 <div class="table-container">
                     <table id="data-table">
                         <thead>
@@ -1179,6 +1368,9 @@ class TableManager {
         this.filterWrapperElement = this.componentRoot.querySelector('.filter-wrapper'); 
 
         this.searchInput = document.getElementById('table-search');
+        this.componentRoot.querySelectorAll('#data-table thead th').forEach((header, index) => {
+            header.addEventListener('click', () => this.sortPage(PAGE_SORT_FIELDS[index]));
+        });
         this.searchInput.addEventListener('input', debounce((e) => {
             this.currentFilters.search = e.target.value.trim();
             this.currentPage = 1;
@@ -1187,6 +1379,18 @@ class TableManager {
         document.getElementById('prev-page').addEventListener('click', () => this.previousPage());
         document.getElementById('next-page').addEventListener('click', () => this.nextPage());
         document.getElementById('resetFilters').addEventListener('click', () => this.resetFilters());
+        document.getElementById('viewSelect').addEventListener('change', (e) => {
+            this.view = e.target.value;
+            this.currentPage = 1;
+            this.requestUpdate();
+        });
+        document.getElementById('pageSizeSelect').addEventListener('change', (e) => {
+            this.pageSize = parseInt(e.target.value, 10);
+            this.currentPage = 1;
+            this.requestUpdate();
+        });
+        this.tableContainer = this.componentRoot.querySelector('.table-container');
+        this.tableContainer.addEventListener('scroll', () => this.scheduleVirtualRender(), { passive: true });
         document.getElementById('sortFilter').addEventListener('change', (e) => {
             this.currentSort = e.target.value;
             this.currentPage = 1;
@@ -1384,12 +1588,38 @@ class TableManager {
         }
     }
 
-    updateUIState(data) {
+    static componentState(data) {
+        return {
+            page: data.current_page, filters: data.filters, sort_order: data.sort_order, cursor: data.page_cursor ?? null,
+            page_size: data.page_size, view: data.table_view, row_start: data.row_start
+        };
+    }
+
+    updateUIState(data, syncControls = true) {
         this.currentPage = data.current_page;
         this.totalRows = data.total_rows;
         this.currentFilters = data.filters;
         this.currentSort = data.sort_order;
+        if (data.summary) this.summary = data.summary;
+        if (data.facet_counts) this.facetCounts = data.facet_counts;
+        if (data.page_cursors) this.pageCursors = data.page_cursors;
+        if (data.page_size) this.pageSize = data.page_size;
+        if (data.table_view) this.view = data.table_view;
+        const tableWrapper = this.componentRoot?.querySelector('.table-wrapper');
+        if (tableWrapper) tableWrapper.classList.toggle('virtual-scroll', this.view === 'scroll');
+        if (syncControls) this.syncFilterControls();
+
+        this._hideDropdownImmediately();
+        this.updateFacetCounts();
+        this.updatePagination(); 
+        this.updateStats();
+    }
 
+    syncFilterControls() {
+        const viewSelect = document.getElementById('viewSelect');
+        if (viewSelect) viewSelect.value = this.view;
+        const pageSizeSelect = document.getElementById('pageSizeSelect');
+        if (pageSizeSelect) pageSizeSelect.value = String(this.pageSize);
         if (this.searchInput) this.searchInput.value = this.currentFilters.search || '';
         const sortSelect = document.getElementById('sortFilter');
         if (sortSelect) sortSelect.value = this.currentSort;
@@ -1455,9 +1685,46 @@ class TableManager {
                   this.rangeSliderElements.fillSlider(this.rangeSliderElements.raisedFromSlider, this.rangeSliderElements.raisedToSlider, '#C6C6C6', '#5932EA', this.rangeSliderElements.raisedToSlider);
              }
         }
+    }
 
-        this._hideDropdownImmediately();
-        this.updatePagination(); 
+    updateFacetCounts() {
+        const facets = [
+            ['category', 'categories', 'All Categories'],
+            ['subcategory', 'subcategories', 'All Subcategories'],
+            ['country', 'countries', 'All Countries'],
+            ['state', 'states', 'All States']
+        ];
+        facets.forEach(([type, key, allValue]) => {
+            const counts = this.facetCounts?.[key];
+            document.querySelectorAll(`.${type}-option`).forEach(option => {
+                const value = option.dataset.value;
+                if (!counts || value === allValue) {
+                    delete option.dataset.count;
+                    option.classList.remove('facet-empty');
+                    return;
+                }
+                const count = counts[type === 'state' ? value.toLowerCase() : value] || 0;
+                option.dataset.count = count.toLocaleString('en-US');
+                option.classList.toggle('facet-empty', count === 0);
+            });
+        });
+    }
+
+    updateStats() {
+        if (!this.componentRoot) return;
+        const statsBar = this.componentRoot.querySelector('#stats-bar');
+        if (!statsBar) return;
+        const summary = this.summary || {};
+        const formatInteger = (value) => (value === null || value === undefined) ? 'N/A' : Math.round(value).toLocaleString('en-US');
+        const stats = [
+            { label: 'Matching Projects', value: formatInteger(this.totalRows) },
+            { label: 'Total Pledged', value: (summary.total_pledged === null || summary.total_pledged === undefined) ? 'N/A' : `$${formatInteger(summary.total_pledged)}` },
+            { label: 'Success Rate', value: (summary.success_rate === null || summary.success_rate === undefined) ? 'N/A' : `${summary.success_rate.toFixed(1)}%` },
+            { label: 'Total Backers', value: formatInteger(summary.total_backers) }
+        ];
+        statsBar.innerHTML = stats.map(stat =>
+            `<div class="stat-item"><span class="stat-value">${stat.value}</span><span class="stat-label">${stat.label}</span></div>`
+        ).join('');
     }
 
     setupMultiSelect(type, options, selectedSet, allValue, buttonElement) {
@@ -1597,6 +1864,7 @@ class TableManager {
             'All Subcategories',
             subcategoryBtn
         );
+        this.updateFacetCounts();
         return selectionChanged;
     }
 
@@ -1709,15 +1977,14 @@ class TableManager {
         const defaultSort = 'popularity';
         const defaultPage = 1;
 
-        this.showLoading(true);
-
-        const resetStatePayload = {
+        const resetState = {
             page: defaultPage,
             filters: JSON.parse(JSON.stringify(defaultFilters)),
             sort_order: defaultSort,
-            _reset_trigger_timestamp: Date.now()
+            cursor: null
         };
-        Streamlit.setComponentValue(resetStatePayload);
+        if (!this.stateSync.send(resetState)) return;
+        this.showLoading(true);
 
         try {
             this.currentPage = defaultPage;
@@ -1764,8 +2031,7 @@ class TableManager {
     }
 
 
-    requestUpdate() {
-        this.showLoading(true);
+    requestUpdate(rowStart = 0) {
         this._hideDropdownImmediately();
 
         const state = {
@@ -1783,7 +2049,11 @@ class TableManager {
                     raised: { min: parseFloat(document.getElementById('raisedFromInput')?.value), max: parseFloat(document.getElementById('raisedToInput')?.value) }
                 }
             },
-            sort_order: this.currentSort
+            sort_order: this.currentSort,
+            cursor: this.paginationMode === 'cursor' && this.view === 'pages' ? (this.pageCursors[this.currentPage] || null) : null,
+            page_size: this.pageSize,
+            view: this.view,
+            row_start: rowStart
         };
         Object.keys(state.filters.ranges).forEach(key => {
              const rangeMinMax = this.minMaxValues[key] || { min: 0, max: 99999999999 };
@@ -1798,7 +2068,8 @@ class TableManager {
              }
         });
 
-        Streamlit.setComponentValue(state);
+        // Row range requests keep the table scrollable; placeholder rows mark what is being fetched.
+        if (this.stateSync.send(state) && rowStart === 0) this.showLoading(true);
     }
 
     showLoading(isLoading) {
@@ -1809,15 +2080,213 @@ class TableManager {
          }
      }
 
-    updateTableContent(rowsHtml) {
+    updateTableContent(rowsHtml, rows, pageWindow) {
         if (!this.componentRoot) return;
-        const tbody = this.componentRoot.querySelector('#table-body');
-        if (tbody) {
-            tbody.innerHTML = rowsHtml || '<tr><td colspan="6">Loading data or no results...</td></tr>';
+        const previousQueryKey = this.queryKey;
+        this.queryKey = pageWindow ? pageWindow.query : null;
+        if (rows && pageWindow) {
+            this.storePageWindow({ ...pageWindow, rows: this.decodeRows(rows) });
+        }
+        if (this.view === 'scroll' && this.queryKey) {
+            if (this.queryKey !== previousQueryKey && this.tableContainer) this.tableContainer.scrollTop = 0;
+            this.requestedRowStart = null;
+            this.pageRows = null;
+            this.pageSort = null;
+            this.updateSortIndicators();
+            this.renderVirtualRows(true);
+            this.showLoading(false);
+            return;
+        }
+        this.pageRows = this.queryKey ? this.windowPageRows(this.currentPage) : null;
+        this.pageSort = null;
+        this.updateSortIndicators();
+        if (this.pageRows) {
+            this.renderPageRows(this.pageRows);
+        } else {
+            const tbody = this.componentRoot.querySelector('#table-body');
+            if (tbody) {
+                tbody.innerHTML = rowsHtml || '<tr><td colspan="6">Loading data or no results...</td></tr>';
+            }
         }
          this.showLoading(false); 
     }
 
+    storePageWindow(pageWindow) {
+        const key = `${pageWindow.query}:${pageWindow.first_page}`;
+        this.pageWindows.delete(key);
+        this.pageWindows.set(key, pageWindow);
+        while (this.pageWindows.size > this.pageWindowCacheSize) {
+            this.pageWindows.delete(this.pageWindows.keys().next().value);
+        }
+    }
+
+    windowPageRows(page) {
+        for (const [key, pageWindow] of this.pageWindows) {
+            if (pageWindow.query === this.queryKey && page >= pageWindow.first_page && page < pageWindow.first_page + pageWindow.page_count) {
+                this.pageWindows.delete(key);
+                this.pageWindows.set(key, pageWindow);
+                const start = (page - pageWindow.first_page) * pageWindow.page_size;
+                return pageWindow.rows.slice(start, start + pageWindow.page_size);
+            }
+        }
+        return null;
+    }
+
+    rowAt(index) {
+        for (const pageWindow of this.pageWindows.values()) {
+            const start = (pageWindow.first_page - 1) * pageWindow.page_size;
+            if (pageWindow.query === this.queryKey && index >= start && index < start + pageWindow.rows.length) {
+                return pageWindow.rows[index - start];
+            }
+        }
+        return null;
+    }
+
+    scheduleVirtualRender() {
+        if (this.view !== 'scroll' || this.virtualFrame) return;
+        this.virtualFrame = requestAnimationFrame(() => {
+            this.virtualFrame = null;
+            this.renderVirtualRows();
+        });
+    }
+
+    // Renders only the rows in (and just around) the viewport between two spacer rows sized to the rest of the table.
+    renderVirtualRows(force = false) {
+        const tbody = this.componentRoot.querySelector('#table-body');
+        const container = this.tableContainer;
+        if (!tbody || !container) return;
+        if (this.totalRows === 0) {
+            this.virtualRange = null;
+            tbody.innerHTML = `<tr><td colspan="${PAGE_SORT_FIELDS.length}">No projects match the current filters.</td></tr>`;
+            return;
+        }
+        const viewportRows = Math.ceil(container.clientHeight / VIRTUAL_ROW_HEIGHT);
+        const fullHeight = this.totalRows * VIRTUAL_ROW_HEIGHT;
+        const height = Math.min(fullHeight, VIRTUAL_MAX_HEIGHT);
+        const scrollTop = container.scrollTop;
+        const firstVisible = fullHeight === height
+            ? Math.floor(scrollTop / VIRTUAL_ROW_HEIGHT)
+            : Math.round(Math.min(1, scrollTop / Math.max(1, height - container.clientHeight)) * Math.max(0, this.totalRows - viewportRows));
+        const start = Math.max(0, Math.min(firstVisible, this.totalRows - 1) - VIRTUAL_OVERSCAN_ROWS);
+        const end = Math.min(this.totalRows, firstVisible + viewportRows + VIRTUAL_OVERSCAN_ROWS);
+        if (!force && this.virtualRange && this.virtualRange.start === start && this.virtualRange.end === end) return;
+        this.virtualRange = { start, end };
+
+        const topHeight = fullHeight === height ? start * VIRTUAL_ROW_HEIGHT : Math.max(0, scrollTop - (firstVisible - start) * VIRTUAL_ROW_HEIGHT);
+        const bottomHeight = Math.max(0, height - topHeight - (end - start) * VIRTUAL_ROW_HEIGHT);
+        const spacer = (rowHeight) => `<tr class="virtual-spacer" style="height: ${rowHeight}px"><td colspan="${PAGE_SORT_FIELDS.length}"></td></tr>`;
+        let missingRow = null;
+        const rowsHtml = [];
+        for (let index = start; index < end; index++) {
+            const row = this.rowAt(index);
+            if (row) {
+                rowsHtml.push(this.renderRow(row));
+            } else {
+                if (missingRow === null) missingRow = index;
+                rowsHtml.push(`<tr class="table-row placeholder-row"><td colspan="${PAGE_SORT_FIELDS.length}">Loading...</td></tr>`);
+            }
+        }
+        tbody.innerHTML = spacer(topHeight) + rowsHtml.join('') + spacer(bottomHeight);
+        if (missingRow !== null) this.scheduleRowRequest(missingRow);
+    }
+
+    // Asks the server for the block of rows holding `index` once scrolling has settled.
+    scheduleRowRequest(index) {
+        if (this.rowRequestTimeout) clearTimeout(this.rowRequestTimeout);
+        this.rowRequestTimeout = setTimeout(() => {
+            this.rowRequestTimeout = null;
+            const rowStart = Math.floor(index / this.scrollBlockRows) * this.scrollBlockRows;
+            if (this.view !== 'scroll' || this.rowAt(index) || rowStart === this.requestedRowStart) return;
+            this.requestedRowStart = rowStart;
+            this.requestUpdate(rowStart);
+        }, ROW_REQUEST_DELAY_MS);
+    }
+
+    decodeRows(payload) {
+        const columns = payload.columns || {};
+        const dictionaries = payload.dictionaries || {};
+        const rows = [];
+        for (let i = 0; i < (payload.row_count || 0); i++) {
+            const row = {};
+            for (const field in columns) {
+                const value = columns[field][i];
+                row[field] = (field in dictionaries && value !== null) ? dictionaries[field][value] : value;
+            }
+            rows.push(row);
+        }
+        return rows;
+    }
+
+    renderRow(row) {
+        const isMissing = (value) => value === null || value === undefined;
+        const text = (value) => escapeHtml(isMissing(value) ? 'N/A' : value);
+        const fixed = (value, digits) => isMissing(value) ? 'N/A' : value.toFixed(digits);
+        const url = row.link ? String(row.link) : '#';
+        const displayUrl = url.length < 60 ? url : url.slice(0, 57) + '...';
+        const pledged = isMissing(row.pledged) ? 'N/A' : `$${Math.trunc(row.pledged).toLocaleString('en-US')}`;
+        const stateCell = isMissing(row.state)
+            ? '<div class="state_cell state-unknown">unknown</div>'
+            : `<div class="state_cell state-${escapeHtml(String(row.state).toLowerCase().replace(/ /g, '-'))}">${escapeHtml(row.state)}</div>`;
+        const attributes = {
+            category: text(row.category),
+            subcategory: text(row.subcategory),
+            pledged: fixed(row.pledged, 2),
+            goal: fixed(row.goal, 2),
+            raised: fixed(row.raised, 2),
+            date: text(row.date),
+            deadline: text(row.deadline),
+            backers: text(row.backers),
+            popularity: fixed(row.popularity, 6)
+        };
+        const dataAttrs = Object.entries(attributes).map(([name, value]) => ` data-${name}="${value}"`).join('');
+        return `<tr class="table-row"${dataAttrs}>`
+            + `<td>${text(row.name)}</td>`
+            + `<td>${text(row.creator)}</td>`
+            + `<td>${escapeHtml(pledged)}</td>`
+            + `<td><a href="${escapeHtml(url)}" target="_blank" title="${escapeHtml(url)}">${escapeHtml(displayUrl)}</a></td>`
+            + `<td>${text(row.country)}</td>`
+            + `<td>${stateCell}</td>`
+            + '</tr>';
+    }
+
+    renderPageRows(rows) {
+        const tbody = this.componentRoot.querySelector('#table-body');
+        if (!tbody) return;
+        tbody.innerHTML = rows.length > 0
+            ? rows.map(row => this.renderRow(row)).join('')
+            : `<tr><td colspan="${PAGE_SORT_FIELDS.length}">No projects match the current filters.</td></tr>`;
+    }
+
+    sortPage(field) {
+        if (!this.pageRows || !field) return;
+        const descending = this.pageSort?.field === field && !this.pageSort.descending;
+        this.pageSort = { field, descending };
+        const direction = descending ? -1 : 1;
+        const isMissing = (value) => value === null || value === undefined;
+        const sorted = this.pageRows.map((row, index) => ({ row, index }));
+        sorted.sort((a, b) => {
+            const x = a.row[field];
+            const y = b.row[field];
+            if (isMissing(x) || isMissing(y)) {
+                return (isMissing(x) - isMissing(y)) || (a.index - b.index);
+            }
+            const order = typeof x === 'number' ? x - y : String(x).localeCompare(String(y));
+            return (order * direction) || (a.index - b.index);
+        });
+        this.renderPageRows(sorted.map(item => item.row));
+        this.updateSortIndicators();
+    }
+
+    updateSortIndicators() {
+        if (!this.componentRoot) return;
+        this.componentRoot.querySelectorAll('#data-table thead th').forEach((header, index) => {
+            const isSorted = this.pageSort?.field === PAGE_SORT_FIELDS[index];
+            header.classList.toggle('sortable', Boolean(this.pageRows));
+            header.classList.toggle('sorted-asc', isSorted && !this.pageSort.descending);
+            header.classList.toggle('sorted-desc', isSorted && this.pageSort.descending);
+        });
+    }
+
     updatePagination() {
         if (!this.componentRoot) return;
         const currentTotalRows = parseInt(this.totalRows || 0, 10);
@@ -1867,9 +2336,24 @@ class TableManager {
         return pages;
     }
 
-    previousPage() { if (this.currentPage > 1) { this.currentPage--; this.requestUpdate(); } }
-    nextPage() { const totalPages = Math.ceil(this.totalRows / this.pageSize); if (this.currentPage < totalPages) { this.currentPage++; this.requestUpdate(); } }
-    goToPage(page) { const totalPages = Math.ceil(this.totalRows / this.pageSize); if (page >= 1 && page <= totalPages && page !== this.currentPage) { this.currentPage = page; this.requestUpdate(); } }
+    previousPage() { this.goToPage(this.currentPage - 1); }
+    nextPage() { this.goToPage(this.currentPage + 1); }
+    goToPage(page) {
+        const totalPages = Math.ceil(this.totalRows / this.pageSize);
+        if (page < 1 || page > totalPages || page === this.currentPage) return;
+        this.currentPage = page;
+        const pageRows = this.queryKey ? this.windowPageRows(page) : null;
+        if (!pageRows) {
+            this.requestUpdate();
+            return;
+        }
+        this.pageRows = pageRows;
+        this.pageSort = null;
+        this.updateSortIndicators();
+        this.renderPageRows(pageRows);
+        this.updatePagination();
+        this.adjustHeight();
+    }
 
     adjustHeight() {
          requestAnimationFrame(() => {
@@ -1894,8 +2378,10 @@ function onRender(event) {
         if (!window.tableManagerInstance) {
             window.tableManagerInstance = new TableManager(data);
         } else {
-            window.tableManagerInstance.updateUIState(data);
-            window.tableManagerInstance.updateTableContent(data.rows_html);
+            if (window.tableManagerInstance.stateSync.isStale(data.component_state)) return;
+            const stateChanged = window.tableManagerInstance.stateSync.receive(data.component_state, TableManager.componentState(data));
+            window.tableManagerInstance.updateUIState(data, stateChanged);
+            window.tableManagerInstance.updateTableContent(data.rows_html, data.rows, data.page_window);
             window.tableManagerInstance.adjustHeight();
         }
 
@@ -1923,34 +2409,35 @@ Streamlit.events.addEventListener(Streamlit.RENDER_EVENT, onRender);
 Streamlit.setComponentReady();
 """
 
-table_component = generate_component('kickstarter_table', template=css, script=script)
+table_component = generate_component('kickstarter_table', template=css, script=STATE_SYNC_SCRIPT + script)
 
-component_state_from_last_run = st.session_state.get("kickstarter_state_value", None)
-state_sent_last_run = st.session_state.get('state_sent_to_component', DEFAULT_COMPONENT_STATE)
+def explorer_component_state():
+    return {
+        "page": st.session_state.current_page,
+        "filters": st.session_state.filters,
+        "sort_order": st.session_state.sort_order,
+        "cursor": st.session_state.page_cursor,
+        "page_size": st.session_state.page_size,
+        "view": st.session_state.table_view,
+        "row_start": st.session_state.row_start,
+    }
 
-component_sent_new_state = False
-if component_state_from_last_run is not None:
-    try:
-        last_run_str = json.dumps(component_state_from_last_run, sort_keys=True)
-        sent_last_run_str = json.dumps(state_sent_last_run, sort_keys=True)
-        if last_run_str != sent_last_run_str:
-            component_sent_new_state = True
-    except TypeError as e:
-         print(f"Error comparing states using JSON: {e}. Assuming state is new for safety.")
-         component_sent_new_state = True
-
-if component_sent_new_state:
-    if (isinstance(component_state_from_last_run, dict) and
-            "page" in component_state_from_last_run and
-            "sort_order" in component_state_from_last_run and
-            "filters" in component_state_from_last_run and
-            isinstance(component_state_from_last_run.get("filters"), dict)):
-
-        st.session_state.current_page = component_state_from_last_run["page"]
-        st.session_state.sort_order = component_state_from_last_run["sort_order"]
-
-        new_filters = component_state_from_last_run["filters"]
-        validated_filters = json.loads(json.dumps(DEFAULT_FILTERS))
+received_state = receive_component_state(st.session_state, COMPONENT_KEY, explorer_component_state())
+if received_state is not None:
+    if (isinstance(received_state.get("filters"), dict) and
+            isinstance(received_state.get("page"), int) and
+            isinstance(received_state.get("sort_order"), str)):
+
+        st.session_state.current_page = received_state["page"]
+        st.session_state.sort_order = received_state["sort_order"]
+        st.session_state.page_cursor = received_state.get("cursor")
+        st.session_state.page_size = received_state.get("page_size") if received_state.get("page_size") in PAGE_SIZE_OPTIONS else PAGE_SIZE
+        st.session_state.table_view = received_state.get("view") if received_state.get("view") in TABLE_VIEWS else TABLE_VIEWS[0]
+        row_start = received_state.get("row_start")
+        st.session_state.row_start = max(0, row_start) if isinstance(row_start, int) else 0
+
+        new_filters = received_state["filters"]
+        validated_filters = copy.deepcopy(DEFAULT_FILTERS)
 
         for key, default_value in DEFAULT_FILTERS.items():
              if key in new_filters:
@@ -1991,40 +2478,86 @@ if component_sent_new_state:
 
         st.session_state.filters = validated_filters
     else:
-        print(f"Warning: Invalid structure in new component state: {component_state_from_last_run}. NOT updating session state.")
-
-if 'base_lf' not in st.session_state:
-     st.error("Base LazyFrame not found. Please reload.")
-     st.stop()
-
-filtered_lf = apply_filters_and_sort(
-    st.session_state.base_lf,
-    st.session_state.filters,
-    st.session_state.sort_order
-)
+        print(f"Warning: Invalid structure in new component state: {received_state}. NOT updating session state.")
+
+query_key = canonical_query_key(st.session_state.filters, st.session_state.sort_order, dataset.version)
+scroll_view = st.session_state.table_view == 'scroll' and ROW_PAYLOAD_MODE == 'json'
+page_size = SCROLL_BLOCK_ROWS if scroll_view else st.session_state.page_size
+# Pages (and their cursors and prefetched windows) depend on the view and page size as well as the query.
+pages_key = f"{query_key}:{'scroll' if scroll_view else 'pages'}:{page_size}"
+page_prefetcher = get_page_prefetcher()
+if st.session_state.page_cursors['query'] != pages_key:
+    st.session_state.page_cursors = {'query': pages_key, 'pages': {}}
+    page_prefetcher.cancel(st.session_state.prefetch_session_id)
+known_cursors = st.session_state.page_cursors['pages']
+
+if scroll_view:
+    requested_page = st.session_state.row_start // SCROLL_BLOCK_ROWS + 1
+else:
+    requested_page = max(1, st.session_state.current_page)
+window_pages = PAGE_WINDOW_PAGES if ROW_PAYLOAD_MODE == 'json' and not scroll_view else 1
+first_page = page_window_start(requested_page, window_pages)
+cursor = None
+if PAGINATION_MODE == 'cursor' and not scroll_view and first_page > 1:
+    cursor = resolve_page_cursor(st.session_state.page_cursor, pages_key, first_page, known_cursors)
+
+# Sending an empty delta is a Streamlit yield point: it raises the rerun exception once newer
+# component state arrives (e.g. mid slider drag), which cancels the running query.
+query_yield_point = st.empty()
+query_coordinator = st.session_state.query_coordinator
 
 try:
-    total_rows_result_df = filtered_lf.select(pl.len()).collect()
-    st.session_state.total_rows = total_rows_result_df.item() if total_rows_result_df is not None and not total_rows_result_df.is_empty() else 0
+    with query_coordinator.running(query_yield_point.empty):
+        explorer_results = get_explorer_results(
+            query_key,
+            st.session_state.filters,
+            st.session_state.sort_order,
+            window_pages * page_size if cursor else (first_page + window_pages - 1) * page_size,
+            base_query=st.session_state.last_query
+        )
+    st.session_state.last_query = {
+        'query': query_key, 'filters': canonicalize_filters(st.session_state.filters), 'sort_order': st.session_state.sort_order
+    }
 except Exception as e:
-    st.error(f"Error calculating total rows: {e}")
-    st.session_state.total_rows = 0
-
-total_pages = math.ceil(st.session_state.total_rows / PAGE_SIZE) if PAGE_SIZE > 0 and st.session_state.total_rows > 0 else 1
-st.session_state.current_page = max(1, min(st.session_state.current_page, total_pages))
-offset = (st.session_state.current_page - 1) * PAGE_SIZE
+    st.error(f"Error running query: {e}")
+    explorer_results = {'row_ids': pl.Series(ROW_ID_COLUMN, [], dtype=pl.UInt32), 'total_rows': 0, 'is_complete': True, 'summary': {}, 'facets': {}}
+st.session_state.total_rows = explorer_results['total_rows']
+
+total_pages = math.ceil(st.session_state.total_rows / page_size) if st.session_state.total_rows > 0 else 1
+current_page = max(1, min(requested_page, total_pages))
+if scroll_view:
+    st.session_state.row_start = (current_page - 1) * SCROLL_BLOCK_ROWS
+else:
+    st.session_state.current_page = current_page
+offset = (current_page - 1) * page_size
+if current_page != requested_page:
+    first_page = page_window_start(current_page, window_pages)
+    cursor = None
+last_page = min(first_page + window_pages - 1, total_pages)
 
-df_page = pl.DataFrame()
+df_window = pl.DataFrame()
 
 if st.session_state.total_rows > 0 and offset < st.session_state.total_rows:
     try:
-        df_page = filtered_lf.slice(offset, PAGE_SIZE).collect()
+        df_window = page_prefetcher.get(pages_key, first_page)
+        if df_window is None:
+            with query_coordinator.running(query_yield_point.empty):
+                df_window = fetch_page(
+                    query_key, st.session_state.filters, st.session_state.sort_order, first_page, cursor, get_result_cache(),
+                    page_count=last_page - first_page + 1, page_size=page_size
+                )
+        if PAGINATION_MODE == 'cursor' and not scroll_view and last_page < total_pages:
+            record_page_cursor(known_cursors, pages_key, last_page, df_window, st.session_state.sort_order)
     except Exception as e:
-        st.error(f"Error fetching data for page {st.session_state.current_page}: {e}")
-        df_page = pl.DataFrame()
-
+        st.error(f"Error fetching data for page {current_page}: {e}")
+        df_window = pl.DataFrame()
+df_page = df_window.slice((current_page - first_page) * page_size, page_size)
 
-header_html, rows_html = generate_table_html_for_page(df_page)
+table_rows = generate_table_rows_for_window(df_window)
+if table_rows is None:
+    header_html, rows_html = generate_table_html_for_page(df_page)
+else:
+    header_html, rows_html = table_header_html(), None
 
 component_min_max = {}
 for key, val in min_max_values.items():
@@ -2041,59 +2574,39 @@ for key, val in min_max_values.items():
 
 component_data_payload = {
     "current_page": st.session_state.current_page,
-    "page_size": PAGE_SIZE,
+    "page_size": st.session_state.page_size,
+    "page_size_options": PAGE_SIZE_OPTIONS,
+    "table_view": 'scroll' if scroll_view else 'pages',
+    "row_start": st.session_state.row_start,
+    "scroll_block_rows": SCROLL_BLOCK_ROWS,
     "total_rows": st.session_state.total_rows,
+    "summary": explorer_results['summary'],
+    "facet_counts": explorer_results['facets'] or {},
     "filters": st.session_state.filters,
     "sort_order": st.session_state.sort_order,
     "header_html": header_html,
     "rows_html": rows_html,
+    "rows": table_rows,
+    "page_window": {'query': pages_key, 'first_page': first_page, 'page_count': last_page - first_page + 1, 'page_size': page_size} if table_rows is not None else None,
     "filter_options": filter_options,
     "category_subcategory_map": category_subcategory_map,
     "min_max_values": component_min_max, 
-    "dataset_creation_date": str(st.session_state.dataset_creation_date) if st.session_state.get('dataset_creation_date') else None
-}
-
-state_being_sent_this_run = {
-    "page": st.session_state.current_page,
-    "filters": st.session_state.filters,
-    "sort_order": st.session_state.sort_order,
+    "dataset_creation_date": str(dataset.creation_date),
+    "pagination_mode": PAGINATION_MODE,
+    "page_window_cache_size": PAGE_WINDOW_CACHE_SIZE,
+    "page_cursors": {str(page): page_cursor_value for page, page_cursor_value in known_cursors.items()},
+    "page_cursor": st.session_state.page_cursor,
+    "component_state": component_state_info(st.session_state, COMPONENT_KEY, explorer_component_state())
 }
-st.session_state.state_sent_to_component = json.loads(json.dumps(state_being_sent_this_run))
 
-component_return_value = table_component(
+table_component(
     component_data=component_data_payload,
-    key="kickstarter_state",
+    key=COMPONENT_KEY,
     default=None
 )
 
-needs_rerun = False
-if component_return_value is not None:
-    if (isinstance(component_return_value, dict) and
-            "page" in component_return_value and
-            "sort_order" in component_return_value and
-            "filters" in component_return_value and
-            isinstance(component_return_value.get("filters"), dict)):
-
-        try:
-            received_state_str = json.dumps(component_return_value, sort_keys=True)
-            sent_state_str = json.dumps(state_being_sent_this_run, sort_keys=True)
-
-            if received_state_str != sent_state_str:
-                st.session_state.current_page = component_return_value["page"]
-                st.session_state.sort_order = component_return_value["sort_order"]
-
-                new_filters = component_return_value["filters"]
-                validated_filters = DEFAULT_FILTERS.copy()
-                if isinstance(new_filters, dict):
-                     validated_filters.update(new_filters)
-                st.session_state.filters = validated_filters
-                needs_rerun = True
-        except Exception as e:
-            print(f"Error during state comparison or update for rerun: {e}")
-    else:
-        print("Warning: Invalid structure received from component at end of run. Skipping comparison/update.")
-
-st.session_state.kickstarter_state_value = component_return_value
-
-if needs_rerun:
-    st.rerun()
\ No newline at end of file
+if not df_window.is_empty() and PREFETCH_PAGE_RADIUS > 0:
+    prefetch_neighbour_pages(
+        st.session_state.prefetch_session_id, query_key, pages_key, st.session_state.filters, st.session_state.sort_order,
+        first_page, window_pages, page_size, total_pages, known_cursors
+    )
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Compares the explorer's page retrieval strategies across page depths.
+
+For every sort order and page number it times `query_explorer_results` with
+the bounded top-k selection (`selection_limit`) against a full sort of every
+match, and reports the cost of walking the precomputed sort permutation
+(`query_permuted_results`), which is the same for every page.
+
+Usage:
+    python benchmark_page_retrieval.py [data_dir] [--repeat N] [--page-size N]
+"""
+import argparse
+import statistics
+import time
+
+from dataset_registry import load_dataset
+from dataset_storage import format_storage_report
+from explorer_query import SORT_ORDERS, get_sort_spec, query_explorer_results, query_permuted_results, selection_limit
+
+DEFAULT_FILTERS = {
+    'search': '',
+    'categories': ['All Categories'],
+    'subcategories': ['All Subcategories'],
+    'countries': ['All Countries'],
+    'states': ['All States'],
+    'date': 'All Time',
+    'ranges': {},
+}
+PAGES = [1, 2, 5, 10, 50, 100, 500, 1000, 5000]
+
+
+def time_query(dataset, sort_order, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_explorer_results(dataset.lazy(), DEFAULT_FILTERS, sort_order, dataset.creation_date, limit=limit)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def time_permuted_query(dataset, sort_order, repeat):
+    sort_permutation = dataset.sort_permutations[get_sort_spec(sort_order)]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_permuted_results(dataset, sort_permutation, DEFAULT_FILTERS)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data_dir', nargs='?', default='.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=10)
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.data_dir)
+    frame = dataset.materialize()
+    dataset.prepare_indexes(sort_specs=[get_sort_spec(sort_order) for sort_order in SORT_ORDERS])
+    if dataset.storage_report:
+        print(format_storage_report(dataset.source_path, dataset.storage_report) + "\n")
+    print(f"Dataset: {dataset.source_path} ({frame.height:,} rows), median of {args.repeat} runs\n")
+    print(f"{'sort':<12}{'page':>6}{'top-k rows':>12}{'top-k ms':>11}{'full sort ms':>14}{'speedup':>9}{'permutation ms':>16}")
+
+    for sort_order in SORT_ORDERS:
+        full_ms = time_query(dataset, sort_order, None, args.repeat)
+        permuted_ms = time_permuted_query(dataset, sort_order, args.repeat)
+        for page in PAGES:
+            limit = selection_limit(page * args.page_size)
+            if limit is None:
+                print(f"{sort_order:<12}{page:>6}{'full sort':>12}{full_ms:>11.1f}{full_ms:>14.1f}{1.0:>8.2f}x{permuted_ms:>16.1f}")
+                continue
+            top_k_ms = time_query(dataset, sort_order, limit, args.repeat)
+            print(f"{sort_order:<12}{page:>6}{limit:>12,}{top_k_ms:>11.1f}{full_ms:>14.1f}{full_ms / top_k_ms:>8.2f}x{permuted_ms:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
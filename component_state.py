@@ -0,0 +1,116 @@
+import hashlib
+import json
+
+# Suffix of the session-state key holding the last sequence number applied for a component.
+APPLIED_SEQ_SUFFIX = '_applied_seq'
+
+
+def state_hash(state: dict) -> str:
+    """Content hash of a component state; states with equal content hash equally regardless of key order."""
+    payload = json.dumps(state, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def merge_state_delta(state: dict, delta: dict) -> dict:
+    """
+    Returns `state` with the fields of `delta` applied. Nested dicts are
+    merged key by key and any other value (lists included) replaces the old
+    one. Only the dicts along the delta's paths are copied; `state` itself
+    is left unchanged.
+    """
+    merged = dict(state)
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_state_delta(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def receive_component_state(session_state, component_key: str, state: dict) -> dict | None:
+    """
+    Applies the component's latest state message to `state`, exactly once.
+
+    The component sends `{'seq': n, 'delta': {...}}`, where `seq` increases
+    with every message and `delta` holds the fields changed since the last
+    state it was rendered with. Streamlit keeps the message under
+    `component_key` from the rerun it triggers onwards, so it is read at the
+    top of the script, before anything is queried. Returns the merged state,
+    or None when there is no message newer than the last applied one or the
+    delta leaves the state's content unchanged.
+    """
+    message = session_state.get(component_key)
+    seq_key = component_key + APPLIED_SEQ_SUFFIX
+    if not isinstance(message, dict) or not isinstance(message.get('seq'), int) or message['seq'] <= session_state.get(seq_key, 0):
+        return None
+    session_state[seq_key] = message['seq']
+    delta = message.get('delta')
+    if not isinstance(delta, dict):
+        print(f"Warning: Invalid state message from component '{component_key}': {message}. Ignoring it.")
+        return None
+    merged = merge_state_delta(state, delta)
+    if state_hash(merged) == state_hash(state):
+        return None
+    return merged
+
+
+def component_state_info(session_state, component_key: str, state: dict) -> dict:
+    """The version stamp sent with every render: the last applied sequence number and the state's content hash."""
+    return {'seq': session_state.get(component_key + APPLIED_SEQ_SUFFIX, 0), 'hash': state_hash(state)}
+
+
+# Client side of the protocol, prepended to a component's script.
+STATE_SYNC_SCRIPT = """
+function isPlainObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+// Fields of `state` that differ from `base`, plus every field of the unacknowledged `pending` delta.
+function stateDelta(base, state, pending) {
+    const delta = {};
+    Object.keys(state).forEach(key => {
+        const value = state[key];
+        const pendingValue = pending ? pending[key] : undefined;
+        if (isPlainObject(value) && isPlainObject(base[key])) {
+            const nested = stateDelta(base[key], value, isPlainObject(pendingValue) ? pendingValue : null);
+            if (Object.keys(nested).length > 0) delta[key] = nested;
+        } else if (pendingValue !== undefined || JSON.stringify(value) !== JSON.stringify(base[key])) {
+            delta[key] = value;
+        }
+    });
+    return delta;
+}
+
+class ComponentStateSync {
+    constructor(stateInfo) {
+        this.seq = stateInfo ? stateInfo.seq : 0;
+        this.hash = null;
+        this.base = {};
+        this.pendingDelta = null;
+    }
+
+    // A render stamped with an older sequence number than the last message sent answers a superseded request.
+    isStale(stateInfo) {
+        return !!stateInfo && stateInfo.seq < this.seq;
+    }
+
+    // Records the state a render was made with; returns whether its content differs from the previous one.
+    receive(stateInfo, state) {
+        const changed = !stateInfo || stateInfo.hash !== this.hash;
+        this.hash = stateInfo ? stateInfo.hash : null;
+        this.base = JSON.parse(JSON.stringify(state));
+        this.pendingDelta = null;
+        return changed;
+    }
+
+    // Sends the changes since the last render (cumulative until acknowledged); returns false if nothing new was sent.
+    send(state) {
+        const delta = stateDelta(this.base, state, this.pendingDelta);
+        if (Object.keys(delta).length === 0 || JSON.stringify(delta) === JSON.stringify(this.pendingDelta)) return false;
+        this.pendingDelta = delta;
+        this.seq += 1;
+        Streamlit.setComponentValue({ seq: this.seq, delta: delta });
+        return true;
+    }
+}
+"""
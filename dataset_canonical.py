@@ -0,0 +1,62 @@
+import polars as pl
+
+# Typed datetime column -> source column it is derived from.
+DATETIME_COLUMNS = {'Raw Date_dt': 'Raw Date', 'Raw Deadline_dt': 'Raw Deadline'}
+STATE_COLUMN = 'State_enum'
+DURATION_DAYS_COLUMN = 'Duration Days'
+LAUNCH_MONTH_COLUMN = 'Launch Month'
+# Always part of the State Enum, so comparisons against them are valid on any snapshot.
+KNOWN_STATES = ['successful', 'failed', 'canceled', 'live', 'suspended']
+
+
+def datetime_expr(column: str, dtype: pl.DataType) -> pl.Expr:
+    """
+    Converts `column` to a microsecond Datetime: temporal columns are cast,
+    integers are read as epoch microseconds and strings are parsed leniently.
+    """
+    if dtype == pl.Datetime:
+        return pl.col(column).cast(pl.Datetime('us'))
+    if dtype == pl.Date:
+        return pl.col(column).cast(pl.Datetime('us'))
+    if dtype.is_integer():
+        return pl.from_epoch(pl.col(column), time_unit="us")
+    return pl.col(column).cast(pl.Utf8).str.to_datetime(time_unit='us', strict=False)
+
+
+def state_enum(lf: pl.LazyFrame) -> pl.Enum | None:
+    """The Enum of lower-cased campaign states in `lf` plus `KNOWN_STATES`, or None without a State column."""
+    if 'State' not in lf.collect_schema().names():
+        return None
+    observed = (
+        lf.select(pl.col('State').cast(pl.Utf8).str.to_lowercase().drop_nulls().unique().sort())
+        .collect()
+        .to_series()
+        .to_list()
+    )
+    return pl.Enum(list(dict.fromkeys(KNOWN_STATES + observed)))
+
+
+def canonicalize(lf: pl.LazyFrame, state_dtype: pl.Enum | None) -> pl.LazyFrame:
+    """
+    Adds the typed and derived columns every page filters and aggregates on:
+    microsecond datetimes for the launch and deadline dates, the lower-cased
+    State as an Enum, the campaign duration in days and the launch month.
+    """
+    schema = lf.collect_schema()
+    typed_columns = [
+        datetime_expr(source, schema[source]).alias(column)
+        for column, source in DATETIME_COLUMNS.items()
+        if source in schema
+    ]
+    if state_dtype is not None and 'State' in schema:
+        typed_columns.append(pl.col('State').cast(pl.Utf8).str.to_lowercase().cast(state_dtype).alias(STATE_COLUMN))
+    lf = lf.with_columns(typed_columns)
+
+    derived_columns = []
+    if 'Raw Date_dt' in lf.collect_schema():
+        derived_columns.append(pl.col('Raw Date_dt').dt.truncate('1mo').dt.date().alias(LAUNCH_MONTH_COLUMN))
+        if 'Raw Deadline_dt' in lf.collect_schema():
+            derived_columns.append(
+                (pl.col('Raw Deadline_dt') - pl.col('Raw Date_dt')).dt.total_seconds().truediv(86400).alias(DURATION_DAYS_COLUMN)
+            )
+    return lf.with_columns(derived_columns)
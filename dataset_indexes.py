@@ -0,0 +1,210 @@
+import hashlib
+import os
+import tempfile
+
+import polars as pl
+
+INDEX_CACHE_DIR = os.path.join(tempfile.gettempdir(), "crowdinsight_indexes")
+
+
+def index_cache_path(dataset_version: str, index_name: str) -> str:
+    """Returns the on-disk location of a persisted index for one dataset version."""
+    version_hash = hashlib.sha1(dataset_version.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(INDEX_CACHE_DIR, f"{version_hash}.{index_name}.parquet")
+
+
+def write_index_frame(df: pl.DataFrame, path: str):
+    """Persists an index frame atomically; failures only cost a rebuild on the next start."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.write_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Warning: Could not persist index to '{path}': {e}")
+
+
+def read_index_frame(path: str, expected_height: int | None = None) -> pl.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pl.read_parquet(path)
+    except Exception as e:
+        print(f"Warning: Could not read persisted index '{path}': {e}. Rebuilding.")
+        return None
+    return df if expected_height is None or df.height == expected_height else None
+
+
+class SortPermutation:
+    """
+    Row positions of a frame in one explorer sort order (nulls last, ties by
+    position), plus the inverse mapping from a row position to its rank.
+
+    A filtered, sorted selection is the permutation walked with the filter
+    mask, so queries need no per-request sort.
+    """
+
+    def __init__(self, order: pl.Series):
+        self.order = order
+        self.positions = order.arg_sort()
+
+    def select(self, mask: pl.Series | None) -> pl.Series:
+        """Row positions matching `mask` (by position), in sort order."""
+        if mask is None:
+            return self.order
+        return self.order.filter(mask.gather(self.order))
+
+    def select_after(self, mask: pl.Series | None, row_position: int, limit: int) -> pl.Series | None:
+        """
+        The first `limit` positions matching `mask` that come after
+        `row_position` in sort order, or None if `row_position` is not a
+        row of the frame (a cursor from elsewhere).
+        """
+        if not 0 <= row_position < len(self.positions):
+            return None
+        remaining = self.order.slice(self.positions[row_position] + 1)
+        if mask is not None:
+            remaining = remaining.filter(mask.gather(remaining))
+        return remaining.head(limit)
+
+
+class BitmapIndex:
+    """
+    One row bitmap (a bit-packed boolean Series indexed by row position) per
+    distinct non-null value of a low-cardinality column, so a multi-select
+    filter is an OR of a few bitmaps instead of a string comparison per row.
+
+    Attributes:
+        column: Name of the indexed column.
+        height: Number of rows covered by every bitmap.
+        bitmaps: Bitmap per distinct value, keyed by the value as a string.
+    """
+
+    def __init__(self, column: str, height: int, bitmaps: dict[str, pl.Series]):
+        self.column = column
+        self.height = height
+        self.bitmaps = bitmaps
+
+    @classmethod
+    def build(cls, frame: pl.DataFrame, column: str) -> "BitmapIndex":
+        groups = (
+            frame.select(pl.col(column).cast(pl.Utf8).alias('value'), pl.int_range(pl.len(), dtype=pl.UInt32).alias('rows'))
+            .drop_nulls('value')
+            .group_by('value')
+            .agg('rows')
+        )
+        bitmaps = {}
+        for value, rows in groups.iter_rows():
+            bitmap = pl.repeat(False, frame.height, eager=True)
+            bitmap.scatter(rows, True)
+            bitmaps[value] = bitmap
+        return cls(column, frame.height, bitmaps)
+
+    def select(self, values: list[str], case_insensitive: bool = False) -> pl.Series:
+        """Bitmap of the rows whose value is one of `values`."""
+        if case_insensitive:
+            wanted = {str(v).lower() for v in values}
+            matched = [bitmap for value, bitmap in self.bitmaps.items() if value.lower() in wanted]
+        else:
+            matched = [self.bitmaps[value] for value in dict.fromkeys(map(str, values)) if value in self.bitmaps]
+        if not matched:
+            return pl.repeat(False, self.height, eager=True)
+        mask = matched[0]
+        for bitmap in matched[1:]:
+            mask = mask | bitmap
+        return mask
+
+
+class RangeIndex:
+    """
+    The non-null values of one column in ascending order together with their
+    row positions, so a `[lower, upper]` range filter resolves to a slice of
+    row positions by two binary searches instead of a full-column comparison.
+
+    Attributes:
+        column: Name of the indexed column.
+        height: Number of rows in the indexed frame.
+        values: Sorted non-null values.
+        rows: Row positions in the order of `values`, followed by the rows
+            whose value is null.
+    """
+
+    def __init__(self, column: str, height: int, values: pl.Series, rows: pl.Series):
+        self.column = column
+        self.height = height
+        self.values = values
+        self.rows = rows
+
+    @classmethod
+    def build(cls, frame: pl.DataFrame, column: str) -> "RangeIndex":
+        ordered = frame.select(
+            pl.col(column).alias('value'),
+            pl.int_range(pl.len(), dtype=pl.UInt32).alias('row')
+        ).sort('value', nulls_last=True, maintain_order=True)
+        values = ordered.get_column('value')
+        return cls(column, frame.height, values.head(values.len() - values.null_count()), ordered.get_column('row'))
+
+    def select(self, lower, upper) -> pl.Series | None:
+        """
+        Bitmap of the rows with `lower <= value <= upper`, or None when the
+        range covers every row. The bitmap is scattered from whichever side of
+        the range is smaller.
+        """
+        start = self.values.search_sorted(lower, side='left')
+        end = max(start, self.values.search_sorted(upper, side='right'))
+        if start == 0 and end == self.height:
+            return None
+        if end - start <= self.height // 2:
+            bitmap = pl.repeat(False, self.height, eager=True)
+            bitmap.scatter(self.rows.slice(start, end - start), True)
+        else:
+            bitmap = pl.repeat(True, self.height, eager=True)
+            bitmap.scatter(self.rows.head(start), False)
+            bitmap.scatter(self.rows.slice(end), False)
+        return bitmap
+
+
+def sort_spec_column(sort_col: str, descending: bool) -> str:
+    return f"{sort_col}|{'desc' if descending else 'asc'}"
+
+
+def build_sort_order(frame: pl.DataFrame, sort_col: str, descending: bool) -> pl.Series:
+    return frame.select(
+        pl.int_range(pl.len(), dtype=pl.UInt32)
+        .sort_by(sort_col, descending=descending, nulls_last=True, maintain_order=True)
+        .alias(sort_spec_column(sort_col, descending))
+    ).to_series()
+
+
+def build_bitmap_indexes(frame: pl.DataFrame, columns: list[str]) -> dict:
+    """Returns a `BitmapIndex` for every column of `columns` that exists in `frame`."""
+    return {column: BitmapIndex.build(frame, column) for column in dict.fromkeys(columns) if column in frame.columns}
+
+
+def build_range_indexes(frame: pl.DataFrame, columns: list[str]) -> dict:
+    """Returns a `RangeIndex` for every column of `columns` that exists in `frame`."""
+    return {column: RangeIndex.build(frame, column) for column in dict.fromkeys(columns) if column in frame.columns}
+
+
+def load_sort_permutations(frame: pl.DataFrame, sort_specs: list[tuple[str, bool]], dataset_version: str) -> dict:
+    """
+    Returns a `SortPermutation` for every (column, descending) spec whose column
+    exists in `frame`, reusing permutations persisted for this dataset version
+    and persisting any that had to be computed.
+    """
+    sort_specs = [spec for spec in dict.fromkeys(sort_specs) if spec[0] in frame.columns]
+    path = index_cache_path(dataset_version, "sort_permutations")
+    persisted = read_index_frame(path, frame.height)
+    orders = {}
+    for sort_col, descending in sort_specs:
+        column = sort_spec_column(sort_col, descending)
+        if persisted is not None and column in persisted.columns:
+            orders[column] = persisted.get_column(column)
+        else:
+            orders[column] = build_sort_order(frame, sort_col, descending)
+    if orders and (persisted is None or any(column not in persisted.columns for column in orders)):
+        write_index_frame(pl.DataFrame(list(orders.values())), path)
+    return {
+        (sort_col, descending): SortPermutation(orders[sort_spec_column(sort_col, descending)])
+        for sort_col, descending in sort_specs
+    }
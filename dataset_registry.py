@@ -0,0 +1,392 @@
+import datetime
+import glob
+import hashlib
+import os
+import re
+import threading
+from collections import Counter
+from urllib.parse import unquote
+
+import polars as pl
+import streamlit as st
+
+from dataset_canonical import canonicalize, state_enum
+from dataset_storage import STORAGE_PROFILES, compact_frame
+from dataset_indexes import build_bitmap_indexes, build_range_indexes, load_sort_permutations
+from query_cache import ResultCache
+from search_index import load_search_indexes
+
+SNAPSHOT_DATE_PATTERN = re.compile(r'_(\d{4}-\d{2}-\d{2})T')
+ROW_ID_COLUMN = '_row_id'
+STORAGE_PROFILE = 'compact'
+MASK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+LAUNCH_YEAR_COLUMN = 'Launch Year'
+# Hive partition keys of a partitioned snapshot, outermost first: <snapshot>.parquet/Category=<name>/Launch Year=<year>/*.parquet.
+PARTITION_COLUMNS = ['Category', LAUNCH_YEAR_COLUMN]
+# Directory value hive writers use for a null partition key.
+HIVE_NULL_VALUE = '__HIVE_DEFAULT_PARTITION__'
+
+
+class DatasetError(Exception):
+    """Raised when the Parquet dataset cannot be discovered or validated."""
+
+
+class Dataset:
+    """
+    A discovered and validated Parquet snapshot: a single file, or a
+    directory of files partitioned hive-style by `PARTITION_COLUMNS` and
+    exposed as one logical dataset. Each file of a partitioned snapshot is
+    scanned on its own, its row ids offset by the rows of the files before
+    it, so a scan restricted to some partitions (see `lazy`) and `take`
+    never open the other files.
+
+    One instance is shared by every session and page in the process (see
+    `get_dataset`), so file discovery, snapshot date parsing and Parquet
+    metadata decoding happen once instead of on every rerun. Every frame it
+    hands out carries a `ROW_ID_COLUMN` holding the row's position in the
+    source, so query results can be cached as row-id selections, plus the
+    typed and derived columns added by `dataset_canonical.canonicalize`.
+
+    Attributes:
+        source_path: Path of the Parquet file, or partitioned directory, backing the dataset.
+        source_files: The Parquet files read, in row-id order.
+        is_partitioned: Whether the snapshot is a partitioned directory.
+        partitions: For a partitioned snapshot, the path, first row id and
+            partition key values of every file of `source_files`; None otherwise.
+        creation_date: Snapshot date used as the reference point for date filters.
+        schema: Schema of the Parquet source.
+        version: Identifier that changes whenever a source file changes.
+        state_dtype: Enum of the lower-cased campaign states, or None without a State column.
+        storage_profile: 'standard' keeps the source types in memory; 'compact'
+            dictionary-encodes and downcasts columns when materializing (see
+            `dataset_storage.compact_frame`).
+        storage_report: Per-column memory saved by the compact profile, once materialized.
+        warnings: Non-fatal problems found while loading, for the pages to display.
+        sort_permutations: `SortPermutation` per (column, descending) sort spec.
+        bitmap_indexes: `BitmapIndex` per low-cardinality column.
+        range_indexes: `RangeIndex` per numeric or date column.
+        search_index: `TrigramIndex` matching the search box over the searchable columns, or None.
+        ranking_index: `BM25Index` ranking search matches over the same columns, or None.
+            All of these are built by `prepare_indexes` once the frame is materialized.
+        mask_cache: Boolean masks of individual filter predicates, shared by
+            every query on this version (see `predicate_mask`).
+    """
+
+    def __init__(self, source_path: str, creation_date: datetime.date, schema: pl.Schema, warnings: list[str] | None = None, state_dtype: pl.Enum | None = None, storage_profile: str = 'standard'):
+        self.source_path = source_path
+        self.is_partitioned = os.path.isdir(source_path)
+        self.source_files = partition_files(source_path) if self.is_partitioned else [source_path]
+        self.creation_date = creation_date
+        self.schema = schema
+        self.partitions = load_partitions(source_path, self.source_files, schema) if self.is_partitioned else None
+        self._file_schema = pl.scan_parquet(self.source_files[0]).collect_schema() if self.is_partitioned else None
+        self.state_dtype = state_dtype
+        self.storage_profile = storage_profile
+        self.storage_report = []
+        self.warnings = warnings or []
+        self.version = source_version(source_path, self.source_files)
+        self.sort_permutations = {}
+        self.bitmap_indexes = {}
+        self.range_indexes = {}
+        self.search_index = None
+        self.ranking_index = None
+        self.mask_cache = ResultCache(max_bytes=MASK_CACHE_MAX_BYTES)
+        self._prepared_indexes = set()
+        self._preparing = None
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self) -> list[str]:
+        return self.schema.names()
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._frame is not None
+
+    def materialize(self) -> pl.DataFrame:
+        """Reads the whole snapshot into memory once and returns the shared DataFrame."""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    frame = self._scan().collect()
+                    if self.storage_profile == 'compact':
+                        frame, self.storage_report = compact_frame(frame, self.columns)
+                    self._frame = frame
+        return self._frame
+
+    @property
+    def is_preparing(self) -> bool:
+        return self._preparing is not None and self._preparing.is_alive()
+
+    def prepare_in_background(self, prepare) -> threading.Thread:
+        """
+        Runs `prepare(self)`, typically `prepare_indexes` and `prepare_columns`,
+        once on a background thread and returns that thread. Until it is done
+        the dataset serves queries from scans, with the indexes built so far.
+        """
+        if self._preparing is not None:
+            return self._preparing
+        with self._lock:
+            if self._preparing is None:
+                self._preparing = threading.Thread(target=self._run_prepare, args=(prepare,), name='dataset-prepare', daemon=True)
+                self._preparing.start()
+        return self._preparing
+
+    def _run_prepare(self, prepare):
+        try:
+            prepare(self)
+        except Exception as e:
+            print(f"Warning: Preparing dataset '{self.source_path}' failed: {e}")
+
+    def prepare_indexes(self, sort_specs: list[tuple[str, bool]] = (), bitmap_columns: list[str] = (), range_columns: list[str] = (), search_columns: list[str] = ()):
+        """
+        Materializes the frame and builds the indexes not prepared yet: the
+        row permutation for every (column, descending) sort spec, a bitmap
+        index per `bitmap_columns` entry, a range index per `range_columns`
+        entry and the trigram and BM25 indexes over `search_columns`. Sort
+        permutations and search posting lists are loaded from, or persisted
+        to, the index cache.
+        """
+        frame = self.materialize()
+        requested = (
+            {('sort', spec) for spec in sort_specs}
+            | {('bitmap', col) for col in bitmap_columns}
+            | {('range', col) for col in range_columns}
+            | ({('search', tuple(search_columns))} if search_columns else set())
+        )
+        if requested <= self._prepared_indexes:
+            return
+        with self._lock:
+            missing_specs = [spec for spec in sort_specs if ('sort', spec) not in self._prepared_indexes]
+            if missing_specs:
+                self.sort_permutations = {**self.sort_permutations, **load_sort_permutations(frame, missing_specs, self.version)}
+            missing_columns = [col for col in bitmap_columns if ('bitmap', col) not in self._prepared_indexes]
+            if missing_columns:
+                self.bitmap_indexes = {**self.bitmap_indexes, **build_bitmap_indexes(frame, missing_columns)}
+            missing_ranges = [col for col in range_columns if ('range', col) not in self._prepared_indexes]
+            if missing_ranges:
+                self.range_indexes = {**self.range_indexes, **build_range_indexes(frame, missing_ranges)}
+            if search_columns and ('search', tuple(search_columns)) not in self._prepared_indexes:
+                self.search_index, self.ranking_index = load_search_indexes(frame, list(search_columns), self.version)
+            self._prepared_indexes |= requested
+
+    def prepare_columns(self, columns: dict[str, pl.Expr]):
+        """
+        Materializes the frame and adds the derived `columns` (name ->
+        expression over the frame) not added yet. Under the compact storage
+        profile they are compacted like the source columns.
+        """
+        frame = self.materialize()
+        if all(name in frame.columns for name in columns):
+            return
+        with self._lock:
+            missing = {name: expr for name, expr in columns.items() if name not in self._frame.columns}
+            if missing:
+                frame = self._frame.with_columns(**missing)
+                if self.storage_profile == 'compact':
+                    frame, report = compact_frame(frame, list(missing))
+                    self.storage_report = self.storage_report + report
+                self._frame = frame
+
+    def predicate_mask(self, key: str, compute) -> pl.Series | None:
+        """
+        Returns the mask (indexed by row id) of the filter predicate `key`,
+        computing it with `compute()` on first use. A None mask, meaning the
+        predicate keeps every row, is cached as well. Masks are evicted least
+        recently used once they exceed `MASK_CACHE_MAX_BYTES`.
+        """
+        cached = self.mask_cache.get(key)
+        if cached is None:
+            mask = compute()
+            cached = (mask,)
+            self.mask_cache.put(key, cached, len(key) + (0 if mask is None else mask.estimated_size()))
+        return cached[0]
+
+    def lazy(self, partitions: pl.Expr | None = None) -> pl.LazyFrame:
+        """
+        Returns a LazyFrame over the in-memory frame if materialized, otherwise
+        a Parquet scan. A scan of a partitioned snapshot reads only the files
+        whose partition key values match `partitions`, a predicate over
+        `PARTITION_COLUMNS`, when one is given.
+        """
+        if self._frame is not None:
+            return self._frame.lazy()
+        if self.partitions is None or partitions is None:
+            return self._scan()
+        return self._scan(self.partitions.with_row_index('index').filter(partitions.fill_null(False))['index'])
+
+    def _scan(self, partition_indexes: pl.Series | None = None) -> pl.LazyFrame:
+        if self.partitions is None:
+            return canonicalize(scan_source(self.source_path, row_index_name=ROW_ID_COLUMN), self.state_dtype)
+        partitions = self.partitions if partition_indexes is None else self.partitions[partition_indexes]
+        scans = [self._scan_partition(partition) for partition in partitions.iter_rows(named=True)]
+        lf = pl.concat(scans) if scans else pl.LazyFrame(schema={ROW_ID_COLUMN: pl.get_index_type(), **self.schema})
+        return canonicalize(lf, self.state_dtype)
+
+    def _scan_partition(self, partition: dict) -> pl.LazyFrame:
+        """Scans one file of a partitioned snapshot, adding the partition keys the file does not store."""
+        lf = pl.scan_parquet(
+            partition['path'], schema=self._file_schema,
+            row_index_name=ROW_ID_COLUMN, row_index_offset=partition['first_row_id']
+        )
+        missing = [key for key in PARTITION_COLUMNS if key not in self._file_schema]
+        lf = lf.with_columns(pl.lit(partition[key], dtype=self.schema[key]).alias(key) for key in missing)
+        return lf.select(ROW_ID_COLUMN, *self.schema.names())
+
+    def take(self, row_ids: pl.Series, columns: list[str] | None = None) -> pl.DataFrame:
+        """Returns the rows with the given row ids, in the order given; only `columns` (and the row id) if given."""
+        if columns is not None:
+            columns = [ROW_ID_COLUMN, *(column for column in columns if column != ROW_ID_COLUMN)]
+        if self._frame is not None:
+            frame = self._frame if columns is None else self._frame.select(columns)
+            return frame[row_ids]
+        if self.partitions is not None:
+            lf = self._scan((self.partitions['first_row_id'].search_sorted(row_ids, side='right') - 1).unique())
+        else:
+            lf = self.lazy()
+        if columns is not None:
+            lf = lf.select(columns)
+        rows = lf.filter(pl.col(ROW_ID_COLUMN).is_in(row_ids.implode())).collect()
+        return rows[rows[ROW_ID_COLUMN].search_sorted(row_ids)]
+
+
+def discover_parquet_source(data_dir: str = ".") -> str:
+    """
+    Returns the single Parquet snapshot in `data_dir`: a `*.parquet` file or
+    a partitioned `*.parquet` directory. Raises `DatasetError` otherwise.
+    """
+    parquet_files = sorted(glob.glob(os.path.join(data_dir, "*.parquet")))
+    if len(parquet_files) == 0:
+        raise DatasetError("No Parquet file found in the root directory.")
+    if len(parquet_files) > 1:
+        raise DatasetError(f"Multiple Parquet files found: {parquet_files}. Please ensure only one exists in the root directory.")
+    return parquet_files[0]
+
+
+def partition_files(source_path: str) -> list[str]:
+    """
+    Returns the Parquet files of the partitioned snapshot `source_path` in
+    the order they are scanned, raising `DatasetError` if there are none or
+    one is not laid out under the `PARTITION_COLUMNS` keys.
+    """
+    files = sorted(glob.glob(os.path.join(glob.escape(source_path), "**", "*.parquet"), recursive=True))
+    if len(files) == 0:
+        raise DatasetError(f"Partitioned dataset '{source_path}' contains no Parquet files.")
+    for path in files:
+        keys = [part.split('=', 1)[0] for part in os.path.relpath(os.path.dirname(path), source_path).split(os.sep)]
+        if keys != PARTITION_COLUMNS:
+            raise DatasetError(
+                f"Parquet file '{path}' is not partitioned by {PARTITION_COLUMNS}. "
+                f"Expected a layout like '{os.path.basename(source_path)}/Category=<name>/{LAUNCH_YEAR_COLUMN}=<year>/<file>.parquet'."
+            )
+    return files
+
+
+def load_partitions(source_path: str, source_files: list[str], schema: pl.Schema) -> pl.DataFrame:
+    """
+    The path and first row id of every file of a partitioned snapshot, in
+    scan order, with its partition key values parsed from its path and typed
+    as in `schema`. Row counts are read from the Parquet metadata.
+    """
+    rows = []
+    first_row_id = 0
+    for path in source_files:
+        values = {}
+        for part in os.path.relpath(os.path.dirname(path), source_path).split(os.sep):
+            key, _, value = part.partition('=')
+            value = unquote(value)
+            values[key] = None if value == HIVE_NULL_VALUE else value
+        rows.append({'path': path, 'first_row_id': first_row_id, **values})
+        first_row_id += pl.scan_parquet(path).select(pl.len()).collect().item()
+    partitions = pl.DataFrame(rows, schema={'path': pl.Utf8, 'first_row_id': pl.Int64, **dict.fromkeys(PARTITION_COLUMNS, pl.Utf8)})
+    return partitions.with_columns(pl.col(key).cast(schema[key]) for key in PARTITION_COLUMNS)
+
+
+def scan_source(source_path: str, row_index_name: str | None = None) -> pl.LazyFrame:
+    """Scans the snapshot, with the partition keys of a partitioned one as columns."""
+    if os.path.isdir(source_path):
+        return pl.scan_parquet(source_path, hive_partitioning=True, row_index_name=row_index_name)
+    return pl.scan_parquet(source_path, row_index_name=row_index_name)
+
+
+def source_version(source_path: str, source_files: list[str]) -> str:
+    """Identifier of the snapshot's content: its name plus the size and modification time of every file."""
+    stats = [(os.path.relpath(path, source_path), os.stat(path)) for path in source_files]
+    if len(stats) == 1:
+        _, stat = stats[0]
+        return f"{os.path.basename(source_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    listing = '\n'.join(f"{name}:{stat.st_size}:{stat.st_mtime_ns}" for name, stat in stats)
+    return f"{os.path.basename(source_path)}:{len(stats)}:{hashlib.sha1(listing.encode('utf-8')).hexdigest()}"
+
+
+def resolve_creation_date(source_path: str, warnings: list[str]) -> datetime.date:
+    """
+    Parses the snapshot date from the file name, falling back to the file
+    modification date and finally to today's date. Fallbacks are recorded in `warnings`.
+    """
+    match = SNAPSHOT_DATE_PATTERN.search(os.path.basename(source_path))
+    if match:
+        try:
+            return datetime.datetime.strptime(match.group(1), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    try:
+        creation_date = datetime.date.fromtimestamp(os.path.getmtime(source_path))
+        warnings.append(f"Could not extract date from filename '{source_path}'. Using file modification date: {creation_date}")
+        return creation_date
+    except OSError:
+        warnings.append(f"Could not determine dataset date for '{source_path}'. Using today's date.")
+        return datetime.date.today()
+
+
+def validate_schema(source_path: str, schema: pl.Schema):
+    """Raises `DatasetError` if the Parquet schema cannot be served to the pages."""
+    names = schema.names()
+    if len(names) == 0:
+        raise DatasetError(f"Loaded data from '{source_path}' has no columns.")
+    if len(names) != len(set(names)):
+        duplicates = [name for name, count in Counter(names).items() if count > 1]
+        raise DatasetError(f"Parquet source '{source_path}' contains duplicate column names: {duplicates}. Please clean the source data.")
+
+
+def load_dataset(data_dir: str = ".", storage_profile: str = STORAGE_PROFILE) -> Dataset:
+    """
+    Discovers, validates and describes the Parquet snapshot in `data_dir`,
+    including the State Enum its canonical columns are typed with.
+    """
+    if storage_profile not in STORAGE_PROFILES:
+        raise DatasetError(f"Unknown storage profile '{storage_profile}'. Expected one of {list(STORAGE_PROFILES)}.")
+    source_path = discover_parquet_source(data_dir)
+    if os.path.isdir(source_path):
+        partition_files(source_path)
+    warnings = []
+    creation_date = resolve_creation_date(source_path, warnings)
+    try:
+        schema = scan_source(source_path).collect_schema()
+    except Exception as e:
+        raise DatasetError(f"Error scanning Parquet '{source_path}': {e}") from e
+    validate_schema(source_path, schema)
+    try:
+        state_dtype = state_enum(scan_source(source_path))
+    except Exception as e:
+        raise DatasetError(f"Error reading campaign states from '{source_path}': {e}") from e
+    return Dataset(source_path, creation_date, schema, warnings, state_dtype, storage_profile)
+
+
+@st.cache_resource(show_spinner="Loading dataset...")
+def get_dataset(data_dir: str = ".") -> Dataset:
+    """Process-wide dataset registry: loaded on first use and shared by all sessions and pages."""
+    return load_dataset(data_dir)
+
+
+def get_dataset_or_stop(data_dir: str = ".") -> Dataset:
+    """Returns the shared dataset, reporting load errors and warnings in the calling page."""
+    try:
+        dataset = get_dataset(data_dir)
+    except DatasetError as e:
+        st.error(str(e))
+        st.stop()
+    for warning in dataset.warnings:
+        st.warning(warning)
+    return dataset
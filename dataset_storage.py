@@ -0,0 +1,89 @@
+import polars as pl
+
+STORAGE_PROFILES = ('standard', 'compact')
+# The low-cardinality string columns the compact profile dictionary-encodes.
+CATEGORICAL_COLUMNS = ['Category', 'Subcategory', 'Country', 'State']
+LINK_COLUMN = 'Link'
+LINK_SLUG_COLUMN = 'Link Slug'
+LINK_PREFIX = 'https://www.kickstarter.com/projects/'
+
+
+def link_slug_expr() -> pl.Expr:
+    """The part of `Link` after `LINK_PREFIX`; links without the prefix are kept whole."""
+    return pl.col(LINK_COLUMN).cast(pl.Utf8).str.strip_prefix(LINK_PREFIX).alias(LINK_SLUG_COLUMN)
+
+
+def restore_links(df: pl.DataFrame) -> pl.DataFrame:
+    """Rebuilds the `Link` column of rows from a compact frame, for rendering."""
+    if LINK_COLUMN in df.columns or LINK_SLUG_COLUMN not in df.columns:
+        return df
+    slug = pl.col(LINK_SLUG_COLUMN)
+    return df.with_columns(
+        pl.when(slug.str.contains('://', literal=True)).then(slug)
+        .otherwise(pl.lit(LINK_PREFIX) + slug)
+        .alias(LINK_COLUMN)
+    ).drop(LINK_SLUG_COLUMN)
+
+
+def compact_column(frame: pl.DataFrame, column: str) -> pl.Expr | None:
+    """The lossless compact encoding for `column`, or None if it is kept as is."""
+    series = frame.get_column(column)
+    if column == LINK_COLUMN and series.dtype == pl.Utf8:
+        return link_slug_expr()
+    if series.dtype == pl.Utf8:
+        return pl.col(column).cast(pl.Categorical) if column in CATEGORICAL_COLUMNS else None
+    if series.dtype.is_integer():
+        shrunk = series.shrink_dtype().dtype
+        return pl.col(column).cast(shrunk) if shrunk != series.dtype else None
+    return None
+
+
+def compact_frame(frame: pl.DataFrame, columns: list[str]) -> tuple[pl.DataFrame, list[dict]]:
+    """
+    Applies the compact storage profile to `columns` of `frame`: the string
+    columns of `CATEGORICAL_COLUMNS` become Categorical, integer columns are
+    downcast to the smallest type that holds their range and `Link` is
+    stored as a slug (see `restore_links`). An encoding that does not
+    shrink the column's estimated size is not applied. Floats are kept at
+    full width because the pages sum them.
+
+    Returns the compacted frame and one report entry per changed column with
+    its dtype and estimated size before and after.
+    """
+    report = []
+    for column in columns:
+        if column not in frame.columns:
+            continue
+        expr = compact_column(frame, column)
+        if expr is None:
+            continue
+        before = frame.get_column(column)
+        compacted = frame.select(expr).to_series()
+        if compacted.estimated_size() >= before.estimated_size():
+            continue
+        report.append({
+            'column': column,
+            'stored_as': compacted.name,
+            'dtype_before': str(before.dtype),
+            'dtype_after': str(compacted.dtype),
+            'bytes_before': before.estimated_size(),
+            'bytes_after': compacted.estimated_size(),
+        })
+        frame = frame.with_columns(compacted)
+        if compacted.name != column:
+            frame = frame.drop(column)
+    return frame, report
+
+
+def format_storage_report(source_path: str, report: list[dict]) -> str:
+    bytes_before = sum(entry['bytes_before'] for entry in report)
+    bytes_after = sum(entry['bytes_after'] for entry in report)
+    lines = [f"Compact storage for '{source_path}': {bytes_before / 1e6:.1f} MB -> {bytes_after / 1e6:.1f} MB across {len(report)} columns"]
+    for entry in report:
+        saved_pct = (1 - entry['bytes_after'] / entry['bytes_before']) * 100 if entry['bytes_before'] else 0.0
+        lines.append(
+            f"  {entry['column']}: {entry['dtype_before']} -> {entry['dtype_after']}"
+            f"{' as ' + repr(entry['stored_as']) if entry['stored_as'] != entry['column'] else ''}, "
+            f"{entry['bytes_before'] / 1e6:.2f} MB -> {entry['bytes_after'] / 1e6:.2f} MB ({saved_pct:.0f}% saved)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,600 @@
+import datetime
+import hashlib
+import json
+
+import polars as pl
+from dateutil.relativedelta import relativedelta
+
+from dataset_canonical import STATE_COLUMN
+from dataset_indexes import SortPermutation
+from dataset_registry import LAUNCH_YEAR_COLUMN, PARTITION_COLUMNS, ROW_ID_COLUMN, Dataset
+from query_coordinator import QueryPlan, collect, run_query
+from search_index import implies_search, search_predicate
+
+TOP_K_MIN_ROWS = 200
+TOP_K_MAX_ROWS = 10_000
+# Refining a previous result beats walking a sort permutation only when it matched a small share of the rows.
+REFINEMENT_MAX_PERMUTED_FRACTION = 0.125
+SORT_ORDERS = ['popularity', 'newest', 'oldest', 'mostfunded', 'mostbacked', 'enddate']
+RELEVANCE_SORT_ORDER = 'relevance'
+RELEVANCE_COLUMN = '_relevance'
+# Multi-select filters served by bitmap indexes: column -> (filter key, "All" value, case-insensitive).
+CATEGORICAL_FILTERS = {
+    'Category': ('categories', 'All Categories', False),
+    'Subcategory': ('subcategories', 'All Subcategories', False),
+    'Country': ('countries', 'All Countries', False),
+    STATE_COLUMN: ('states', 'All States', True),
+}
+# Slider filters served by range indexes: column -> key in filters['ranges'].
+RANGE_FILTERS = {'Raw Pledged': 'pledged', 'Raw Goal': 'goal', 'Raw Raised': 'raised'}
+DATE_FILTER_COLUMN = 'Raw Date_dt'
+
+
+def date_filter_window(date_filter: str, dataset_creation_date: datetime.date) -> tuple[datetime.datetime, datetime.datetime] | None:
+    """Returns the inclusive datetime window selected by the date dropdown, or None for 'All Time'."""
+    end_date = dataset_creation_date
+    start_date = None
+
+    if date_filter == 'Last Month':
+        start_date = end_date - relativedelta(months=1)
+    elif date_filter == 'Last 6 Months':
+        start_date = end_date - relativedelta(months=6)
+    elif date_filter == 'Last Year':
+        start_date = end_date - relativedelta(years=1)
+    elif date_filter == 'Last 5 Years':
+        start_date = end_date - relativedelta(years=5)
+    elif date_filter == 'Last 10 Years':
+        start_date = end_date - relativedelta(years=10)
+
+    if not start_date:
+        return None
+    return datetime.datetime.combine(start_date, datetime.time.min), datetime.datetime.combine(end_date, datetime.time.max)
+
+
+def facet_value_expr(column_names: list[str], column: str) -> pl.Expr | None:
+    """
+    The values the multi-select on `column` (a key of `CATEGORICAL_FILTERS`)
+    matches against as strings, or None if the dataset lacks the column.
+    States are lower-cased, and read from `State` for un-canonicalized data.
+    """
+    if column in column_names:
+        return pl.col(column).cast(pl.Utf8)
+    if column == STATE_COLUMN and 'State' in column_names:
+        return pl.col('State').cast(pl.Utf8).str.to_lowercase()
+    return None
+
+
+def categorical_predicate(column_names: list[str], column: str, filters: dict) -> pl.Expr | None:
+    """The multi-select filter on `column` as a predicate, or None when its "All" value is selected."""
+    filter_key, all_value, case_insensitive = CATEGORICAL_FILTERS[column]
+    selection = filters.get(filter_key, [all_value])
+    values = facet_value_expr(column_names, column)
+    if values is None or selection == [all_value]:
+        return None
+    return values.is_in([s.lower() for s in selection] if case_insensitive else selection)
+
+
+def filter_predicates(column_names: list[str], filters: dict, dataset_creation_date: datetime.date, indexed_columns=(), include_search: bool = True) -> list[pl.Expr]:
+    """
+    Returns the explorer's search, multi-select, range and date filters as
+    predicates to AND together, leaving out the filters on `indexed_columns`
+    (and the search when `include_search` is False).
+    """
+    predicates = []
+
+    search_expr = search_predicate(column_names, filters.get('search', '')) if include_search else None
+    if search_expr is not None:
+        predicates.append(search_expr)
+
+    for column in CATEGORICAL_FILTERS:
+        if column not in indexed_columns:
+            categorical_expr = categorical_predicate(column_names, column, filters)
+            if categorical_expr is not None:
+                predicates.append(categorical_expr)
+
+    ranges = filters.get('ranges', {})
+    for column, range_key in RANGE_FILTERS.items():
+        if column in column_names and column not in indexed_columns and range_key in ranges:
+            min_v, max_v = ranges[range_key]['min'], ranges[range_key]['max']
+            predicates.append((pl.col(column) >= min_v) & (pl.col(column) <= max_v))
+
+    date_window = date_filter_window(filters.get('date', 'All Time'), dataset_creation_date)
+    if date_window and 'Raw Date' in column_names and DATE_FILTER_COLUMN not in indexed_columns:
+        start_date_dt, end_date_dt = date_window
+        raw_date_dt = pl.col(DATE_FILTER_COLUMN) if DATE_FILTER_COLUMN in column_names else pl.col("Raw Date").cast(pl.Datetime, strict=False)
+        predicates.append((raw_date_dt >= start_date_dt) & (raw_date_dt <= end_date_dt))
+
+    return predicates
+
+
+def partition_predicate(filters: dict, dataset_creation_date: datetime.date) -> pl.Expr | None:
+    """
+    The category selection and the launch years of the date window as a
+    predicate over the partition keys, so the scan of a partitioned snapshot
+    reads only the files they can match (see `Dataset.lazy`). None when every
+    partition can match. The rows read still go through `filter_predicates`.
+    """
+    predicates = []
+    category_expr = categorical_predicate(PARTITION_COLUMNS, 'Category', filters)
+    if category_expr is not None:
+        predicates.append(category_expr)
+    date_window = date_filter_window(filters.get('date', 'All Time'), dataset_creation_date)
+    if date_window:
+        start_date_dt, end_date_dt = date_window
+        predicates.append(pl.col(LAUNCH_YEAR_COLUMN).is_between(start_date_dt.year, end_date_dt.year))
+    return pl.all_horizontal(predicates) if predicates else None
+
+
+def apply_filters(lf: pl.LazyFrame, filters: dict, dataset_creation_date: datetime.date) -> pl.LazyFrame:
+    """Applies the explorer's search, multi-select, range and date filters to `lf`."""
+    predicates = filter_predicates(lf.collect_schema().names(), filters, dataset_creation_date)
+    return lf.filter(*predicates) if predicates else lf
+
+
+def predicate_key(*parts) -> str:
+    """Key of one filter predicate in the dataset's mask cache (see `Dataset.predicate_mask`)."""
+    return json.dumps(parts, separators=(',', ':'), default=str)
+
+
+def filter_components(dataset: Dataset, filters: dict) -> tuple[dict, list]:
+    """
+    Splits the filters on `dataset` into the parts of the final mask: one per
+    categorical filter with a selection, keyed by column, and a list with
+    the rest. Each part is a boolean Series indexed by row id where an index
+    resolves it (multi-selects from the bitmaps, slider and date ranges by
+    binary search and the search box from the trigram index), otherwise a
+    predicate to evaluate against the frame.
+
+    Every Series part is memoized per predicate in the dataset's mask cache,
+    so filter states sharing a country, a date window or a slider range
+    reuse its mask. On a materialized dataset the predicates no index covers
+    are evaluated into cached masks as well.
+    """
+    column_names = dataset.lazy().collect_schema().names()
+    bitmap_indexes = dataset.bitmap_indexes
+    range_indexes = dataset.range_indexes
+    search_index = dataset.search_index
+
+    def evaluated(predicate: pl.Expr):
+        if not dataset.is_materialized:
+            return predicate
+        key = predicate_key('expr', hashlib.sha1(predicate.meta.serialize(format='json').encode('utf-8')).hexdigest())
+        return dataset.predicate_mask(
+            key, lambda: collect(dataset.lazy().select(predicate.fill_null(False).alias('mask'))).to_series()
+        )
+
+    facet_parts = {}
+    for column, (filter_key, all_value, case_insensitive) in CATEGORICAL_FILTERS.items():
+        selection = filters.get(filter_key, [all_value])
+        if column in bitmap_indexes and selection != [all_value]:
+            values = sorted({str(v).lower() if case_insensitive else str(v) for v in selection})
+            facet_parts[column] = dataset.predicate_mask(
+                predicate_key('in', column, values),
+                lambda column=column, selection=selection, case_insensitive=case_insensitive:
+                    bitmap_indexes[column].select(selection, case_insensitive=case_insensitive)
+            )
+        else:
+            categorical_expr = categorical_predicate(column_names, column, filters)
+            if categorical_expr is not None:
+                facet_parts[column] = evaluated(categorical_expr)
+
+    other_parts = []
+    search = filters.get('search', '')
+    if search_index is not None and search:
+        other_parts.append(dataset.predicate_mask(predicate_key('search', search), lambda: search_index.select(search)))
+    ranges = filters.get('ranges', {})
+    for column, range_key in RANGE_FILTERS.items():
+        if column in range_indexes and range_key in ranges:
+            lower, upper = ranges[range_key]['min'], ranges[range_key]['max']
+            other_parts.append(dataset.predicate_mask(
+                predicate_key('range', column, lower, upper),
+                lambda column=column, lower=lower, upper=upper: range_indexes[column].select(lower, upper)
+            ))
+    date_window = date_filter_window(filters.get('date', 'All Time'), dataset.creation_date)
+    if date_window and DATE_FILTER_COLUMN in range_indexes:
+        other_parts.append(dataset.predicate_mask(
+            predicate_key('range', DATE_FILTER_COLUMN, *date_window),
+            lambda: range_indexes[DATE_FILTER_COLUMN].select(*date_window)
+        ))
+    other_parts.extend(evaluated(predicate) for predicate in filter_predicates(
+        column_names, filters, dataset.creation_date,
+        indexed_columns=set(CATEGORICAL_FILTERS) | set(range_indexes),
+        include_search=search_index is None
+    ))
+    return facet_parts, [part for part in other_parts if part is not None]
+
+
+def filter_mask(dataset: Dataset, filters: dict) -> pl.Series | None:
+    """
+    Evaluates the filters over every row of the materialized `dataset` and
+    returns the boolean mask indexed by row id, or None when nothing is
+    filtered out.
+
+    Filters are resolved from the dataset's indexes where one exists (see
+    `filter_components`), OR within a facet and AND across facets. Only the
+    remaining predicates are evaluated against the frame.
+    """
+    facet_parts, other_parts = filter_components(dataset, filters)
+    parts = [*facet_parts.values(), *other_parts]
+    index_masks = [part for part in parts if isinstance(part, pl.Series)]
+    predicates = [part for part in parts if isinstance(part, pl.Expr)]
+    if predicates:
+        index_masks.append(collect(dataset.lazy().select(pl.all_horizontal(predicates).fill_null(False).alias('mask'))).to_series())
+
+    mask = None
+    for index_mask in index_masks:
+        mask = index_mask if mask is None else mask & index_mask
+    return mask
+
+
+def facet_counts(dataset: Dataset, filters: dict) -> dict:
+    """
+    Returns the number of matching rows per value of every multi-select
+    dropdown, keyed by filter key and then value (states lower-cased).
+
+    Each facet is counted under every filter except its own selection, as in
+    faceted search, so the counts show what picking another value would
+    return. The filter parts are resolved once (see `filter_components`) and
+    all facets are counted in a single pass over the frame.
+    """
+    return run_query(plan_facet_counts(dataset, filters))
+
+
+def plan_facet_counts(dataset: Dataset, filters: dict) -> QueryPlan:
+    """`facet_counts` as a query plan, to be collected together with the result query."""
+    facet_parts, other_parts = filter_components(dataset, filters)
+    # The category facet is counted across every category, so only the launch
+    # years prune the scan. Index masks only exist once the dataset is
+    # materialized, and then this is the full frame they are indexed by.
+    lf = dataset.lazy(partition_predicate({**filters, 'categories': ['All Categories']}, dataset.creation_date))
+    column_names = lf.collect_schema().names()
+
+    def part_expr(part) -> pl.Expr:
+        return pl.lit(part) if isinstance(part, pl.Series) else part.fill_null(False)
+
+    count_exprs = []
+    for column, (filter_key, _, _) in CATEGORICAL_FILTERS.items():
+        values = facet_value_expr(column_names, column)
+        if values is None:
+            continue
+        conditions = [part_expr(part) for part in other_parts]
+        conditions.extend(part_expr(part) for facet_column, part in facet_parts.items() if facet_column != column)
+        if conditions:
+            values = values.filter(pl.all_horizontal(conditions))
+        count_exprs.append(values.drop_nulls().alias('value').value_counts().implode().alias(filter_key))
+
+    def finish(counts_df: pl.DataFrame) -> dict:
+        if not count_exprs:
+            return {}
+        row = counts_df.row(0, named=True)
+        return {filter_key: {entry['value']: entry['count'] for entry in entries} for filter_key, entries in row.items()}
+
+    return QueryPlan(lf.select(count_exprs) if count_exprs else pl.LazyFrame(), finish)
+
+
+def get_sort_spec(sort_order: str) -> tuple[str, bool]:
+    """
+    Returns the (column, descending) pair the explorer sorts by for
+    `sort_order`. Relevance has no column and falls back to popularity when
+    there is nothing to rank (see `query_relevance_results`).
+    """
+    sort_descending = True
+    sort_col = 'Popularity Score'
+
+    if sort_order == 'newest':
+        sort_col = 'Raw Date'
+        sort_descending = True
+    elif sort_order == 'oldest':
+        sort_col = 'Raw Date'
+        sort_descending = False
+    elif sort_order == 'mostfunded':
+        sort_col = 'Raw Pledged'
+        sort_descending = True
+    elif sort_order == 'mostbacked':
+        sort_col = 'Backer Count'
+        sort_descending = True
+    elif sort_order == 'enddate':
+        sort_col = 'Raw Deadline'
+        sort_descending = True
+
+    return sort_col, sort_descending
+
+
+def summary_expressions(column_names: list[str]) -> list[pl.Expr]:
+    """Aggregates shown in the stats bar, computed over the unsorted filtered rows."""
+    aggregations = []
+    if 'Raw Pledged' in column_names:
+        aggregations.append(pl.col('Raw Pledged').cast(pl.Float64).sum().alias('total_pledged'))
+    if 'Backer Count' in column_names:
+        aggregations.append(pl.col('Backer Count').cast(pl.Int64).sum().alias('total_backers'))
+    if STATE_COLUMN in column_names:
+        aggregations.append((pl.col(STATE_COLUMN) == 'successful').sum().cast(pl.Int64).alias('successful_campaigns'))
+    elif 'State' in column_names:
+        is_successful = pl.col('State').cast(pl.Utf8).str.to_lowercase() == 'successful'
+        aggregations.append(is_successful.sum().cast(pl.Int64).alias('successful_campaigns'))
+    return aggregations
+
+
+def selection_limit(rows_needed: int) -> int | None:
+    """
+    Returns how many leading rows of the sorted result to select so that a
+    page ending at row `rows_needed` can be served, or None when the page is
+    deep enough that a full sort is cheaper. Limits grow in powers of two from
+    `TOP_K_MIN_ROWS`, so neighbouring pages are served by the same selection.
+    """
+    if rows_needed > TOP_K_MAX_ROWS:
+        return None
+    limit = TOP_K_MIN_ROWS
+    while limit < rows_needed:
+        limit *= 2
+    return min(limit, TOP_K_MAX_ROWS)
+
+
+def sorted_row_ids_expr(sort_col: str, descending: bool, limit: int | None = None) -> pl.Expr:
+    """
+    Row ids ordered by `sort_col` (nulls last, ties by row id). With a `limit`
+    only the leading `limit` rows are selected: a bounded top-k finds the
+    `limit`-th sort value, and only the rows at or beyond it are sorted,
+    instead of fully sorting every match.
+    """
+    values = pl.col(sort_col)
+    if limit is None:
+        return pl.col(ROW_ID_COLUMN).sort_by(values, descending=descending, nulls_last=True, maintain_order=True)
+    threshold = values.top_k(limit).min() if descending else values.bottom_k(limit).max()
+    within_threshold = (values >= threshold) if descending else (values <= threshold)
+    in_prefix = within_threshold | (values.is_null() & (values.count() < limit))
+    return (
+        pl.col(ROW_ID_COLUMN).filter(in_prefix)
+        .sort_by(values.filter(in_prefix), descending=descending, nulls_last=True, maintain_order=True)
+        .head(limit)
+    )
+
+
+def query_explorer_results(lf: pl.LazyFrame, filters: dict, sort_order: str, dataset_creation_date: datetime.date, limit: int | None = None) -> dict:
+    """
+    Runs the filter once and returns the sorted row ids, the match count and
+    the summary aggregates from a single execution. Only the row-id column is
+    sorted; the count and aggregates are computed on the unsorted matches.
+
+    With a `limit` (see `selection_limit`) only the first `limit` row ids are
+    returned and `is_complete` tells whether they cover every match.
+    """
+    return run_query(plan_explorer_results(lf, filters, sort_order, dataset_creation_date, limit))
+
+
+def plan_explorer_results(lf: pl.LazyFrame, filters: dict, sort_order: str, dataset_creation_date: datetime.date, limit: int | None = None) -> QueryPlan:
+    """`query_explorer_results` as a query plan."""
+    filtered_lf = apply_filters(lf, filters, dataset_creation_date)
+    column_names = filtered_lf.collect_schema().names()
+
+    sort_col, sort_descending = get_sort_spec(sort_order)
+    if sort_col in column_names:
+        row_ids_expr = sorted_row_ids_expr(sort_col, sort_descending, limit)
+    else:
+        print(f"Warning: Sort column '{sort_col}' not found in LazyFrame.")
+        row_ids_expr = pl.col(ROW_ID_COLUMN) if limit is None else pl.col(ROW_ID_COLUMN).head(limit)
+
+    return QueryPlan(filtered_lf.select(
+        row_ids_expr.implode().alias('row_ids'),
+        pl.len().alias('total_rows'),
+        *summary_expressions(column_names)
+    ), _finish_explorer_results)
+
+
+def query_permuted_results(dataset: Dataset, sort_permutation: SortPermutation, filters: dict) -> dict:
+    """
+    Same result as `query_explorer_results`, served from the indexes of the
+    materialized `dataset`: the filter mask is resolved once (see
+    `filter_mask`) and the precomputed `sort_permutation` is walked with it,
+    so every match comes back sorted without a per-query sort and the result
+    is always complete.
+    """
+    return run_query(plan_permuted_results(dataset, sort_permutation, filters))
+
+
+def plan_permuted_results(dataset: Dataset, sort_permutation: SortPermutation, filters: dict) -> QueryPlan:
+    """`query_permuted_results` as a query plan."""
+    lf = dataset.lazy()
+    mask = filter_mask(dataset, filters)
+    matches_lf = lf if mask is None else lf.filter(pl.lit(mask))
+    summary_lf = matches_lf.select(
+        pl.len().alias('total_rows'),
+        *summary_expressions(lf.collect_schema().names())
+    )
+    return QueryPlan(summary_lf, lambda result_df: _explorer_results(
+        sort_permutation.select(mask).alias(ROW_ID_COLUMN), result_df.row(0, named=True)
+    ))
+
+
+def query_relevance_results(dataset: Dataset, filters: dict, limit: int | None = None) -> dict | None:
+    """
+    Same result as `query_explorer_results` for the relevance sort order: the
+    matches (see `filter_mask`) ordered by the BM25 score of the search terms,
+    ties by row id, with the leading `limit` rows picked by a bounded top-k.
+    Returns None when there is no search or no ranking index, in which case
+    relevance falls back to the popularity order.
+    """
+    plan = plan_relevance_results(dataset, filters, limit)
+    return run_query(plan) if plan is not None else None
+
+
+def plan_relevance_results(dataset: Dataset, filters: dict, limit: int | None = None) -> QueryPlan | None:
+    """`query_relevance_results` as a query plan, or None when there is nothing to rank."""
+    if dataset.ranking_index is None:
+        return None
+    scores = dataset.ranking_index.scores(filters.get('search', ''))
+    if scores is None:
+        return None
+    lf = dataset.lazy()
+    mask = filter_mask(dataset, filters)
+    scored_lf = lf.with_columns(pl.lit(scores.alias(RELEVANCE_COLUMN)))
+    if mask is not None:
+        scored_lf = scored_lf.filter(pl.lit(mask))
+    return QueryPlan(scored_lf.select(
+        sorted_row_ids_expr(RELEVANCE_COLUMN, True, limit).implode().alias('row_ids'),
+        pl.len().alias('total_rows'),
+        *summary_expressions(lf.collect_schema().names())
+    ), _finish_explorer_results)
+
+
+def refinement_filters(base_filters: dict, filters: dict, dataset_creation_date: datetime.date) -> dict | None:
+    """
+    Compares two canonical filter states (see `canonicalize_filters`). When
+    `filters` selects a subset of what `base_filters` selects, because every
+    filter is unchanged or narrower, returns the changed filters with every
+    other filter neutral. Evaluating them over the base selection gives the
+    result of `filters`. Otherwise returns None.
+    """
+    added = {'search': '', 'date': 'All Time', 'ranges': {}}
+    for filter_key, all_value, _ in CATEGORICAL_FILTERS.values():
+        added[filter_key] = [all_value]
+
+    if filters['search'] != base_filters['search']:
+        if not implies_search(filters['search'], base_filters['search']):
+            return None
+        added['search'] = filters['search']
+
+    for filter_key, all_value, _ in CATEGORICAL_FILTERS.values():
+        selection, base_selection = filters[filter_key], base_filters[filter_key]
+        if selection == base_selection:
+            continue
+        if selection == [all_value] or (base_selection != [all_value] and not set(selection) <= set(base_selection)):
+            return None
+        added[filter_key] = selection
+
+    for range_key in RANGE_FILTERS.values():
+        bounds, base_bounds = filters['ranges'].get(range_key), base_filters['ranges'].get(range_key)
+        if bounds == base_bounds:
+            continue
+        if bounds is None or (base_bounds is not None and not base_bounds['min'] <= bounds['min'] <= bounds['max'] <= base_bounds['max']):
+            return None
+        added['ranges'][range_key] = bounds
+
+    if filters['date'] != base_filters['date']:
+        window = date_filter_window(filters['date'], dataset_creation_date)
+        base_window = date_filter_window(base_filters['date'], dataset_creation_date)
+        if window is None or (base_window is not None and not base_window[0] <= window[0] <= window[1] <= base_window[1]):
+            return None
+        added['date'] = filters['date']
+
+    return added
+
+
+def prefers_refinement(base_results: dict, sort_permutation: SortPermutation | None) -> bool:
+    """
+    Whether refining the complete `base_results` is cheaper than querying
+    afresh: always when the fresh query would have to sort, otherwise only
+    when the base matched at most `REFINEMENT_MAX_PERMUTED_FRACTION` of the
+    rows the permutation walks.
+    """
+    if not base_results['is_complete']:
+        return False
+    return sort_permutation is None or base_results['total_rows'] <= len(sort_permutation.order) * REFINEMENT_MAX_PERMUTED_FRACTION
+
+
+def query_refined_results(dataset: Dataset, base_results: dict, added_filters: dict) -> dict:
+    """
+    Same result as the other queries for a filter state narrower than the
+    one `base_results` (a complete result) was computed for. Only
+    `added_filters` (see `refinement_filters`) are evaluated, and only for
+    the base's matching rows: index-resolved parts (see `filter_components`)
+    are read at those rows and the remaining predicates run on them alone.
+    The surviving row ids keep their order, so the result is sorted and
+    complete without sorting again.
+    """
+    return run_query(plan_refined_results(dataset, base_results, added_filters))
+
+
+def plan_refined_results(dataset: Dataset, base_results: dict, added_filters: dict) -> QueryPlan:
+    """`query_refined_results` as a query plan."""
+    base_row_ids = base_results['row_ids']
+    facet_parts, other_parts = filter_components(dataset, added_filters)
+    parts = [*facet_parts.values(), *other_parts]
+    predicates = [part for part in parts if isinstance(part, pl.Expr)]
+    predicates.extend(pl.lit(part.gather(base_row_ids)) for part in parts if isinstance(part, pl.Series))
+    summaries = summary_expressions(dataset.lazy().collect_schema().names())
+    columns = {root for expr in [*predicates, *summaries] for root in expr.meta.root_names()}
+    rows_lf = dataset.take(base_row_ids, columns=sorted(columns)).lazy()
+    if predicates:
+        rows_lf = rows_lf.filter(pl.all_horizontal(predicates).fill_null(False))
+    return QueryPlan(rows_lf.select(
+        pl.col(ROW_ID_COLUMN).implode().alias('row_ids'),
+        pl.len().alias('total_rows'),
+        *summaries
+    ), _finish_explorer_results)
+
+
+def _finish_explorer_results(result_df: pl.DataFrame) -> dict:
+    row_ids = result_df.get_column('row_ids')[0]
+    return _explorer_results(row_ids, result_df.drop('row_ids').row(0, named=True))
+
+
+def _explorer_results(row_ids: pl.Series, result: dict) -> dict:
+    total_rows = result['total_rows']
+    successful = result.get('successful_campaigns')
+    return {
+        'row_ids': row_ids,
+        'total_rows': total_rows,
+        'is_complete': len(row_ids) == total_rows,
+        'summary': {
+            'total_pledged': result.get('total_pledged'),
+            'total_backers': result.get('total_backers'),
+            'success_rate': (successful / total_rows) * 100 if successful is not None and total_rows > 0 else None,
+        },
+    }
+
+
+def covers_rows(results: dict, rows_needed: int) -> bool:
+    """Whether `results` holds enough sorted row ids to serve a page ending at row `rows_needed`."""
+    return results['is_complete'] or len(results['row_ids']) >= rows_needed
+
+
+def page_cursor(page_df: pl.DataFrame, sort_order: str) -> dict | None:
+    """
+    Returns the keyset cursor positioned after the last row of `page_df`: the
+    row's sort key (as its physical value, so dates travel as integers) plus
+    its row id as the tiebreaker.
+    """
+    sort_col, _ = get_sort_spec(sort_order)
+    if sort_order == RELEVANCE_SORT_ORDER or page_df.is_empty() or sort_col not in page_df.columns or ROW_ID_COLUMN not in page_df.columns:
+        return None
+    key, row_id = page_df.select(pl.col(sort_col).to_physical(), pl.col(ROW_ID_COLUMN)).row(-1)
+    return {'key': key, 'id': row_id}
+
+
+def keyset_predicate(sort_col: str, descending: bool, cursor: dict) -> pl.Expr:
+    """Selects the rows that come after `cursor` in the (sort_col, row id) order, nulls last."""
+    values = pl.col(sort_col).to_physical()
+    key, row_id = cursor['key'], cursor['id']
+    after_tiebreaker = pl.col(ROW_ID_COLUMN) > row_id
+    if key is None:
+        return values.is_null() & after_tiebreaker
+    beyond_key = (values < key) if descending else (values > key)
+    return beyond_key | ((values == key) & after_tiebreaker) | values.is_null()
+
+
+def query_page_after(lf: pl.LazyFrame, filters: dict, sort_order: str, dataset_creation_date: datetime.date, cursor: dict, page_size: int) -> pl.Series | None:
+    """
+    Keyset pagination: returns the row ids of the `page_size` rows following
+    `cursor` as a range predicate plus a bounded top-k, so a deep page costs
+    the same as the first one. Returns None if the sort column is missing.
+    """
+    filtered_lf = apply_filters(lf, filters, dataset_creation_date)
+    sort_col, sort_descending = get_sort_spec(sort_order)
+    if sort_col not in filtered_lf.collect_schema().names():
+        return None
+    result_df = collect(
+        filtered_lf
+        .filter(keyset_predicate(sort_col, sort_descending, cursor))
+        .select(sorted_row_ids_expr(sort_col, sort_descending, page_size).implode().alias('row_ids'))
+    )
+    return result_df.get_column('row_ids')[0]
+
+
+def query_permuted_page_after(dataset: Dataset, sort_permutation: SortPermutation, filters: dict, cursor: dict, page_size: int) -> pl.Series | None:
+    """
+    Keyset pagination over a precomputed `sort_permutation`, walked from the
+    cursor's row. Returns None if the cursor's row id is not a row of the dataset.
+    """
+    row_ids = sort_permutation.select_after(filter_mask(dataset, filters), cursor['id'], page_size)
+    return None if row_ids is None else row_ids.alias(ROW_ID_COLUMN)
@@ -0,0 +1,156 @@
+import polars as pl
+
+from dataset_storage import restore_links
+
+VISIBLE_COLUMNS = ['Project Name', 'Creator', 'Pledged Amount', 'Link', 'Country', 'State']
+# Source columns the display columns and row attributes are derived from.
+RENDER_SOURCE_COLUMNS = [
+    'Project Name', 'Creator', 'Country', 'State', 'Category', 'Subcategory', 'Raw Pledged', 'Raw Goal',
+    'Raw Raised', 'Raw Date', 'Raw Deadline', 'Backer Count', 'Popularity Score'
+]
+LINK_DISPLAY_MAX_CHARS = 60
+# Low-cardinality fields sent as indexes into a per-page list of their distinct values.
+DICTIONARY_FIELDS = ['country', 'state', 'category', 'subcategory']
+HTML_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'}
+
+
+def escape_html_expr(text: pl.Expr) -> pl.Expr:
+    """`html.escape` as a string expression: every special character is replaced in a single pass."""
+    return text.str.replace_many(list(HTML_ESCAPES), list(HTML_ESCAPES.values()))
+
+
+def text_cell_expr(column: str) -> pl.Expr:
+    return escape_html_expr(pl.col(column).cast(pl.Utf8).fill_null('N/A'))
+
+
+def thousands_expr(amount: pl.Expr) -> pl.Expr:
+    """An integer expression as a string with comma thousands separators, like `f"{amount:,}"`."""
+    digits = amount.abs().cast(pl.Utf8).str.reverse().str.replace_all(r'(\d{3})', '${1},').str.strip_chars_end(',').str.reverse()
+    return pl.when(amount < 0).then(pl.lit('-') + digits).otherwise(digits)
+
+
+def fixed_decimals_expr(value: pl.Expr, decimals: int) -> pl.Expr:
+    """A numeric expression as a string with exactly `decimals` decimals, like `f"{value:.{decimals}f}"`; null stays null."""
+    scaled = (value.cast(pl.Float64) * 10 ** decimals).round().cast(pl.Int64)
+    digits = scaled.abs().cast(pl.Utf8).str.zfill(decimals + 1)
+    unsigned = pl.concat_str([digits.str.slice(0, digits.str.len_chars() - decimals), pl.lit('.'), digits.str.slice(-decimals)])
+    return pl.when(scaled < 0).then(pl.lit('-') + unsigned).otherwise(unsigned)
+
+
+def date_text_expr(column_names: list[str], column: str) -> pl.Expr:
+    typed_column = f"{column}_dt" if f"{column}_dt" in column_names else column
+    return pl.col(typed_column).dt.to_string('%Y-%m-%d').fill_null('N/A')
+
+
+def display_column_exprs(column_names: list[str]) -> dict[str, pl.Expr]:
+    """
+    The escaped and formatted strings every explorer row is rendered from,
+    computed once per dataset (see `Dataset.prepare_columns`) so rendering a
+    page only concatenates strings: the text cells, the pledged amount as
+    `$1,234`, the styled state cell and the row's data attributes. Missing
+    numbers render as 'N/A'.
+    """
+    state = pl.col('State').cast(pl.Utf8)
+    state_class = escape_html_expr(state.str.to_lowercase().str.replace_all(' ', '-', literal=True))
+    data_attributes = {
+        'category': text_cell_expr('Category'),
+        'subcategory': text_cell_expr('Subcategory'),
+        'pledged': fixed_decimals_expr(pl.col('Raw Pledged'), 2),
+        'goal': fixed_decimals_expr(pl.col('Raw Goal'), 2),
+        'raised': fixed_decimals_expr(pl.col('Raw Raised'), 2),
+        'date': date_text_expr(column_names, 'Raw Date'),
+        'deadline': date_text_expr(column_names, 'Raw Deadline'),
+        'backers': pl.col('Backer Count').cast(pl.Utf8),
+        'popularity': fixed_decimals_expr(pl.col('Popularity Score'), 6),
+    }
+    return {
+        '_name_html': text_cell_expr('Project Name'),
+        '_creator_html': text_cell_expr('Creator'),
+        '_country_html': text_cell_expr('Country'),
+        '_pledged_html': pl.when(pl.col('Raw Pledged').is_not_null()).then(
+            pl.lit('$') + thousands_expr(pl.col('Raw Pledged').cast(pl.Float64).cast(pl.Int64))
+        ).otherwise(pl.lit('N/A')),
+        '_state_html': pl.when(state.is_not_null()).then(
+            pl.concat_str([pl.lit('<div class="state_cell state-'), state_class, pl.lit('">'), escape_html_expr(state), pl.lit('</div>')])
+        ).otherwise(pl.lit('<div class="state_cell state-unknown">unknown</div>')),
+        '_row_attrs': pl.concat_str([
+            pl.concat_str([pl.lit(f' data-{name}="'), value.fill_null('N/A'), pl.lit('"')])
+            for name, value in data_attributes.items()
+        ]),
+    }
+
+
+def link_cell_expr() -> pl.Expr:
+    url = pl.when(pl.col('Link').cast(pl.Utf8).fill_null('') != '').then(pl.col('Link').cast(pl.Utf8)).otherwise(pl.lit('#'))
+    display_url = pl.when(url.str.len_chars() < LINK_DISPLAY_MAX_CHARS).then(url).otherwise(
+        url.str.slice(0, LINK_DISPLAY_MAX_CHARS - 3) + pl.lit('...')
+    )
+    return pl.concat_str([
+        pl.lit('<a href="'), escape_html_expr(url), pl.lit('" target="_blank" title="'), escape_html_expr(url), pl.lit('">'),
+        escape_html_expr(display_url), pl.lit('</a>')
+    ])
+
+
+def table_header_html() -> str:
+    return ''.join(f'<th scope="col">{column}</th>' for column in VISIBLE_COLUMNS)
+
+
+def render_rows_html(df_page: pl.DataFrame) -> str:
+    """
+    Assembles the table rows of a page from its precomputed display columns
+    with one string expression; only the link cell is built here, from the
+    (possibly slug-compacted) `Link`.
+    """
+    cells = {
+        'Project Name': pl.col('_name_html'),
+        'Creator': pl.col('_creator_html'),
+        'Pledged Amount': pl.col('_pledged_html'),
+        'Link': link_cell_expr(),
+        'Country': pl.col('_country_html'),
+        'State': pl.col('_state_html'),
+    }
+    row_html = pl.concat_str([
+        pl.lit('<tr class="table-row"'), pl.col('_row_attrs').cast(pl.Utf8), pl.lit('>'),
+        *[pl.concat_str([pl.lit('<td>'), cells[column].cast(pl.Utf8), pl.lit('</td>')]) for column in VISIBLE_COLUMNS],
+        pl.lit('</tr>'),
+    ])
+    return restore_links(df_page).select(row_html.str.join('')).item()
+
+
+def rows_payload(df_page: pl.DataFrame) -> dict:
+    """
+    The page as columnar JSON for the component's row template: one array
+    of raw values per field, with `DICTIONARY_FIELDS` sent as indexes into
+    a sorted list of the page's distinct values. Formatting and escaping are
+    left to the template, so the page can also be re-sorted client-side.
+    """
+    column_names = df_page.columns
+    fields = {
+        'name': pl.col('Project Name').cast(pl.Utf8),
+        'creator': pl.col('Creator').cast(pl.Utf8),
+        'link': pl.col('Link').cast(pl.Utf8),
+        'country': pl.col('Country').cast(pl.Utf8),
+        'state': pl.col('State').cast(pl.Utf8),
+        'category': pl.col('Category').cast(pl.Utf8),
+        'subcategory': pl.col('Subcategory').cast(pl.Utf8),
+        'pledged': pl.col('Raw Pledged').cast(pl.Float64).fill_nan(None),
+        'goal': pl.col('Raw Goal').cast(pl.Float64).fill_nan(None),
+        'raised': pl.col('Raw Raised').cast(pl.Float64).fill_nan(None),
+        'date': date_text_expr(column_names, 'Raw Date'),
+        'deadline': date_text_expr(column_names, 'Raw Deadline'),
+        'backers': pl.col('Backer Count').cast(pl.Int64),
+        'popularity': pl.col('Popularity Score').cast(pl.Float64).fill_nan(None),
+    }
+    values = restore_links(df_page).select(**fields)
+    dictionaries = {
+        field: values.get_column(field).drop_nulls().unique().sort().to_list()
+        for field in DICTIONARY_FIELDS
+    }
+    codes = values.with_columns(
+        (pl.col(field).rank('dense') - 1).cast(pl.UInt32) for field in DICTIONARY_FIELDS
+    )
+    return {
+        'row_count': values.height,
+        'columns': codes.to_dict(as_series=False),
+        'dictionaries': dictionaries,
+    }
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from query_cache import ResultCache
+
+
+class PagePrefetcher:
+    """
+    Computes explorer pages in the background and keeps them in a
+    memory-bounded cache keyed by query and page, so a page flip to a
+    neighbouring page is served from memory.
+
+    Work runs on a small thread pool shared by every session in the process.
+    At most `max_pending` pages are queued or running at once and further
+    requests are dropped rather than queued, so prefetching never builds a
+    backlog competing with foreground queries for the CPU. Each session has
+    one active query: prefetching for a new query (or `cancel`) cancels the
+    session's queued pages and discards pages that finish afterwards.
+
+    Attributes:
+        cache: Prefetched pages keyed by `page_key`.
+        max_pending: Cap on pages queued or running across all sessions.
+        scheduled: Number of pages submitted to the pool.
+        dropped: Number of requested pages skipped because the cap was reached.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, max_bytes: int, ttl_seconds: float | None = None, max_sessions: int = 1000):
+        self.cache = ResultCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self.scheduled = 0
+        self.dropped = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='page-prefetch')
+        self._pending = {}
+        self._session_queries = OrderedDict()
+        # Reentrant: cancelling a future runs its done callback on the calling thread.
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def page_key(query_key: str, page: int) -> str:
+        return f"{query_key}:{page}"
+
+    def get(self, query_key: str, page: int):
+        """Returns the prefetched `page` of the query, or None if it is not (or no longer) cached."""
+        return self.cache.get(self.page_key(query_key, page))
+
+    def prefetch(self, session_id: str, query_key: str, pages: list[int], fetch_page):
+        """
+        Makes `query_key` the session's active query and schedules
+        `fetch_page(page)`, which returns the page and its size in bytes, for
+        every page of `pages` that is neither cached nor already scheduled.
+        `fetch_page` runs on a pool thread and must not touch session state.
+        """
+        with self._lock:
+            active_query, futures = self._session_queries.pop(session_id, (None, []))
+            if active_query != query_key:
+                for future in futures:
+                    future.cancel()
+                futures = []
+            futures = [future for future in futures if not future.done()]
+            for page in pages:
+                key = self.page_key(query_key, page)
+                if key in self._pending or key in self.cache:
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                future = self._executor.submit(self._run, session_id, query_key, key, page, fetch_page)
+                self._pending[key] = future
+                self.scheduled += 1
+                future.add_done_callback(lambda done, key=key: self._forget(key, done))
+                futures.append(future)
+            self._session_queries[session_id] = (query_key, futures)
+            while len(self._session_queries) > self.max_sessions:
+                self._session_queries.popitem(last=False)
+
+    def cancel(self, session_id: str):
+        """Cancels the session's queued pages and discards its running ones."""
+        with self._lock:
+            _, futures = self._session_queries.pop(session_id, (None, []))
+            for future in futures:
+                future.cancel()
+
+    def _is_active(self, session_id: str, query_key: str) -> bool:
+        with self._lock:
+            return self._session_queries.get(session_id, (None, []))[0] == query_key
+
+    def _run(self, session_id: str, query_key: str, key: str, page: int, fetch_page):
+        if not self._is_active(session_id, query_key):
+            return
+        try:
+            value, nbytes = fetch_page(page)
+        except Exception as e:
+            print(f"Warning: Prefetching page {page} failed: {e}")
+            return
+        if self._is_active(session_id, query_key):
+            self.cache.put(key, value, nbytes)
+
+    def _forget(self, key: str, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
@@ -12,6 +12,11 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from component_generation import generate_component
+from component_state import STATE_SYNC_SCRIPT, component_state_info, receive_component_state
+from dataset_canonical import STATE_COLUMN
+from dataset_registry import get_dataset_or_stop
+from dataset_storage import LINK_SLUG_COLUMN, restore_links
+from query_coordinator import SLOT_TIMEOUT_SECONDS, QueryShed, collect_all, get_query_scheduler
 
 st.set_page_config(
     layout="wide",
@@ -34,35 +39,7 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-parquet_source_path = None
-dataset_creation_date = None
-
-import glob, re
-parquet_files = glob.glob("*.parquet")
-if len(parquet_files) == 1:
-    parquet_source_path = parquet_files[0]
-    match = re.search(r'_(\d{4}-\d{2}-\d{2})T', parquet_source_path)
-    if match:
-        try:
-            dataset_creation_date = datetime.datetime.strptime(match.group(1), '%Y-%m-%d').date()
-        except ValueError:
-            pass
-    if not dataset_creation_date:
-         try:
-             mtime = os.path.getmtime(parquet_source_path)
-             dataset_creation_date = datetime.date.fromtimestamp(mtime)
-             st.warning(f"Could not extract date from filename '{parquet_source_path}'. Using file modification date: {dataset_creation_date}")
-         except Exception:
-            st.error(f"Could not determine dataset date for '{parquet_source_path}'. Using today's date.")
-            dataset_creation_date = datetime.date.today()
-    st.session_state.dataset_creation_date = dataset_creation_date
-
-elif len(parquet_files) == 0:
-    st.error("No Parquet file found in the root directory.")
-    st.stop()
-else:
-    st.error(f"Multiple Parquet files found: {parquet_files}. Please ensure only one exists.")
-    st.stop()
+dataset = get_dataset_or_stop()
 
 filter_metadata_path = "filter_metadata.json"
 if not os.path.exists(filter_metadata_path):
@@ -86,6 +63,8 @@ except Exception as e:
         'date_ranges': ['All Time', 'Last Month', 'Last 6 Months', 'Last Year']
     }
 
+COMPONENT_KEY = 'insights_state'
+
 DEFAULT_INSIGHTS_FILTERS = {
     'categories': ['All Categories'],
     'date': 'All Time',
@@ -93,20 +72,6 @@ DEFAULT_INSIGHTS_FILTERS = {
 
 if 'insights_filters' not in st.session_state:
     st.session_state.insights_filters = DEFAULT_INSIGHTS_FILTERS.copy()
-if 'insights_component_value' not in st.session_state:
-    st.session_state.insights_component_value = None
-if 'insights_state_sent_to_component' not in st.session_state:
-    st.session_state.insights_state_sent_to_component = DEFAULT_INSIGHTS_FILTERS.copy()
-
-if 'base_lf' not in st.session_state:
-    try:
-        st.session_state.base_lf = pl.scan_parquet(parquet_source_path)
-        if len(st.session_state.base_lf.collect_schema().names()) == 0:
-             st.error(f"Loaded data from '{parquet_source_path}' has no columns.")
-             st.stop()
-    except Exception as e:
-        st.error(f"Error scanning Parquet source '{parquet_source_path}': {e}")
-        st.stop()
 
 css = """
 <style>
@@ -826,6 +791,7 @@ class InsightsDashboard {
         }
 
         this.currentFilters = initialData.filters || {};
+        this.stateSync = new ComponentStateSync(initialData.component_state);
         this.filterOptions = initialData.filter_options || {};
         this.metricsData = initialData.metrics || {};
         this.goalDistributionData = initialData.goal_distribution || [];
@@ -858,7 +824,7 @@ class InsightsDashboard {
 
         this.renderHTMLStructure();
         this.bindStaticElements();
-        this.updateUIState(initialData);
+        this.updateUIState(initialData, this.stateSync.receive(initialData.component_state, { filters: initialData.filters }));
         this.adjustHeight();
     }
 
@@ -1237,9 +1203,7 @@ class InsightsDashboard {
            }
     }
 
-    updateUIState(data) {
-        const filtersChanged = JSON.stringify(this.currentFilters) !== JSON.stringify(data.filters);
-
+    updateUIState(data, syncControls = true) {
         this.currentFilters = data.filters || {};
         this.metricsData = data.metrics || {};
         this.goalDistributionData = data.goal_distribution || [];
@@ -1252,7 +1216,7 @@ class InsightsDashboard {
         this.selectedCategories = new Set(this.currentFilters.categories || ['All Categories']);
         this.singleCategorySelected = this.selectedCategories.size === 1 && !this.selectedCategories.has('All Categories');
 
-        if (this.dateFilterSelect) {
+        if (this.dateFilterSelect && syncControls) {
              this.dateFilterSelect.value = this.currentFilters.date || 'All Time';
         }
          const categoryOptionsChanged = this._checkCategoryOptionsChanged(this.filterOptions.categories);
@@ -1712,6 +1676,17 @@ class InsightsDashboard {
     }
 
     requestUpdate() {
+        const state = {
+            filters: {
+                categories: Array.from(this.selectedCategories),
+                date: this.dateFilterSelect.value,
+            }
+        };
+        if (!this.stateSync.send(state)) {
+            this._hideDropdownImmediately();
+            return;
+        }
+
         if (this.metricsGrid) {
              this.metricsGrid.classList.add('loading');
              const loadingP = this.metricsGrid.querySelector('p.loading-message');
@@ -1771,14 +1746,6 @@ class InsightsDashboard {
          }
 
         this._hideDropdownImmediately();
-
-        const state = {
-            filters: {
-                categories: Array.from(this.selectedCategories),
-                date: this.dateFilterSelect.value,
-            }
-        };
-        Streamlit.setComponentValue(state);
         this.adjustHeight();
     }
 
@@ -2119,7 +2086,9 @@ function onRender(event) {
         if (!window.insightsDashboardInstance) {
             window.insightsDashboardInstance = new InsightsDashboard(data);
         } else {
-            window.insightsDashboardInstance.updateUIState(data);
+            if (window.insightsDashboardInstance.stateSync.isStale(data.component_state)) return;
+            const stateChanged = window.insightsDashboardInstance.stateSync.receive(data.component_state, { filters: data.filters });
+            window.insightsDashboardInstance.updateUIState(data, stateChanged);
         }
 
         if (!window.insightsResizeObserver && document.getElementById('component-root')) {
@@ -2148,7 +2117,7 @@ Streamlit.events.addEventListener(Streamlit.RENDER_EVENT, onRender);
 Streamlit.setComponentReady();
 """
 
-script = chartjs_script_content + "\n" + datalabels_plugin_content + "\n" + script_template
+script = chartjs_script_content + "\n" + datalabels_plugin_content + "\n" + STATE_SYNC_SCRIPT + "\n" + script_template
 
 insights_component = generate_component(
     "campaign_insights_dashboard",
@@ -2156,6 +2125,30 @@ insights_component = generate_component(
     script=script
 )
 
+# Queries still run when the query scheduler is overloaded; the other panels are optional.
+HEADLINE_INSIGHT_QUERIES = {'current_overall', 'previous_overall'}
+
+def collect_insight_frames(planned_queries: dict) -> dict:
+    """
+    Collects every planned insight query in one batch (see
+    `query_coordinator.collect_all`), so the filtered campaigns they share
+    are computed once and the independent aggregations run in parallel.
+    Entries that are not LazyFrames (None, or the error planning failed
+    with) are passed through. If the batch fails, the queries are collected
+    one by one so a failing query only empties its own chart.
+    """
+    collected_frames = dict(planned_queries)
+    lazy_frames = {name: query for name, query in planned_queries.items() if isinstance(query, pl.LazyFrame)}
+    try:
+        collected_frames.update(zip(lazy_frames, collect_all(list(lazy_frames.values()))))
+    except Exception:
+        for name, query in lazy_frames.items():
+            try:
+                collected_frames[name] = query.collect()
+            except Exception as e:
+                collected_frames[name] = e
+    return collected_frames
+
 def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.date):
 
     schema_names = lf.collect_schema().names()
@@ -2234,34 +2227,38 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
                 (pl.col(date_col_for_filtering) >= prev_start) & (pl.col(date_col_for_filtering) < prev_end)
             )
 
-    def get_grouped_metrics(period_lf: pl.LazyFrame, group_by_col: str | None = None) -> pl.DataFrame:
-        """Calculates key metrics, optionally grouped by a column."""
+    def grouped_metrics_lf(period_lf: pl.LazyFrame | None, group_by_col: str | None = None) -> pl.LazyFrame | None:
+        """Key metrics as a query, optionally grouped by a column; None when there is nothing to query."""
         if period_lf is None:
-            schema = {"total_campaigns": pl.UInt32, "total_pledged": pl.Float64, "successful_campaigns": pl.UInt32, "failed_campaigns": pl.UInt32, "success_rate": pl.Float64}
-            if group_by_col: schema[group_by_col] = pl.Utf8
-            return pl.DataFrame(schema=schema)
-
-        try:
-            period_schema = period_lf.collect_schema()
+            return None
+        period_schema = period_lf.collect_schema()
+        if STATE_COLUMN in period_schema.names():
+            state_lower_expr = pl.col(STATE_COLUMN)
+        else:
             state_lower_expr = pl.col("State").fill_null("").cast(pl.Utf8).str.to_lowercase()
 
-            aggregations = [
-                pl.len().alias("total_campaigns"),
-                pl.sum("Raw Pledged").cast(pl.Float64).alias("total_pledged"),
-                pl.when(state_lower_expr == "successful").then(pl.lit(1, dtype=pl.UInt32)).otherwise(pl.lit(0, dtype=pl.UInt32)).sum().alias("successful_campaigns"),
-                pl.when(state_lower_expr == "failed").then(pl.lit(1, dtype=pl.UInt32)).otherwise(pl.lit(0, dtype=pl.UInt32)).sum().alias("failed_campaigns"),
-            ]
-
-            if group_by_col:
-                if group_by_col not in period_schema.names():
-                    schema = {group_by_col: pl.Utf8, "total_campaigns": pl.UInt32, "total_pledged": pl.Float64, "successful_campaigns": pl.UInt32, "failed_campaigns": pl.UInt32, "success_rate": pl.Float64}
-                    return pl.DataFrame(schema=schema)
-
-                grouped_lf = period_lf.filter(pl.col(group_by_col).is_not_null()).group_by(group_by_col).agg(aggregations)
-            else:
-                grouped_lf = period_lf.select(aggregations)
+        aggregations = [
+            pl.len().alias("total_campaigns"),
+            pl.col("Raw Pledged").cast(pl.Float64).sum().alias("total_pledged"),
+            pl.when(state_lower_expr == "successful").then(pl.lit(1, dtype=pl.UInt32)).otherwise(pl.lit(0, dtype=pl.UInt32)).sum().alias("successful_campaigns"),
+            pl.when(state_lower_expr == "failed").then(pl.lit(1, dtype=pl.UInt32)).otherwise(pl.lit(0, dtype=pl.UInt32)).sum().alias("failed_campaigns"),
+        ]
+
+        if group_by_col:
+            if group_by_col not in period_schema.names():
+                return None
+            return period_lf.filter(pl.col(group_by_col).is_not_null()).group_by(group_by_col).agg(aggregations)
+        return period_lf.select(aggregations)
+
+    def get_grouped_metrics(query_name: str, group_by_col: str | None = None) -> pl.DataFrame:
+        """Calculates key metrics from a collected `grouped_metrics_lf` query, optionally grouped by a column."""
+        try:
+            results_df = collected_frame(query_name)
+            if results_df is None:
+                schema = {"total_campaigns": pl.UInt32, "total_pledged": pl.Float64, "successful_campaigns": pl.UInt32, "failed_campaigns": pl.UInt32, "success_rate": pl.Float64}
+                if group_by_col: schema[group_by_col] = pl.Utf8
+                return pl.DataFrame(schema=schema)
 
-            results_df = grouped_lf.collect()
             if results_df.is_empty():
                  schema = {"total_campaigns": pl.UInt32, "total_pledged": pl.Float64, "successful_campaigns": pl.UInt32, "failed_campaigns": pl.UInt32}
                  if group_by_col: schema[group_by_col] = pl.Utf8
@@ -2281,9 +2278,214 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
             if group_by_col: schema[group_by_col] = pl.Utf8
             return pl.DataFrame(schema=schema)
 
-    current_overall_metrics_df = get_grouped_metrics(current_lf_filtered)
+    def collected_frame(query_name: str) -> pl.DataFrame | None:
+        """A collected insight query, re-raising the error it failed with; None if it was not planned."""
+        frame = collected_frames.get(query_name)
+        if isinstance(frame, Exception):
+            raise frame
+        return frame
+
+    # Every query is planned first and all of them are collected in one batch (see `collect_insight_frames`).
+    planned_queries = {}
+    try:
+        planned_queries['current_overall'] = grouped_metrics_lf(current_lf_filtered)
+        if not is_all_time:
+            planned_queries['previous_overall'] = grouped_metrics_lf(prev_lf_filtered)
+    except Exception as e:
+        planned_queries['current_overall'] = planned_queries['previous_overall'] = e
+
+    bins = [0, 1000, 10000, 100000, 1000000]
+    labels = ["<$1k", "$1k-$10k", "$10k-$100k", "$100k-$1m", ">$1m"]
+    last_finite_bin = bins[-1]
+    if current_lf_filtered is not None:
+        goal_bin_expr = (
+            pl.when(pl.col("Raw Goal") < bins[1]).then(pl.lit(labels[0]))
+            .when(pl.col("Raw Goal") < bins[2]).then(pl.lit(labels[1]))
+            .when(pl.col("Raw Goal") < bins[3]).then(pl.lit(labels[2]))
+            .when(pl.col("Raw Goal") < bins[4]).then(pl.lit(labels[3]))
+            .when(pl.col("Raw Goal") >= last_finite_bin).then(pl.lit(labels[4]))
+            .otherwise(None)
+        ).alias("goal_bin")
+
+        intermediate_lf = current_lf_filtered.filter(
+                pl.col("Raw Goal").is_not_null() & (pl.col("Raw Goal") > 0)
+            ).with_columns(goal_bin_expr).filter(pl.col("goal_bin").is_not_null())
+
+        planned_queries['goal_distribution'] = (
+            intermediate_lf
+            .group_by("goal_bin")
+            .agg(pl.len().alias("count"))
+            .with_columns(pl.col('goal_bin').cast(pl.Enum(categories=labels)))
+            .sort("goal_bin")
+        )
+
+    group_col = None
+    group_type = "category"
+    selected_main_category_name = categories[0] if single_category_selected else None
+    if is_all_time:
+        if categories == ['All Categories']:
+            group_col = "Category"
+            group_type = "category"
+        elif single_category_selected and subcategory_needed:
+            group_col = "Subcategory"
+            group_type = "subcategory"
+        else:
+            group_col = "Category"
+            group_type = "category"
+    else:
+        if single_category_selected and subcategory_needed:
+            group_col = "Subcategory"
+            group_type = "subcategory"
+        else:
+            group_col = "Category"
+            group_type = "category"
+    if group_col:
+        try:
+            planned_queries['current_grouped'] = grouped_metrics_lf(current_lf_filtered, group_col)
+            if not is_all_time and prev_lf_filtered is not None:
+                planned_queries['previous_grouped'] = grouped_metrics_lf(prev_lf_filtered, group_col)
+        except Exception as e:
+            planned_queries['current_grouped'] = planned_queries['previous_grouped'] = e
+
+    if location_col_name and current_lf_filtered is not None:
+        planned_queries['top_locations'] = (
+            current_lf_filtered
+            .filter(pl.col(location_col_name).is_not_null() & (pl.col(location_col_name) != ""))
+            .group_by(location_col_name)
+            .agg(pl.len().alias("count"))
+            .sort("count", descending=True)
+            .head(5)
+        )
+
+    avg_funding_per_backer_payload = {"type": "category", "data": []}
+    funding_group_col = None
+    if backers_col_name and current_lf_filtered is not None:
+        try:
+            funding_group_type = "category"
+            if categories == ['All Categories']:
+                funding_group_col = "Category"
+                funding_group_type = "category"
+            elif single_category_selected and subcategory_needed:
+                funding_group_col = "Subcategory"
+                funding_group_type = "subcategory"
+            else:
+                funding_group_col = "Category"
+                funding_group_type = "category"
+
+            avg_funding_per_backer_payload["type"] = funding_group_type
+
+            if funding_group_col:
+                avg_funding_lf = (
+                    current_lf_filtered
+                    .filter(
+                        pl.col(backers_col_name).is_not_null() & (pl.col(backers_col_name) > 0) &
+                        pl.col(funding_group_col).is_not_null() & (pl.col(funding_group_col) != "") &
+                        pl.col("Raw Pledged").is_not_null()
+                    )
+                    .group_by(funding_group_col)
+                    .agg(
+                        pl.col("Raw Pledged").cast(pl.Float64).sum().alias("total_pledged"),
+                        pl.col(backers_col_name).cast(pl.Float64).sum().alias("total_backers")
+                    )
+                    .filter(pl.col("total_backers") > 0)
+                    .with_columns(
+                        (pl.col("total_pledged") / pl.col("total_backers")).alias("avg_funding_per_backer")
+                    )
+                    .select(funding_group_col, "avg_funding_per_backer")
+                )
+
+                if funding_group_type == "subcategory" and selected_main_category_name:
+                     avg_funding_lf = avg_funding_lf.filter(pl.col(funding_group_col) != selected_main_category_name)
+
+                if categories == ['All Categories'] and funding_group_type == "category":
+                     valid_main_categories = [cat for cat in filter_options.get('categories', []) if cat != 'All Categories']
+                     if valid_main_categories:
+                         avg_funding_lf = avg_funding_lf.filter(pl.col(funding_group_col).is_in(valid_main_categories))
+
+                planned_queries['avg_funding_per_backer'] = avg_funding_lf.sort(funding_group_col)
+
+        except Exception as e:
+            avg_funding_per_backer_payload = {"type": "category", "data": []}
+            planned_queries['avg_funding_per_backer'] = e
+
+    top_funded_column_header = 'Category' 
+    use_subcategory = False
+    category_source_col = "Category"
+    if 'Raw Date' in schema_names and 'Raw Deadline' in schema_names and 'Raw Pledged' in schema_names:
+        try:
+            funded_lf = lf
+            subcategory_exists = 'Subcategory' in funded_lf.collect_schema().names()
+            use_subcategory = single_category_selected and subcategory_exists
+
+            if not is_all_time and current_start and current_end:
+                if 'Raw Date_dt' not in funded_lf.collect_schema().names():
+                    funded_lf = funded_lf.with_columns(
+                        pl.col("Raw Date").cast(pl.Datetime, strict=False).alias("Raw Date_dt")
+                    )
+                if 'Raw Deadline_dt' not in funded_lf.collect_schema().names():
+                    funded_lf = funded_lf.with_columns(
+                         pl.from_epoch(pl.col("Raw Deadline"), time_unit="us").alias("Raw Deadline_dt")
+                    )
+
+                funded_lf = funded_lf.filter(
+                    (
+                        (pl.col('Raw Date_dt') >= current_start) & (pl.col('Raw Date_dt') < current_end)
+                    ) | (
+                        (pl.col('Raw Deadline_dt') >= current_start) & (pl.col('Raw Deadline_dt') < current_end)
+                    )
+                )
+
+            category_source_col = "Subcategory" if use_subcategory else "Category"
+            top_funded_column_header = "Subcategory" if use_subcategory else "Category"
+
+            link_col = 'Link' if 'Link' in funded_lf.collect_schema().names() else LINK_SLUG_COLUMN
+            required_display_cols = ['Project Name', 'Creator', 'Raw Pledged', category_source_col, 'Country', link_col]
+            existing_display_cols = [col for col in required_display_cols if col in funded_lf.collect_schema().names()]
+
+            if category_source_col not in existing_display_cols:
+                 st.warning(f"Warning: Required column '{category_source_col}' not found for top funded table.")
+                 if use_subcategory and 'Category' in funded_lf.collect_schema().names():
+                      category_source_col = "Category"
+                      top_funded_column_header = "Category"
+                      if category_source_col not in existing_display_cols: 
+                          existing_display_cols.insert(3, category_source_col) 
+                 else: 
+                      existing_display_cols = [col for col in existing_display_cols if col != category_source_col]
+
+            if 'Raw Pledged' in existing_display_cols and 'Project Name' in existing_display_cols: 
+                select_cols_for_top_funded = existing_display_cols
+
+                planned_queries['top_funded_campaigns'] = (
+                    funded_lf
+                    .filter(pl.col('Raw Pledged').is_not_null())
+                    .sort("Raw Pledged", descending=True)
+                    .head(5)
+                    .select(select_cols_for_top_funded)
+                )
+
+        except Exception as e:
+            top_funded_column_header = 'Category' 
+            planned_queries['top_funded_campaigns'] = e
+
+    query_scheduler = get_query_scheduler()
+    headline_only = query_scheduler.overloaded('insights')
+    if headline_only:
+        query_scheduler.record_shed('insights')
+    else:
+        try:
+            with query_scheduler.slot('insights', timeout=SLOT_TIMEOUT_SECONDS['insights']):
+                collected_frames = collect_insight_frames(planned_queries)
+        except QueryShed as e:
+            print(f"Warning: Skipped the optional insights panels: {e}")
+            headline_only = True
+    if headline_only:
+        st.info("The server is busy, so only the headline metrics were calculated. The other panels will fill in on a later update.")
+        with query_scheduler.slot('insights'):
+            collected_frames = collect_insight_frames({name: query for name, query in planned_queries.items() if name in HEADLINE_INSIGHT_QUERIES})
+
+    current_overall_metrics_df = get_grouped_metrics('current_overall')
     if not is_all_time:
-        prev_overall_metrics_df = get_grouped_metrics(prev_lf_filtered)
+        prev_overall_metrics_df = get_grouped_metrics('previous_overall')
     else:
         schema = {"total_campaigns": pl.UInt32, "total_pledged": pl.Float64, "successful_campaigns": pl.UInt32, "failed_campaigns": pl.UInt32}
         prev_overall_metrics_df = pl.DataFrame(schema=schema)
@@ -2352,76 +2554,21 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
 
     goal_distribution = []
     try:
-        bins = [0, 1000, 10000, 100000, 1000000]
-        labels = ["<$1k", "$1k-$10k", "$10k-$100k", "$100k-$1m", ">$1m"]
-        last_finite_bin = bins[-1]
+        goal_dist_df = collected_frame('goal_distribution')
 
-        goal_lf = current_lf_filtered
-
-        if goal_lf is None:
+        if goal_dist_df is None or goal_dist_df.is_empty():
              goal_distribution = [{"bin": label, "count": 0} for label in labels]
         else:
-            goal_bin_expr = (
-                pl.when(pl.col("Raw Goal") < bins[1]).then(pl.lit(labels[0]))
-                .when(pl.col("Raw Goal") < bins[2]).then(pl.lit(labels[1]))
-                .when(pl.col("Raw Goal") < bins[3]).then(pl.lit(labels[2]))
-                .when(pl.col("Raw Goal") < bins[4]).then(pl.lit(labels[3]))
-                .when(pl.col("Raw Goal") >= last_finite_bin).then(pl.lit(labels[4]))
-                .otherwise(None)
-            ).alias("goal_bin")
-
-            intermediate_lf = goal_lf.filter(
-                    pl.col("Raw Goal").is_not_null() & (pl.col("Raw Goal") > 0)
-                ).with_columns(goal_bin_expr).filter(pl.col("goal_bin").is_not_null())
-
-            goal_dist_df = (
-                intermediate_lf
-                .group_by("goal_bin")
-                .agg(pl.len().alias("count"))
-                .with_columns(pl.col('goal_bin').cast(pl.Enum(categories=labels)))
-                .sort("goal_bin")
-                .collect()
-            )
-
-            if goal_dist_df.is_empty():
-                 goal_distribution = [{"bin": label, "count": 0} for label in labels]
-            else:
-                 goal_map = {row['goal_bin']: row['count'] for row in goal_dist_df.to_dicts()}
-                 goal_distribution = [{"bin": label, "count": goal_map.get(label, 0)} for label in labels]
+             goal_map = {row['goal_bin']: row['count'] for row in goal_dist_df.to_dicts()}
+             goal_distribution = [{"bin": label, "count": goal_map.get(label, 0)} for label in labels]
 
     except Exception as e:
         goal_distribution = [{"bin": label, "count": 0} for label in labels]
 
-    trending_payload = {"type": "category", "mode": "value", "data": {}}
+    trending_payload = {"type": group_type, "mode": "value" if is_all_time else "change", "data": {}}
     try:
-        group_col = None
-        group_type = "category"
-        selected_main_category_name = categories[0] if single_category_selected else None
-
-        if is_all_time:
-            trending_payload["mode"] = "value"
-            if categories == ['All Categories']:
-                group_col = "Category"
-                group_type = "category"
-            elif single_category_selected and subcategory_needed:
-                group_col = "Subcategory"
-                group_type = "subcategory"
-            else:
-                group_col = "Category"
-                group_type = "category"
-        else:
-            trending_payload["mode"] = "change"
-            if single_category_selected and subcategory_needed:
-                group_col = "Subcategory"
-                group_type = "subcategory"
-            else:
-                group_col = "Category"
-                group_type = "category"
-
-        trending_payload["type"] = group_type
-
         if group_col:
-            current_grouped_df = get_grouped_metrics(current_lf_filtered, group_col)
+            current_grouped_df = get_grouped_metrics('current_grouped', group_col)
 
             if group_type == "subcategory" and selected_main_category_name:
                 if not current_grouped_df.is_empty():
@@ -2437,7 +2584,7 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
                 if prev_lf_filtered is None:
                      prev_grouped_df = pl.DataFrame(schema={group_col: pl.Utf8, **{m: pl.Float64 for m in metrics_to_calculate}})
                 else:
-                    prev_grouped_df = get_grouped_metrics(prev_lf_filtered, group_col)
+                    prev_grouped_df = get_grouped_metrics('previous_grouped', group_col)
                     if group_type == "subcategory" and selected_main_category_name:
                         if not prev_grouped_df.is_empty():
                             prev_grouped_df = prev_grouped_df.filter(pl.col(group_col) != selected_main_category_name)
@@ -2511,156 +2658,55 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
         pass
 
     top_locations = []
-    if location_col_name and current_lf_filtered is not None:
-        try:
-            locations_df = (
-                current_lf_filtered
-                .filter(pl.col(location_col_name).is_not_null() & (pl.col(location_col_name) != ""))
-                .group_by(location_col_name)
-                .agg(pl.len().alias("count"))
-                .sort("count", descending=True)
-                .head(5)
-                .collect()
-            )
-            if not locations_df.is_empty():
-                top_locations = locations_df.rename({location_col_name: "location"}).to_dicts()
-
-        except Exception as e:
-            top_locations = []
-
-    avg_funding_per_backer_payload = {"type": "category", "data": []}
-    if backers_col_name and current_lf_filtered is not None:
-        try:
-            funding_group_col = None
-            funding_group_type = "category"
-            if categories == ['All Categories']:
-                funding_group_col = "Category"
-                funding_group_type = "category"
-            elif single_category_selected and subcategory_needed:
-                funding_group_col = "Subcategory"
-                funding_group_type = "subcategory"
-            else:
-                funding_group_col = "Category"
-                funding_group_type = "category"
-
-            avg_funding_per_backer_payload["type"] = funding_group_type
-
-            if funding_group_col:
-                avg_funding_lf = (
-                    current_lf_filtered
-                    .filter(
-                        pl.col(backers_col_name).is_not_null() & (pl.col(backers_col_name) > 0) &
-                        pl.col(funding_group_col).is_not_null() & (pl.col(funding_group_col) != "") &
-                        pl.col("Raw Pledged").is_not_null()
-                    )
-                    .group_by(funding_group_col)
-                    .agg(
-                        pl.sum("Raw Pledged").cast(pl.Float64).alias("total_pledged"),
-                        pl.sum(backers_col_name).cast(pl.Float64).alias("total_backers")
-                    )
-                    .filter(pl.col("total_backers") > 0)
-                    .with_columns(
-                        (pl.col("total_pledged") / pl.col("total_backers")).alias("avg_funding_per_backer")
-                    )
-                    .select(funding_group_col, "avg_funding_per_backer")
-                )
-
-                if funding_group_type == "subcategory" and selected_main_category_name:
-                     avg_funding_lf = avg_funding_lf.filter(pl.col(funding_group_col) != selected_main_category_name)
+    try:
+        locations_df = collected_frame('top_locations')
+        if locations_df is not None and not locations_df.is_empty():
+            top_locations = locations_df.rename({location_col_name: "location"}).to_dicts()
 
-                if categories == ['All Categories'] and funding_group_type == "category":
-                     valid_main_categories = [cat for cat in filter_options.get('categories', []) if cat != 'All Categories']
-                     if valid_main_categories:
-                         avg_funding_lf = avg_funding_lf.filter(pl.col(funding_group_col).is_in(valid_main_categories))
+    except Exception as e:
+        top_locations = []
 
-                funding_df = avg_funding_lf.sort(funding_group_col).collect()
+    try:
+        funding_df = collected_frame('avg_funding_per_backer')
 
-                if not funding_df.is_empty():
-                     avg_funding_per_backer_payload["data"] = funding_df.rename({
-                         funding_group_col: "name",
-                         "avg_funding_per_backer": "value"
-                     }).to_dicts()
+        if funding_df is not None and not funding_df.is_empty():
+             avg_funding_per_backer_payload["data"] = funding_df.rename({
+                 funding_group_col: "name",
+                 "avg_funding_per_backer": "value"
+             }).to_dicts()
 
-        except Exception as e:
-            avg_funding_per_backer_payload = {"type": "category", "data": []}
+    except Exception as e:
+        avg_funding_per_backer_payload = {"type": "category", "data": []}
 
     top_funded_campaigns = []
-    top_funded_column_header = 'Category' 
-    if 'Raw Date' in schema_names and 'Raw Deadline' in schema_names and 'Raw Pledged' in schema_names:
-        try:
-            funded_lf = lf
-            subcategory_exists = 'Subcategory' in funded_lf.collect_schema().names()
-            use_subcategory = single_category_selected and subcategory_exists
-
-            if not is_all_time and current_start and current_end:
-                if 'Raw Date_dt' not in funded_lf.collect_schema().names():
-                    funded_lf = funded_lf.with_columns(
-                        pl.col("Raw Date").cast(pl.Datetime, strict=False).alias("Raw Date_dt")
-                    )
-                if 'Raw Deadline_dt' not in funded_lf.collect_schema().names():
-                    funded_lf = funded_lf.with_columns(
-                         pl.from_epoch(pl.col("Raw Deadline"), time_unit="us").alias("Raw Deadline_dt")
-                    )
-
-                funded_lf = funded_lf.filter(
-                    (
-                        (pl.col('Raw Date_dt') >= current_start) & (pl.col('Raw Date_dt') < current_end)
-                    ) | (
-                        (pl.col('Raw Deadline_dt') >= current_start) & (pl.col('Raw Deadline_dt') < current_end)
-                    )
-                )
-
-            category_source_col = "Subcategory" if use_subcategory else "Category"
-            top_funded_column_header = "Subcategory" if use_subcategory else "Category"
-
-            required_display_cols = ['Project Name', 'Creator', 'Raw Pledged', category_source_col, 'Country', 'Link']
-            existing_display_cols = [col for col in required_display_cols if col in funded_lf.collect_schema().names()]
-
-            if category_source_col not in existing_display_cols:
-                 st.warning(f"Warning: Required column '{category_source_col}' not found for top funded table.")
-                 if use_subcategory and 'Category' in funded_lf.collect_schema().names():
-                      category_source_col = "Category"
-                      top_funded_column_header = "Category"
-                      if category_source_col not in existing_display_cols: 
-                          existing_display_cols.insert(3, category_source_col) 
-                 else: 
-                      existing_display_cols = [col for col in existing_display_cols if col != category_source_col]
-
-            if 'Raw Pledged' in existing_display_cols and 'Project Name' in existing_display_cols: 
-                select_cols_for_top_funded = existing_display_cols
-
-                top_funded_df = (
-                    funded_lf
-                    .filter(pl.col('Raw Pledged').is_not_null())
-                    .sort("Raw Pledged", descending=True)
-                    .head(5)
-                    .select(select_cols_for_top_funded)
-                    .collect()
-                )
+    try:
+        top_funded_df = collected_frame('top_funded_campaigns')
+        if top_funded_df is not None:
+            top_funded_df = restore_links(top_funded_df)
 
-                if use_subcategory and category_source_col == "Subcategory" and "Subcategory" in top_funded_df.columns:
-                     if 'Category' not in top_funded_df.columns:
-                         top_funded_df = top_funded_df.rename({"Subcategory": "Category"})
-                     else:
-                          top_funded_df = top_funded_df.drop("Subcategory")
-                          top_funded_column_header = "Category" 
-
-                if not top_funded_df.is_empty():
-                    if 'Category' not in top_funded_df.columns and top_funded_column_header == 'Category':
-                         top_funded_df = top_funded_df.with_columns(pl.lit(None).alias('Category'))
-
-                    final_columns = ['Project Name', 'Creator', 'Raw Pledged', 'Category', 'Country', 'Link']
-                    dict_list = []
-                    for row in top_funded_df.iter_rows(named=True):
-                        row_dict = {}
-                        for col in final_columns:
-                            row_dict[col] = row.get(col)
-                        dict_list.append(row_dict)
-                    top_funded_campaigns = dict_list
+            if use_subcategory and category_source_col == "Subcategory" and "Subcategory" in top_funded_df.columns:
+                 if 'Category' not in top_funded_df.columns:
+                     top_funded_df = top_funded_df.rename({"Subcategory": "Category"})
+                 else:
+                      top_funded_df = top_funded_df.drop("Subcategory")
+                      top_funded_column_header = "Category" 
+
+            if not top_funded_df.is_empty():
+                if 'Category' not in top_funded_df.columns and top_funded_column_header == 'Category':
+                     top_funded_df = top_funded_df.with_columns(pl.lit(None).alias('Category'))
+
+                final_columns = ['Project Name', 'Creator', 'Raw Pledged', 'Category', 'Country', 'Link']
+                dict_list = []
+                for row in top_funded_df.iter_rows(named=True):
+                    row_dict = {}
+                    for col in final_columns:
+                        row_dict[col] = row.get(col)
+                    dict_list.append(row_dict)
+                top_funded_campaigns = dict_list
 
-        except Exception as e:
-            top_funded_campaigns = []
-            top_funded_column_header = 'Category' 
+    except Exception as e:
+        top_funded_campaigns = []
+        top_funded_column_header = 'Category' 
 
     final_results = {
         "metrics": results,
@@ -2676,23 +2722,10 @@ def calculate_insights(lf: pl.LazyFrame, filters: dict, dataset_date: datetime.d
 
     return final_results
 
-component_state_from_last_run = st.session_state.get("insights_component_value", None)
-state_sent_last_run = st.session_state.get('insights_state_sent_to_component', DEFAULT_INSIGHTS_FILTERS)
-
-component_sent_new_state = False
-if component_state_from_last_run is not None:
-    try:
-        if isinstance(component_state_from_last_run, dict) and 'filters' in component_state_from_last_run:
-             last_run_str = json.dumps(component_state_from_last_run.get('filters'), sort_keys=True)
-             sent_last_run_str = json.dumps(state_sent_last_run, sort_keys=True)
-             if last_run_str != sent_last_run_str:
-                 component_sent_new_state = True
-    except TypeError as e:
-         component_sent_new_state = True
-
-if component_sent_new_state:
-     if isinstance(component_state_from_last_run, dict) and 'filters' in component_state_from_last_run:
-        new_filters_raw = component_state_from_last_run['filters']
+received_state = receive_component_state(st.session_state, COMPONENT_KEY, {'filters': st.session_state.insights_filters})
+if received_state is not None:
+    if isinstance(received_state.get('filters'), dict):
+        new_filters_raw = received_state['filters']
         validated_filters = DEFAULT_INSIGHTS_FILTERS.copy()
         if isinstance(new_filters_raw.get('categories'), list):
             valid_cats = [cat for cat in new_filters_raw['categories'] if cat in filter_options['categories']]
@@ -2709,36 +2742,22 @@ if component_sent_new_state:
             validated_filters['date'] = new_filters_raw['date']
 
         st.session_state.insights_filters = validated_filters
+    else:
+        print(f"Warning: Invalid structure in new component state: {received_state}. NOT updating session state.")
 
-if 'base_lf' in st.session_state and 'dataset_creation_date' in st.session_state:
-    calculated_data = {}
-    try:
-        calculated_data = calculate_insights(
-            st.session_state.base_lf,
-            st.session_state.insights_filters,
-            st.session_state.dataset_creation_date
-        )
-        calculated_metrics = calculated_data.get("metrics", {})
-        goal_distribution_data = calculated_data.get("goal_distribution", [])
-        trending_data_payload = calculated_data.get("trending_data", {"items": []})
-
-    except Exception as e:
-        st.error(f"Error calculating insights: {e}")
-        calculated_metrics = {}
-        goal_distribution_data = []
-        trending_data_payload = {"type": "category", "mode": "value", "data": {}}
-        calculated_data = {
-             "metrics": {},
-             "goal_distribution": [],
-             "trending_data": {"type": "category", "mode": "value", "data": {}},
-             "top_locations": [],
-             "avg_funding_per_backer": {"type": "category", "data": []},
-             "top_funded_campaigns": {"data": [], "column_header": "Category"}
-        }
-
+calculated_data = {}
+try:
+    calculated_data = calculate_insights(
+        dataset.lazy(),
+        st.session_state.insights_filters,
+        dataset.creation_date
+    )
+    calculated_metrics = calculated_data.get("metrics", {})
+    goal_distribution_data = calculated_data.get("goal_distribution", [])
+    trending_data_payload = calculated_data.get("trending_data", {"items": []})
 
-else:
-    st.warning("Base data or dataset date not available.")
+except Exception as e:
+    st.error(f"Error calculating insights: {e}")
     calculated_metrics = {}
     goal_distribution_data = []
     trending_data_payload = {"type": "category", "mode": "value", "data": {}}
@@ -2751,9 +2770,6 @@ else:
          "top_funded_campaigns": {"data": [], "column_header": "Category"}
     }
 
-state_being_sent_this_run = st.session_state.insights_filters.copy()
-st.session_state.insights_state_sent_to_component = state_being_sent_this_run
-
 component_data_payload = {
     "filters": st.session_state.insights_filters,
     "filter_options": filter_options,
@@ -2762,43 +2778,12 @@ component_data_payload = {
     "trending_data": trending_data_payload,
     "top_locations": calculated_data.get("top_locations", []),
     "avg_funding_per_backer": calculated_data.get("avg_funding_per_backer", {"type": "category", "data": []}),
-    "top_funded_campaigns": calculated_data.get("top_funded_campaigns", {"data": [], "column_header": "Category"}) 
+    "top_funded_campaigns": calculated_data.get("top_funded_campaigns", {"data": [], "column_header": "Category"}),
+    "component_state": component_state_info(st.session_state, COMPONENT_KEY, {'filters': st.session_state.insights_filters})
 }
 
-component_return_value = insights_component(
+insights_component(
     component_data=component_data_payload,
-    key="insights_state",
+    key=COMPONENT_KEY,
     default=None
 )
-
-needs_rerun = False
-if component_return_value is not None:
-    if (isinstance(component_return_value, dict) and 'filters' in component_return_value):
-        try:
-            received_state_str = json.dumps(component_return_value['filters'], sort_keys=True)
-            sent_state_str = json.dumps(state_being_sent_this_run, sort_keys=True)
-
-            if received_state_str != sent_state_str:
-                new_filters_raw = component_return_value['filters']
-                validated_filters = DEFAULT_INSIGHTS_FILTERS.copy()
-                if isinstance(new_filters_raw.get('categories'), list):
-                    valid_cats = [cat for cat in new_filters_raw['categories'] if cat in filter_options['categories']]
-                    if not valid_cats: validated_filters['categories'] = ['All Categories']
-                    else:
-                         if 'All Categories' in valid_cats and len(valid_cats) > 1:
-                            validated_filters['categories'] = [cat for cat in valid_cats if cat != 'All Categories']
-                         elif not valid_cats: validated_filters['categories'] = ['All Categories']
-                         else: validated_filters['categories'] = valid_cats
-                if new_filters_raw.get('date') in filter_options['date_ranges']: validated_filters['date'] = new_filters_raw['date']
-
-                if json.dumps(validated_filters, sort_keys=True) != json.dumps(st.session_state.insights_filters, sort_keys=True):
-                    st.session_state.insights_filters = validated_filters
-                    needs_rerun = True
-
-        except Exception as e:
-            pass
-
-st.session_state.insights_component_value = component_return_value
-
-if needs_rerun:
-    st.rerun()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def _canonical_selection(values, all_value: str) -> list[str]:
+    selected = sorted({str(v) for v in (values or []) if v is not None and v != all_value})
+    return selected or [all_value]
+
+
+def canonicalize_filters(filters: dict) -> dict:
+    """
+    Normalizes an explorer filter dict so that equivalent states compare equal:
+    multi-selects are de-duplicated and sorted, an "All ..." entry is dropped
+    when specific values are selected, search is trimmed and lower-cased,
+    state names are lower-cased (both match case-insensitively) and range
+    bounds are floats.
+    """
+    ranges = {}
+    for name, bounds in sorted((filters.get('ranges') or {}).items()):
+        if isinstance(bounds, dict):
+            ranges[name] = {'min': float(bounds.get('min', 0)), 'max': float(bounds.get('max', 0))}
+    return {
+        'search': str(filters.get('search') or '').strip().lower(),
+        'categories': _canonical_selection(filters.get('categories'), 'All Categories'),
+        'subcategories': _canonical_selection(filters.get('subcategories'), 'All Subcategories'),
+        'countries': _canonical_selection(filters.get('countries'), 'All Countries'),
+        'states': _canonical_selection([s if s == 'All States' else str(s).lower() for s in (filters.get('states') or []) if s is not None], 'All States'),
+        'date': filters.get('date') or 'All Time',
+        'ranges': ranges,
+    }
+
+
+def canonical_query_key(filters: dict, sort_order: str, dataset_version: str) -> str:
+    """Returns a stable hash identifying the result of `filters` + `sort_order` on one dataset version."""
+    payload = json.dumps(
+        {'filters': canonicalize_filters(filters), 'sort_order': sort_order, 'dataset_version': dataset_version},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a total memory budget and a per-entry TTL.
+
+    Entries are evicted least-recently-used first once the summed `nbytes` of
+    all entries exceeds `max_bytes`, and are treated as missing once they are
+    older than `ttl_seconds` (dropped on the next lookup that does not allow
+    stale entries). Values are shared between sessions and must be treated as
+    read-only by callers.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (self.ttl_seconds is None or time.monotonic() - entry[2] <= self.ttl_seconds)
+
+    def get(self, key: str, allow_stale: bool = False):
+        """Returns the cached value or None; with `allow_stale`, also an entry older than the TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not allow_stale and self.ttl_seconds is not None and time.monotonic() - entry[2] > self.ttl_seconds:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, nbytes, time.monotonic())
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: str):
+        _, nbytes, _ = self._entries.pop(key)
+        self.total_bytes -= nbytes
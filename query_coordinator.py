@@ -0,0 +1,287 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, NamedTuple
+
+import polars as pl
+import streamlit as st
+
+# Backoff between polls of a running collect: short first, so quick queries return at once.
+FIRST_POLL_SECONDS = 0.0001
+MAX_POLL_SECONDS = 0.005
+# How often a running collect checks the yield point for newer state.
+YIELD_INTERVAL_SECONDS = 0.05
+# Scheduler priority classes, most urgent first.
+QUERY_PRIORITIES = ['page', 'facets', 'insights', 'prefetch', 'export']
+MAX_CONCURRENT_QUERIES = 2
+# Classes that run off the script thread, with no coordinator to pre-empt them; they never hold every slot.
+BACKGROUND_PRIORITIES = ['prefetch', 'export']
+# Recent queue time above which optional work of a class is shed while every slot is busy; None never sheds.
+SHED_QUEUE_SECONDS = {'page': None, 'facets': 0.5, 'insights': 1.0, 'prefetch': 0.1, 'export': None}
+# How long optional work waits for a slot before it is shed (see `QueryScheduler.slot`).
+SLOT_TIMEOUT_SECONDS = {'facets': 2.0, 'insights': 5.0}
+# Weight of the latest admission in the moving average of queue times.
+QUEUE_TIME_SMOOTHING = 0.2
+
+_active_coordinator = contextvars.ContextVar('active_query_coordinator', default=None)
+
+
+class QueryPlan(NamedTuple):
+    """A query not run yet: the LazyFrame to collect and the function turning the collected frame into its result."""
+    lf: pl.LazyFrame
+    finish: Callable[[pl.DataFrame], object]
+
+
+def collect(lf: pl.LazyFrame) -> pl.DataFrame:
+    """
+    Collects `lf`, supersedably when called inside `QueryCoordinator.running`
+    (see `QueryCoordinator.collect`), otherwise as a plain blocking collect.
+    """
+    coordinator = _active_coordinator.get()
+    if coordinator is None:
+        return lf.collect()
+    return coordinator.collect(lf)
+
+
+def collect_all(lfs: list[pl.LazyFrame]) -> list[pl.DataFrame]:
+    """
+    Collects `lfs` together instead of one after another. Outside a
+    coordinator they run as one `pl.collect_all`, which executes them in
+    parallel and runs the subplans they share (such as the same filtered
+    scan) once. Inside `QueryCoordinator.running` they run as concurrent
+    background queries, cancelled together when superseded.
+    """
+    coordinator = _active_coordinator.get()
+    if coordinator is None:
+        return pl.collect_all(lfs)
+    return coordinator.collect_all(lfs)
+
+
+def run_query(plan: QueryPlan):
+    """Collects the plan's frame and returns its result."""
+    return plan.finish(collect(plan.lf))
+
+
+def run_queries(plans: list[QueryPlan]) -> list:
+    """Collects the plans' frames together (see `collect_all`) and returns their results in order."""
+    frames = collect_all([plan.lf for plan in plans])
+    return [plan.finish(frame) for plan, frame in zip(plans, frames)]
+
+
+class QueryCoordinator:
+    """
+    Lets newer state supersede a session's in-flight query.
+
+    A session's script runs one query at a time, and state arriving while it
+    runs can only take effect once the query returns, so during a slider drag
+    every intermediate state's query would run to completion only to be
+    discarded. Inside `running(yield_point)` the queries' collects run in the
+    background while the calling thread polls `yield_point`, which raises
+    when newer state is waiting (for a Streamlit script: any `st` call, which
+    raises Streamlit's rerun exception once a rerun is requested). The
+    running collect is then cancelled, so the stale query stops using the
+    CPU, and the exception propagates so the latest state is run right away.
+
+    Attributes:
+        superseded: Number of queries cancelled because newer state arrived.
+    """
+
+    def __init__(self):
+        self.superseded = 0
+        self._yield_point = None
+
+    @contextmanager
+    def running(self, yield_point):
+        """Routes the `collect` calls made in the block through this coordinator, polling `yield_point`."""
+        previous_yield_point = self._yield_point
+        self._yield_point = yield_point
+        token = _active_coordinator.set(self)
+        try:
+            yield self
+        finally:
+            _active_coordinator.reset(token)
+            self._yield_point = previous_yield_point
+
+    def check(self):
+        """Calls the yield point, counting the query as superseded if it raises."""
+        if self._yield_point is None:
+            return
+        try:
+            self._yield_point()
+        except BaseException:
+            self.superseded += 1
+            raise
+
+    def collect(self, lf: pl.LazyFrame) -> pl.DataFrame:
+        """
+        Collects `lf` in the background, polling for the result with a growing
+        backoff and checking the yield point every `YIELD_INTERVAL_SECONDS`.
+        If the yield point raises, the collect is cancelled (Polars stops it
+        at its next operator boundary) before re-raising.
+        """
+        return self.collect_all([lf])[0]
+
+    def collect_all(self, lfs: list[pl.LazyFrame]) -> list[pl.DataFrame]:
+        """Like `collect`, for several frames started at once and cancelled together."""
+        queries = [lf.collect(background=True) for lf in lfs]
+        results = [None] * len(queries)
+        poll_seconds = FIRST_POLL_SECONDS
+        last_check = time.monotonic()
+        try:
+            while True:
+                for i, query in enumerate(queries):
+                    if results[i] is None:
+                        results[i] = query.fetch()
+                if all(result is not None for result in results):
+                    return results
+                time.sleep(poll_seconds)
+                poll_seconds = min(poll_seconds * 2, MAX_POLL_SECONDS)
+                if time.monotonic() - last_check >= YIELD_INTERVAL_SECONDS:
+                    last_check = time.monotonic()
+                    self.check()
+        except BaseException:
+            cancelled = [query for query, result in zip(queries, results) if result is None]
+            for query in cancelled:
+                query.cancel()
+            threading.Thread(target=_reap_cancelled, args=(cancelled,), name='query-reaper', daemon=True).start()
+            raise
+
+
+def _reap_cancelled(queries: list):
+    # A cancelled query still sends its outcome to its handle, and Polars panics if
+    # the handle was dropped by then, so each handle is held until the query stops.
+    for query in queries:
+        try:
+            query.fetch_blocking()
+        except Exception:
+            pass
+
+
+class QueryShed(Exception):
+    """Raised when the scheduler does not admit a query within its time limit."""
+
+
+class QueryScheduler:
+    """
+    Admission control for the heavy queries of every session in the process.
+
+    All sessions' collects share Polars' thread pool, so without admission a
+    wide insights query can stall everyone's table pages. At most
+    `max_concurrent` queries hold a slot at once; the others wait in a queue
+    ordered by priority class (`QUERY_PRIORITIES`), then by arrival. A
+    session waiting inside `QueryCoordinator.running` still checks its yield
+    point, so a superseded query leaves the queue without running.
+
+    Background classes (`BACKGROUND_PRIORITIES`) hold at most
+    `max_background` slots, so a foreground query never waits behind
+    prefetching it cannot pre-empt.
+
+    Under overload (see `overloaded`), callers degrade instead of queueing:
+    optional work is skipped and cached results are served even if stale.
+    Optional work that does queue is shed once it has waited longer than
+    its slot timeout.
+
+    Attributes:
+        max_concurrent: Cap on queries holding a slot at once.
+        max_background: Cap on background queries holding a slot at once,
+            one below `max_concurrent` unless there is a single slot.
+        recent_queue_seconds: Moving average of the time admitted queries waited.
+        admitted: Number of queries admitted, per priority class.
+        shed: Number of queries skipped or timed out under load, per priority class.
+    """
+
+    def __init__(self, max_concurrent: int, shed_queue_seconds: dict | None = None):
+        self.max_concurrent = max_concurrent
+        self.max_background = max(max_concurrent - 1, 1)
+        self.shed_queue_seconds = SHED_QUEUE_SECONDS if shed_queue_seconds is None else shed_queue_seconds
+        self.recent_queue_seconds = 0.0
+        self.admitted = dict.fromkeys(QUERY_PRIORITIES, 0)
+        self.shed = dict.fromkeys(QUERY_PRIORITIES, 0)
+        self._running = 0
+        self._running_background = 0
+        self._waiting = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, priority: str, timeout: float | None = None):
+        """
+        Holds one of the slots for the block, waiting for it behind queries
+        of the same or a more urgent class. Raises `QueryShed` if no slot
+        was free within `timeout` seconds.
+        """
+        ticket = (QUERY_PRIORITIES.index(priority), next(self._arrivals))
+        background = priority in BACKGROUND_PRIORITIES
+        queued_at = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+        try:
+            while True:
+                with self._condition:
+                    if (
+                        self._running < self.max_concurrent and self._waiting[0] == ticket
+                        and not (background and self._running_background >= self.max_background)
+                    ):
+                        heapq.heappop(self._waiting)
+                        self._running += 1
+                        self._running_background += background
+                        break
+                    if timeout is not None and time.monotonic() - queued_at >= timeout:
+                        self.shed[priority] += 1
+                        raise QueryShed(
+                            f"No query slot for '{priority}' within {timeout}s "
+                            f"(recent queue time {self.recent_queue_seconds:.2f}s)."
+                        )
+                    self._condition.wait(YIELD_INTERVAL_SECONDS)
+                coordinator = _active_coordinator.get()
+                if coordinator is not None:
+                    coordinator.check()
+        except BaseException:
+            with self._condition:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                self._condition.notify_all()
+            raise
+        self._record_wait(priority, time.monotonic() - queued_at)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._running_background -= background
+                self._condition.notify_all()
+
+    def overloaded(self, priority: str) -> bool:
+        """
+        Whether optional work of `priority` should be skipped: every slot is
+        busy and either a queue has formed or queries recently waited longer
+        than the class tolerates. Callers that skip work because of it
+        record so with `record_shed`.
+        """
+        threshold = self.shed_queue_seconds.get(priority)
+        if threshold is None:
+            return False
+        with self._condition:
+            return self._running >= self.max_concurrent and (
+                len(self._waiting) >= self.max_concurrent or self.recent_queue_seconds > threshold
+            )
+
+    def record_shed(self, priority: str):
+        """Counts a query of `priority` skipped because the scheduler was overloaded."""
+        with self._condition:
+            self.shed[priority] += 1
+
+    def _record_wait(self, priority: str, wait_seconds: float):
+        with self._condition:
+            self.admitted[priority] += 1
+            self.recent_queue_seconds += QUEUE_TIME_SMOOTHING * (wait_seconds - self.recent_queue_seconds)
+
+
+@st.cache_resource
+def get_query_scheduler() -> QueryScheduler:
+    """Query scheduler shared by every session and page in the process."""
+    return QueryScheduler(max_concurrent=MAX_CONCURRENT_QUERIES)
@@ -0,0 +1,273 @@
+import re
+
+import polars as pl
+
+from dataset_indexes import index_cache_path, read_index_frame, write_index_frame
+
+SEARCH_COLUMNS = ['Project Name', 'Creator', 'Category', 'Subcategory']
+FIELD_SEPARATOR = '\x1f'
+GRAM_SIZE = 3
+SEARCH_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = r'\w+'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def parse_search_terms(search: str) -> list[tuple[str, bool]]:
+    """
+    Splits a search box query into lower-cased (term, is_prefix) pairs that
+    must all match. Words are separate terms, "double quoted" text is one
+    literal term, and a trailing `*` makes a term match only at the start of
+    a word. Terms are literal: regex metacharacters have no special meaning.
+    """
+    terms = []
+    for phrase, word in SEARCH_TOKEN_PATTERN.findall((search or '').lower()):
+        term = phrase if phrase else word
+        is_prefix = term.endswith('*')
+        term = term.rstrip('*') if is_prefix else term
+        if term.strip():
+            terms.append((term, is_prefix))
+    return terms
+
+
+def term_expr(text: pl.Expr, term: str, is_prefix: bool) -> pl.Expr:
+    """Whether the lower-cased `text` contains `term` (at a word start when `is_prefix`)."""
+    if is_prefix:
+        return text.str.contains(r'(?:^|\W)' + re.escape(term))
+    return text.str.contains(term, literal=True)
+
+
+def search_predicate(column_names: list[str], search: str) -> pl.Expr | None:
+    """
+    Row-by-row equivalent of `TrigramIndex.select`: every term must occur in
+    at least one of the searchable columns. Used when no index is available.
+    """
+    valid_search_cols = [col for col in SEARCH_COLUMNS if col in column_names]
+    terms = parse_search_terms(search)
+    if not valid_search_cols or not terms:
+        return None
+    lowered = [pl.col(col).cast(pl.Utf8).str.to_lowercase() for col in valid_search_cols]
+    return pl.all_horizontal([
+        pl.any_horizontal([term_expr(text, term, is_prefix) for text in lowered])
+        for term, is_prefix in terms
+    ])
+
+
+def implies_search(search: str, base_search: str) -> bool:
+    """
+    Whether every row matching `search` also matches `base_search`: each
+    base term must be implied by some term of `search`, i.e. contained in it
+    (for a prefix term, be a prefix of a prefix term).
+    """
+    terms = parse_search_terms(search)
+    for base_term, base_is_prefix in parse_search_terms(base_search):
+        if not any(
+            (is_prefix and term.startswith(base_term)) if base_is_prefix else base_term in term
+            for term, is_prefix in terms
+        ):
+            return False
+    return True
+
+
+def query_tokens(search: str) -> list[tuple[str, bool]]:
+    """
+    The (word, is_prefix) pairs a query is ranked by: every word of every
+    term, with the last word of a prefix term (`term*`) expanded to all
+    indexed words starting with it.
+    """
+    tokens = []
+    for term, is_prefix in parse_search_terms(search):
+        words = re.findall(WORD_PATTERN, term)
+        tokens.extend((word, is_prefix and i == len(words) - 1) for i, word in enumerate(words))
+    return tokens
+
+
+def term_grams(term: str) -> set[str]:
+    return {term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from every lower-cased trigram of the searchable columns to
+    the sorted row positions containing it.
+
+    A query intersects the posting lists of its terms' trigrams to get
+    candidate rows, then verifies only the candidates against the literal
+    terms, so the cost follows the size of the rarest trigram rather than
+    the number of rows. Terms shorter than a trigram are verified against
+    the other terms' candidates, or against every row if there are none.
+
+    Attributes:
+        columns: The searchable columns that were indexed.
+        text: Per-row lower-cased searchable text, fields joined by `FIELD_SEPARATOR`.
+        postings: Sorted row positions per trigram.
+    """
+
+    def __init__(self, columns: list[str], text: pl.Series, postings: dict[str, pl.Series]):
+        self.columns = columns
+        self.text = text
+        self.postings = postings
+
+    @staticmethod
+    def searchable_text(frame: pl.DataFrame, columns: list[str]) -> pl.Series:
+        return frame.select(
+            pl.concat_str(
+                [pl.col(col).cast(pl.Utf8).fill_null('').str.to_lowercase() for col in columns],
+                separator=FIELD_SEPARATOR
+            ).alias('text')
+        ).to_series()
+
+    @staticmethod
+    def build_postings(text: pl.Series) -> pl.DataFrame:
+        """
+        One row per trigram with the sorted, distinct row positions containing
+        it. Every row's trigram offsets are exploded in a single pass, so the
+        work follows the total text length rather than the longest text.
+        """
+        text_lf = pl.DataFrame({'row': pl.int_range(0, text.len(), dtype=pl.UInt32, eager=True), 'text': text}).lazy()
+        gram_count = (pl.col('text').str.len_chars().cast(pl.Int64) - (GRAM_SIZE - 1)).clip(lower_bound=0)
+        return (
+            text_lf
+            .select('row', 'text', pl.int_ranges(0, gram_count, dtype=pl.UInt32).alias('offset'))
+            .explode('offset')
+            .select('row', pl.col('text').str.slice(pl.col('offset'), GRAM_SIZE).alias('gram'))
+            .filter(~pl.col('gram').str.contains(FIELD_SEPARATOR, literal=True))
+            .group_by(pl.col('gram').cast(pl.Categorical))
+            # Rows are exploded in ascending order and groups keep it, so the positions come out sorted.
+            .agg(pl.col('row').unique(maintain_order=True).alias('rows'))
+            .with_columns(pl.col('gram').cast(pl.Utf8))
+            .collect()
+        )
+
+    def candidates(self, terms: list[tuple[str, bool]]) -> pl.Series | None:
+        """Rows holding every trigram of every term, or None if no term is long enough to narrow the search."""
+        grams = set().union(*(term_grams(term) for term, _ in terms))
+        if not grams:
+            return None
+        if any(gram not in self.postings for gram in grams):
+            return pl.Series('rows', [], dtype=pl.UInt32)
+        posting_lists = sorted((self.postings[gram] for gram in grams), key=len)
+        rows = posting_lists[0]
+        for posting_list in posting_lists[1:]:
+            if rows.is_empty():
+                break
+            rows = rows.filter(rows.is_in(posting_list.implode()))
+        return rows
+
+    def select(self, search: str) -> pl.Series | None:
+        """Bitmap of the rows matching every term of `search`, or None for an empty query."""
+        terms = parse_search_terms(search)
+        if not terms:
+            return None
+        rows = self.candidates(terms)
+        if rows is None:
+            rows = pl.int_range(0, self.text.len(), dtype=pl.UInt32, eager=True)
+        if not rows.is_empty():
+            verified = pl.DataFrame({'row': rows, 'text': self.text.gather(rows)}).filter(
+                *[term_expr(pl.col('text'), term, is_prefix) for term, is_prefix in terms]
+            )
+            rows = verified.get_column('row')
+        bitmap = pl.repeat(False, self.text.len(), eager=True)
+        bitmap.scatter(rows, True)
+        return bitmap
+
+
+class BM25Index:
+    """
+    Word-level inverted index over the searchable columns for ranking matches
+    with Okapi BM25.
+
+    Postings are stored as one (token, row, tf) table sorted by token, so the
+    posting list of a word, or of every word sharing a prefix, is a
+    contiguous slice found by binary search. Scoring is a vectorized
+    aggregation over the selected slices.
+
+    Attributes:
+        postings: Token, row position and term frequency, sorted by token.
+        doc_lengths: Number of indexed words per row.
+        average_length: Mean of `doc_lengths`.
+    """
+
+    def __init__(self, postings: pl.DataFrame, doc_lengths: pl.Series):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.average_length = (doc_lengths.mean() or 0.0) or 1.0
+        self._tokens = postings.get_column('token')
+
+    @staticmethod
+    def build_postings(text: pl.Series) -> pl.DataFrame:
+        return (
+            pl.DataFrame({'row': pl.int_range(0, text.len(), dtype=pl.UInt32, eager=True), 'token': text.str.extract_all(WORD_PATTERN)})
+            .explode('token')
+            .drop_nulls('token')
+            .group_by('token', 'row')
+            .agg(pl.len().cast(pl.UInt32).alias('tf'))
+            .sort('token', 'row')
+        )
+
+    def posting_slice(self, token: str, is_prefix: bool) -> pl.DataFrame:
+        start = self._tokens.search_sorted(token, side='left')
+        end = self._tokens.search_sorted(token + '\U0010ffff' if is_prefix else token, side='right')
+        return self.postings.slice(start, end - start)
+
+    def scores(self, search: str) -> pl.Series | None:
+        """BM25 score of every row for `search` (0 for rows sharing no word with it), or None for an empty query."""
+        tokens = query_tokens(search)
+        if not tokens:
+            return None
+        doc_count = self.doc_lengths.len()
+        slices = [
+            self.posting_slice(token, is_prefix).select('row', 'tf', pl.lit(i, dtype=pl.UInt32).alias('term'))
+            for i, (token, is_prefix) in enumerate(dict.fromkeys(tokens))
+        ]
+        matches = pl.concat(slices).group_by('term', 'row').agg(pl.col('tf').sum())
+        matches = matches.with_columns(self.doc_lengths.gather(matches.get_column('row')).alias('doc_length'))
+        tf = pl.col('tf').cast(pl.Float64)
+        doc_length = pl.col('doc_length').cast(pl.Float64)
+        row_scores = (
+            matches
+            .with_columns(pl.len().over('term').alias('df'))
+            .select(
+                'row',
+                (
+                    (((doc_count - pl.col('df') + 0.5) / (pl.col('df') + 0.5)) + 1).log()
+                    * tf * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_length / self.average_length))
+                ).alias('score')
+            )
+            .group_by('row')
+            .agg(pl.col('score').sum())
+        )
+        scores = pl.repeat(0.0, doc_count, eager=True)
+        scores.scatter(row_scores.get_column('row'), row_scores.get_column('score'))
+        return scores
+
+
+def load_search_indexes(frame: pl.DataFrame, columns: list[str], dataset_version: str) -> tuple[TrigramIndex | None, BM25Index | None]:
+    """
+    Returns the trigram index (for matching) and the BM25 index (for ranking)
+    over the `columns` present in `frame`, reusing posting lists persisted for
+    this dataset version when available.
+    """
+    columns = [col for col in columns if col in frame.columns]
+    if not columns:
+        return None, None
+    text = TrigramIndex.searchable_text(frame, columns)
+    index_suffix = "_".join(col.replace(' ', '') for col in columns)
+
+    path = index_cache_path(dataset_version, f"trigrams_{index_suffix}")
+    postings_df = read_index_frame(path)
+    if postings_df is None:
+        postings_df = TrigramIndex.build_postings(text)
+        write_index_frame(postings_df, path)
+    trigram_index = TrigramIndex(columns, text, dict(zip(postings_df.get_column('gram').to_list(), postings_df.get_column('rows'))))
+
+    path = index_cache_path(dataset_version, f"bm25_{index_suffix}")
+    postings_df = read_index_frame(path)
+    if postings_df is None:
+        postings_df = BM25Index.build_postings(text)
+        write_index_frame(postings_df, path)
+    doc_lengths = postings_df.group_by('row').agg(pl.col('tf').sum())
+    lengths = pl.repeat(0, frame.height, dtype=pl.UInt32, eager=True)
+    lengths.scatter(doc_lengths.get_column('row'), doc_lengths.get_column('tf'))
+    return trigram_index, BM25Index(postings_df, lengths)
@@ -0,0 +1,58 @@
+import datetime
+import os
+import random
+import sys
+
+import polars as pl
+import pytest
+
+# The app's modules live at the repository root rather than in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SNAPSHOT_NAME = 'Kickstarter_2025-04-10T03_20_09_833Z.parquet'
+SNAPSHOT_DATE = datetime.date(2025, 4, 10)
+CATEGORIES = ['Art', 'Comics', 'Film & Video', 'Games', 'Music', 'Technology']
+COUNTRIES = ['Canada', 'Germany', 'Japan', 'United Kingdom', 'United States']
+STATES = ['Successful', 'Failed', 'Canceled', 'Live', 'Suspended']
+WORDS = ['alpha', 'Beta', 'gamma robot', 'Delta (board) game', 'c++ kit']
+
+
+def make_campaigns(rows: int, seed: int = 0) -> pl.DataFrame:
+    """A synthetic snapshot with the source columns the pages read, including nulls and tied sort keys."""
+    rng = random.Random(seed)
+    launched = [
+        datetime.datetime(2012, 1, 1) + datetime.timedelta(seconds=rng.randrange(int(13.2 * 365 * 86400)))
+        for _ in range(rows)
+    ]
+    pledged = [round(rng.expovariate(1 / 5000), 2) for _ in range(rows)]
+    goals = [round(rng.expovariate(1 / 8000), 2) + 1 for _ in range(rows)]
+    categories = [rng.choice(CATEGORIES) for _ in range(rows)]
+    return pl.DataFrame({
+        'Project Name': [f"Project {rng.choice(WORDS)} number {i}" for i in range(rows)],
+        'Creator': [f"Creator{i % 97}" for i in range(rows)],
+        'Pledged Amount': [f"${int(p):,}" for p in pledged],
+        'Link': [f"https://www.kickstarter.com/projects/creator{i % 97}/project-{i}" for i in range(rows)],
+        'Country': [rng.choice(COUNTRIES) for _ in range(rows)],
+        'State': [rng.choice(STATES) for _ in range(rows)],
+        'Category': categories,
+        'Subcategory': [f"{category} Sub{rng.randrange(3)}" for category in categories],
+        'Raw Pledged': pledged,
+        'Raw Goal': goals,
+        'Raw Raised': [round(p / g * 100, 2) for p, g in zip(pledged, goals)],
+        'Raw Date': launched,
+        'Raw Deadline': [d + datetime.timedelta(days=rng.randrange(10, 60)) for d in launched],
+        'Backer Count': [None if i % 101 == 0 else rng.randrange(2000) for i in range(rows)],
+        'Popularity Score': [float(rng.randrange(20)) for _ in range(rows)],
+    })
+
+
+@pytest.fixture(scope='session')
+def campaigns() -> pl.DataFrame:
+    return make_campaigns(3000)
+
+
+@pytest.fixture(scope='session')
+def snapshot_dir(tmp_path_factory, campaigns) -> str:
+    data_dir = tmp_path_factory.mktemp('snapshot')
+    campaigns.write_parquet(data_dir / SNAPSHOT_NAME)
+    return str(data_dir)
@@ -0,0 +1,62 @@
+import polars as pl
+import pytest
+
+from dataset_indexes import BitmapIndex, RangeIndex, SortPermutation, build_sort_order
+
+FRAME = pl.DataFrame({
+    'score': [5.0, None, 3.0, 5.0, 1.0, 4.0],
+    'country': ['US', 'UK', None, 'us', 'UK', 'DE'],
+})
+
+
+def positions(mask: pl.Series | None) -> list[int]:
+    return list(range(FRAME.height)) if mask is None else mask.arg_true().to_list()
+
+
+def test_sort_order_puts_nulls_last_and_breaks_ties_by_position():
+    assert build_sort_order(FRAME, 'score', True).to_list() == [0, 3, 5, 2, 4, 1]
+    assert build_sort_order(FRAME, 'score', False).to_list() == [4, 2, 5, 0, 3, 1]
+
+
+def test_permutation_select_walks_the_mask_in_sort_order():
+    permutation = SortPermutation(build_sort_order(FRAME, 'score', True))
+    mask = pl.Series([True, True, False, False, True, True])
+    assert permutation.select(None).to_list() == [0, 3, 5, 2, 4, 1]
+    assert permutation.select(mask).to_list() == [0, 5, 4, 1]
+
+
+def test_permutation_select_after_continues_from_the_cursor_row():
+    permutation = SortPermutation(build_sort_order(FRAME, 'score', True))
+    assert permutation.select_after(None, 3, 2).to_list() == [5, 2]
+    mask = pl.Series([True, True, False, False, True, True])
+    assert permutation.select_after(mask, 3, 10).to_list() == [5, 4, 1]
+    assert permutation.select_after(None, 1, 10).to_list() == []
+
+
+@pytest.mark.parametrize('row_position', [-1, -6, 6, 1000])
+def test_permutation_select_after_rejects_rows_outside_the_frame(row_position):
+    permutation = SortPermutation(build_sort_order(FRAME, 'score', True))
+    assert permutation.select_after(None, row_position, 2) is None
+
+
+def test_bitmap_index_matches_an_is_in_filter():
+    index = BitmapIndex.build(FRAME, 'country')
+    assert positions(index.select(['UK', 'DE'])) == [1, 4, 5]
+    assert positions(index.select(['us'], case_insensitive=True)) == [0, 3]
+    assert positions(index.select(['FR'])) == []
+
+
+@pytest.mark.parametrize('lower, upper, expected', [
+    (3.0, 5.0, [0, 2, 3, 5]),
+    (4.5, 100.0, [0, 3]),
+    (2.0, 2.5, []),
+    (0.0, 100.0, [0, 2, 3, 4, 5]),
+])
+def test_range_index_matches_a_between_filter(lower, upper, expected):
+    index = RangeIndex.build(FRAME, 'score')
+    assert positions(index.select(lower, upper)) == expected
+
+
+def test_range_index_covering_every_row_is_no_filter():
+    frame = pl.DataFrame({'score': [1.0, 2.0, 3.0]})
+    assert RangeIndex.build(frame, 'score').select(0.0, 10.0) is None
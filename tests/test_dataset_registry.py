@@ -0,0 +1,103 @@
+import shutil
+
+import polars as pl
+import pytest
+
+from dataset_registry import LAUNCH_YEAR_COLUMN, ROW_ID_COLUMN, DatasetError, load_dataset
+from explorer_query import (
+    CATEGORICAL_FILTERS, facet_counts, get_sort_spec, page_cursor, partition_predicate, query_explorer_results, query_page_after,
+    query_permuted_results, query_relevance_results
+)
+from query_cache import canonicalize_filters
+from search_index import SEARCH_COLUMNS
+
+from conftest import SNAPSHOT_NAME
+
+
+@pytest.fixture(scope='module')
+def partitioned_dir(tmp_path_factory, campaigns) -> str:
+    data_dir = tmp_path_factory.mktemp('partitioned')
+    frame = campaigns.with_columns(pl.col('Raw Date').dt.year().alias(LAUNCH_YEAR_COLUMN))
+    frame.write_parquet(data_dir / SNAPSHOT_NAME, partition_by=['Category', LAUNCH_YEAR_COLUMN])
+    return str(data_dir)
+
+
+def test_partitioned_snapshot_loads_as_one_dataset(partitioned_dir, campaigns):
+    dataset = load_dataset(partitioned_dir)
+    assert dataset.is_partitioned
+    assert len(dataset.source_files) == dataset.partitions.height > 1
+    frame = dataset.materialize()
+    assert frame.height == campaigns.height
+    assert frame[ROW_ID_COLUMN].to_list() == list(range(campaigns.height))
+
+
+@pytest.mark.parametrize('row_ids', [[0], [2999, 5, 1500, 6], list(range(0, 3000, 7)), []])
+def test_take_reads_the_same_rows_as_a_full_scan(partitioned_dir, row_ids):
+    scanned = load_dataset(partitioned_dir)
+    row_ids = pl.Series(row_ids, dtype=pl.UInt32)
+    expected = scanned.lazy().collect()[row_ids]
+    assert scanned.take(row_ids).equals(expected)
+    assert scanned.take(row_ids, columns=['Project Name'])['Project Name'].to_list() == expected['Project Name'].to_list()
+    assert not scanned.is_materialized
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'categories': ['Film & Video', 'Games']},
+    {'categories': ['Art'], 'date': 'Last 5 Years', 'countries': ['Japan']},
+])
+def test_partitioned_results_match_the_single_file(snapshot_dir, partitioned_dir, filters):
+    filters = canonicalize_filters(filters)
+    single, partitioned = load_dataset(snapshot_dir), load_dataset(partitioned_dir)
+    expected = query_explorer_results(single.lazy(), filters, 'newest', single.creation_date)
+    actual = query_explorer_results(partitioned.lazy(partition_predicate(filters, partitioned.creation_date)), filters, 'newest', partitioned.creation_date)
+    assert actual['total_rows'] == expected['total_rows']
+    assert partitioned.take(actual['row_ids'])['Link'].to_list() == single.take(expected['row_ids'])['Link'].to_list()
+    assert facet_counts(partitioned, filters) == facet_counts(single, filters)
+
+
+def test_scans_never_open_the_partitions_the_filters_exclude(snapshot_dir, partitioned_dir, tmp_path):
+    source = tmp_path / SNAPSHOT_NAME
+    shutil.copytree(f"{partitioned_dir}/{SNAPSHOT_NAME}", source)
+    partitioned, single = load_dataset(str(tmp_path)), load_dataset(snapshot_dir)
+    for path in partitioned.source_files:
+        if 'Category=Games' not in path:
+            with open(path, 'wb') as f:
+                f.write(b'not parquet')
+
+    filters = canonicalize_filters({'categories': ['Games'], 'date': 'Last 5 Years'})
+    lf = partitioned.lazy(partition_predicate(filters, partitioned.creation_date))
+    expected = query_explorer_results(single.lazy(), filters, 'mostfunded', single.creation_date)
+    actual = query_explorer_results(lf, filters, 'mostfunded', partitioned.creation_date, limit=20)
+    assert actual['total_rows'] == expected['total_rows']
+    page = partitioned.take(actual['row_ids'])
+    assert page['Link'].to_list() == single.take(expected['row_ids'].head(20))['Link'].to_list()
+    next_page = query_page_after(lf, filters, 'mostfunded', partitioned.creation_date, page_cursor(page, 'mostfunded'), 20)
+    assert partitioned.take(next_page)['Link'].to_list() == single.take(expected['row_ids'].slice(20, 20))['Link'].to_list()
+    with pytest.raises(pl.exceptions.ComputeError):
+        partitioned.lazy().collect()
+
+
+def test_indexes_are_built_in_the_background_over_the_same_row_ids(partitioned_dir):
+    dataset = load_dataset(partitioned_dir)
+    filters = canonicalize_filters({'categories': ['Games', 'Art'], 'search': 'robot'})
+    sort_spec = get_sort_spec('newest')
+    scanned = query_explorer_results(dataset.lazy(partition_predicate(filters, dataset.creation_date)), filters, 'newest', dataset.creation_date)
+    assert query_relevance_results(dataset, filters) is None
+
+    preparing = dataset.prepare_in_background(lambda prepared: prepared.prepare_indexes(
+        sort_specs=[sort_spec], bitmap_columns=list(CATEGORICAL_FILTERS), search_columns=SEARCH_COLUMNS
+    ))
+    assert dataset.prepare_in_background(lambda prepared: None) is preparing
+    preparing.join(60)
+    assert not dataset.is_preparing and dataset.is_materialized
+    permuted = query_permuted_results(dataset, dataset.sort_permutations[sort_spec], filters)
+    assert permuted['row_ids'].to_list() == scanned['row_ids'].to_list()
+    ranked = query_relevance_results(dataset, filters)
+    assert sorted(ranked['row_ids'].to_list()) == sorted(scanned['row_ids'].to_list())
+
+
+def test_unexpected_partition_layout_is_rejected(tmp_path, campaigns):
+    campaigns.write_parquet(tmp_path / SNAPSHOT_NAME, partition_by=['Country'])
+    with pytest.raises(DatasetError):
+        load_dataset(str(tmp_path))
@@ -0,0 +1,52 @@
+import polars as pl
+
+from dataset_storage import LINK_PREFIX, LINK_SLUG_COLUMN, compact_frame, restore_links
+from explorer_query import summary_expressions
+
+
+def test_integer_columns_are_downcast_losslessly():
+    frame = pl.DataFrame({'Backer Count': [0, 12, 30_000] * 100})
+    compacted, report = compact_frame(frame, ['Backer Count'])
+    assert compacted['Backer Count'].dtype == pl.Int16
+    assert compacted['Backer Count'].to_list() == frame['Backer Count'].to_list()
+    assert [entry['column'] for entry in report] == ['Backer Count']
+
+
+def test_summary_sums_of_downcast_integers_do_not_overflow():
+    frame = pl.DataFrame({'Raw Pledged': [2_000_000_000, 2_000_000_000, 0], 'Backer Count': [2_000_000_000, 2_000_000_000, 0]})
+    compacted, _ = compact_frame(frame, frame.columns)
+    assert compacted['Raw Pledged'].dtype == pl.Int32
+    summary = compacted.select(summary_expressions(compacted.columns)).row(0, named=True)
+    assert summary == {'total_pledged': 4e9, 'total_backers': 4_000_000_000}
+
+
+def test_encoding_that_does_not_shrink_the_column_is_skipped():
+    frame = pl.DataFrame({'Country': ['US', 'UK', 'DE']})
+    compacted, report = compact_frame(frame, ['Country'])
+    assert compacted['Country'].dtype == pl.Utf8
+    assert report == []
+
+
+def test_low_cardinality_strings_become_categorical():
+    frame = pl.DataFrame({'Country': ['United States', 'United Kingdom', 'Germany'] * 1000})
+    compacted, report = compact_frame(frame, ['Country'])
+    assert compacted['Country'].dtype == pl.Categorical
+    assert compacted['Country'].cast(pl.Utf8).to_list() == frame['Country'].to_list()
+    assert report[0]['bytes_after'] < report[0]['bytes_before']
+
+
+def test_other_string_columns_stay_utf8():
+    frame = pl.DataFrame({
+        'Creator': [f"Creator{i % 1500}" for i in range(3000)],
+        'Pledged Amount': [f"${i % 10:,}" for i in range(3000)],
+    })
+    compacted, report = compact_frame(frame, frame.columns)
+    assert compacted.schema == frame.schema
+    assert report == []
+
+
+def test_links_are_stored_as_slugs_and_restored():
+    links = [LINK_PREFIX + f'creator/project-{i}' for i in range(50)] + ['https://example.com/other']
+    compacted, _ = compact_frame(pl.DataFrame({'Link': links}), ['Link'])
+    assert compacted.columns == [LINK_SLUG_COLUMN]
+    assert restore_links(compacted)['Link'].to_list() == links
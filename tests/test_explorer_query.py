@@ -0,0 +1,143 @@
+import math
+
+import polars as pl
+import pytest
+
+from dataset_registry import load_dataset
+from explorer_query import (
+    CATEGORICAL_FILTERS, DATE_FILTER_COLUMN, RANGE_FILTERS, SORT_ORDERS, apply_filters, filter_mask, get_sort_spec,
+    keyset_predicate, page_cursor, query_explorer_results, query_page_after, query_permuted_page_after,
+    query_permuted_results, query_refined_results, refinement_filters
+)
+from query_cache import canonicalize_filters
+from search_index import SEARCH_COLUMNS
+
+FILTER_STATES = [
+    {},
+    {'categories': ['Games', 'Art']},
+    {'countries': ['Japan'], 'states': ['successful', 'failed']},
+    {'search': 'robot', 'date': 'Last 5 Years'},
+    {'search': 'rob*', 'ranges': {'pledged': {'min': 100, 'max': 5000}}},
+    {'subcategories': ['Music Sub1'], 'ranges': {'goal': {'min': 0, 'max': 10000}, 'raised': {'min': 10, 'max': 200}}},
+    {'search': '"gamma robot"', 'categories': ['Comics'], 'date': 'Last Year'},
+    {'ranges': {'raised': {'min': 3000, 'max': 100}}},
+]
+
+# Each state narrows the one before it.
+NARROWING_STATES = [
+    {},
+    {'categories': ['Art', 'Games', 'Music']},
+    {'categories': ['Art', 'Games', 'Music'], 'search': 'ro'},
+    {'categories': ['Art', 'Games'], 'search': 'robot'},
+    {'categories': ['Art', 'Games'], 'search': 'robot', 'countries': ['Japan', 'Canada'], 'date': 'Last 10 Years'},
+    {'categories': ['Art', 'Games'], 'search': 'robot', 'countries': ['Japan'], 'date': 'Last 5 Years', 'ranges': {'pledged': {'min': 50, 'max': 20000}}},
+]
+
+
+@pytest.fixture(scope='module')
+def dataset(snapshot_dir):
+    dataset = load_dataset(snapshot_dir)
+    dataset.prepare_indexes(
+        sort_specs=[get_sort_spec(order) for order in SORT_ORDERS],
+        bitmap_columns=list(CATEGORICAL_FILTERS),
+        range_columns=[*RANGE_FILTERS, DATE_FILTER_COLUMN],
+        search_columns=SEARCH_COLUMNS
+    )
+    return dataset
+
+
+def assert_same_results(actual: dict, expected: dict):
+    assert actual['row_ids'].to_list() == expected['row_ids'].to_list()
+    assert actual['total_rows'] == expected['total_rows']
+    for name, value in expected['summary'].items():
+        if value is None:
+            assert actual['summary'][name] is None
+        else:
+            assert math.isclose(actual['summary'][name], value, rel_tol=1e-9)
+
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+@pytest.mark.parametrize('sort_order', SORT_ORDERS)
+def test_permuted_results_match_the_full_plan(dataset, filters, sort_order):
+    filters = canonicalize_filters(filters)
+    expected = query_explorer_results(dataset.lazy(), filters, sort_order, dataset.creation_date)
+    permutation = dataset.sort_permutations[get_sort_spec(sort_order)]
+    assert_same_results(query_permuted_results(dataset, permutation, filters), expected)
+
+
+@pytest.mark.parametrize('filters', FILTER_STATES)
+def test_filter_mask_matches_the_filter_predicates_and_is_cached(dataset, filters):
+    filters = canonicalize_filters(filters)
+    expected = set(apply_filters(dataset.lazy(), filters, dataset.creation_date).collect()['_row_id'].to_list())
+    filter_mask(dataset, filters)
+    hits, misses = dataset.mask_cache.hits, dataset.mask_cache.misses
+    mask = filter_mask(dataset, filters)
+    matched = set(range(dataset.materialize().height)) if mask is None else set(mask.arg_true().to_list())
+    assert matched == expected
+    assert dataset.mask_cache.misses == misses
+    if filters != canonicalize_filters({}):
+        assert dataset.mask_cache.hits > hits
+
+
+@pytest.mark.parametrize('sort_order', SORT_ORDERS)
+def test_refined_results_match_the_full_plan(dataset, sort_order):
+    permutation = dataset.sort_permutations[get_sort_spec(sort_order)]
+    base_filters = canonicalize_filters(NARROWING_STATES[0])
+    base = query_permuted_results(dataset, permutation, base_filters)
+    for state in NARROWING_STATES[1:]:
+        filters = canonicalize_filters(state)
+        added = refinement_filters(base_filters, filters, dataset.creation_date)
+        assert added is not None
+        refined = query_refined_results(dataset, base, added)
+        assert refined['is_complete']
+        assert_same_results(refined, query_explorer_results(dataset.lazy(), filters, sort_order, dataset.creation_date))
+        base, base_filters = refined, filters
+
+
+@pytest.mark.parametrize('base, filters', [
+    ({'categories': ['Art']}, {'categories': ['Art', 'Games']}),
+    ({'categories': ['Art']}, {}),
+    ({'search': 'robot'}, {'search': 'rob'}),
+    ({'date': 'Last Year'}, {'date': 'Last 5 Years'}),
+    ({'ranges': {'pledged': {'min': 100, 'max': 5000}}}, {'ranges': {'pledged': {'min': 50, 'max': 5000}}}),
+    ({'ranges': {'pledged': {'min': 100, 'max': 5000}}}, {}),
+])
+def test_widened_filters_are_not_refinements(dataset, base, filters):
+    assert refinement_filters(canonicalize_filters(base), canonicalize_filters(filters), dataset.creation_date) is None
+
+
+def test_refinement_filters_hold_only_the_added_filters(dataset):
+    base = canonicalize_filters({'categories': ['Art', 'Games'], 'search': 'rob'})
+    filters = canonicalize_filters({'categories': ['Art', 'Games'], 'search': 'robot', 'countries': ['Japan']})
+    added = refinement_filters(base, filters, dataset.creation_date)
+    assert added['search'] == 'robot'
+    assert added['countries'] == ['Japan']
+    assert added['categories'] == ['All Categories']
+
+
+def offset_pages(results: dict, page_size: int) -> list[list[int]]:
+    row_ids = results['row_ids'].to_list()
+    return [row_ids[start:start + page_size] for start in range(0, len(row_ids), page_size)]
+
+
+@pytest.mark.parametrize('filters', [{}, {'categories': ['Games'], 'countries': ['Japan', 'Germany']}, {'search': 'alpha'}])
+@pytest.mark.parametrize('sort_order', SORT_ORDERS)
+def test_keyset_pages_match_offset_pages(snapshot_dir, dataset, filters, sort_order):
+    page_size = 37
+    filters = canonicalize_filters(filters)
+    expected = offset_pages(query_explorer_results(dataset.lazy(), filters, sort_order, dataset.creation_date), page_size)
+    scanned = load_dataset(snapshot_dir)
+    permutation = dataset.sort_permutations[get_sort_spec(sort_order)]
+    for page_number, page in enumerate(expected[:-1]):
+        cursor = page_cursor(scanned.take(pl.Series(page)), sort_order)
+        next_page = expected[page_number + 1]
+        assert query_page_after(scanned.lazy(), filters, sort_order, scanned.creation_date, cursor, page_size).to_list() == next_page
+        assert query_permuted_page_after(dataset, permutation, filters, cursor, page_size).to_list() == next_page
+
+
+def test_keyset_predicate_orders_nulls_last_and_ties_by_row_id():
+    frame = pl.DataFrame({'_row_id': [0, 1, 2, 3, 4], 'score': [2.0, None, 2.0, 5.0, None]})
+    after = lambda cursor, descending: frame.filter(keyset_predicate('score', descending, cursor))['_row_id'].to_list()
+    assert after({'key': 2.0, 'id': 0}, True) == [1, 2, 4]
+    assert after({'key': 2.0, 'id': 0}, False) == [1, 2, 3, 4]
+    assert after({'key': None, 'id': 1}, True) == [4]
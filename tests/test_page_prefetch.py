@@ -0,0 +1,64 @@
+import threading
+
+from page_prefetch import PagePrefetcher
+
+
+def wait_for_pending(prefetcher: PagePrefetcher):
+    with prefetcher._lock:
+        futures = list(prefetcher._pending.values())
+    for future in futures:
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+
+
+def test_prefetched_pages_are_cached_per_query():
+    prefetcher = PagePrefetcher(max_workers=2, max_pending=8, max_bytes=1000)
+    prefetcher.prefetch('session', 'query', [2, 3], lambda page: (f"page {page}", 10))
+    wait_for_pending(prefetcher)
+    assert prefetcher.get('query', 2) == 'page 2'
+    assert prefetcher.get('query', 3) == 'page 3'
+    assert prefetcher.get('other', 2) is None
+    prefetcher.prefetch('session', 'query', [2, 3], lambda page: (f"again {page}", 10))
+    assert prefetcher.scheduled == 2
+
+
+def test_new_query_discards_pages_of_the_previous_one():
+    prefetcher = PagePrefetcher(max_workers=1, max_pending=8, max_bytes=1000)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_page(page):
+        started.set()
+        release.wait(5)
+        return f"old {page}", 10
+
+    prefetcher.prefetch('session', 'old', [2, 3], slow_page)
+    started.wait(5)
+    prefetcher.prefetch('session', 'new', [2], lambda page: (f"new {page}", 10))
+    release.set()
+    wait_for_pending(prefetcher)
+    assert prefetcher.get('old', 2) is None
+    assert prefetcher.get('old', 3) is None
+    assert prefetcher.get('new', 2) == 'new 2'
+
+
+def test_requests_over_the_pending_cap_are_dropped():
+    prefetcher = PagePrefetcher(max_workers=1, max_pending=2, max_bytes=1000)
+    release = threading.Event()
+    prefetcher.prefetch('session', 'query', [2, 3, 4, 5], lambda page: (release.wait(5), 10))
+    assert prefetcher.scheduled == 2
+    assert prefetcher.dropped == 2
+    release.set()
+    wait_for_pending(prefetcher)
+
+
+def test_failed_pages_are_not_cached():
+    prefetcher = PagePrefetcher(max_workers=1, max_pending=8, max_bytes=1000)
+
+    def failing_page(page):
+        raise ValueError("no page")
+
+    prefetcher.prefetch('session', 'query', [2], failing_page)
+    wait_for_pending(prefetcher)
+    assert prefetcher.get('query', 2) is None
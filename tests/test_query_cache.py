@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from query_cache import ResultCache, canonical_query_key, canonicalize_filters
+
+FILTERS = {
+    'search': 'Robot ',
+    'categories': ['Games', 'Art'],
+    'countries': ['All Countries'],
+    'states': ['Successful', 'failed'],
+    'date': 'Last Year',
+    'ranges': {'pledged': {'min': 100, 'max': 5000}, 'goal': {'min': 0.5, 'max': 10}},
+}
+
+
+@pytest.mark.parametrize('equivalent', [
+    {**FILTERS, 'categories': ['Art', 'Games']},
+    {**FILTERS, 'categories': ['Art', 'Games', 'Art']},
+    {**FILTERS, 'categories': ['All Categories', 'Art', 'Games']},
+    {**FILTERS, 'search': '  robot'},
+    {**FILTERS, 'states': ['FAILED', 'successful']},
+    {**FILTERS, 'countries': []},
+    {**FILTERS, 'ranges': {'goal': {'min': 0.5, 'max': 10.0}, 'pledged': {'min': 100.0, 'max': 5000.0}}},
+    {key: FILTERS[key] for key in reversed(list(FILTERS))},
+])
+def test_equivalent_filter_states_share_a_key(equivalent):
+    assert canonical_query_key(equivalent, 'popularity', 'v1') == canonical_query_key(FILTERS, 'popularity', 'v1')
+
+
+@pytest.mark.parametrize('different', [
+    {**FILTERS, 'categories': ['Art']},
+    {**FILTERS, 'search': 'robots'},
+    {**FILTERS, 'date': 'All Time'},
+    {**FILTERS, 'ranges': {'pledged': {'min': 100, 'max': 5001}}},
+])
+def test_different_filter_states_get_different_keys(different):
+    assert canonical_query_key(different, 'popularity', 'v1') != canonical_query_key(FILTERS, 'popularity', 'v1')
+
+
+def test_sort_order_and_dataset_version_are_part_of_the_key():
+    key = canonical_query_key(FILTERS, 'popularity', 'v1')
+    assert canonical_query_key(FILTERS, 'newest', 'v1') != key
+    assert canonical_query_key(FILTERS, 'popularity', 'v2') != key
+
+
+def test_canonical_filters_fill_defaults():
+    assert canonicalize_filters({}) == {
+        'search': '',
+        'categories': ['All Categories'],
+        'subcategories': ['All Subcategories'],
+        'countries': ['All Countries'],
+        'states': ['All States'],
+        'date': 'All Time',
+        'ranges': {},
+    }
+
+
+def test_result_cache_evicts_least_recently_used_over_budget():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    assert cache.get('a') == 1
+    cache.put('c', 3, 40)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.total_bytes == 80
+
+
+def test_result_cache_skips_values_over_budget():
+    cache = ResultCache(max_bytes=100)
+    cache.put('a', 1, 101)
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_result_cache_expires_entries_but_can_serve_them_stale():
+    cache = ResultCache(max_bytes=100, ttl_seconds=0.01)
+    cache.put('a', 1, 10)
+    time.sleep(0.02)
+    assert 'a' not in cache
+    assert cache.get('a', allow_stale=True) == 1
+    assert cache.get('a') is None
+    assert cache.get('a', allow_stale=True) is None
+    assert cache.total_bytes == 0
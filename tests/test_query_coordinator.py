@@ -0,0 +1,222 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import polars as pl
+import pytest
+
+from query_coordinator import QueryCoordinator, QueryPlan, QueryScheduler, QueryShed, collect, collect_all, run_queries
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A query running for a few hundred milliseconds, so it is still running when superseded.
+SLOW_QUERY = """
+lf = pl.LazyFrame({'a': range(3_000_000)}).with_columns((pl.col('a') * 7 % 1000).alias('b'))
+lf = lf.group_by('b').agg(pl.col('a').sort().cum_sum().last())
+lf = pl.concat([lf.with_columns(pl.lit(i).alias('i')) for i in range(30)])
+"""
+
+
+class Superseded(Exception):
+    pass
+
+
+def run_superseded(collect_call: str) -> subprocess.CompletedProcess:
+    """Runs `collect_call` under a coordinator whose yield point raises after 50ms, in a child process."""
+    script = textwrap.dedent("""
+        import time
+        import polars as pl
+        from query_coordinator import QueryCoordinator
+
+        class Superseded(Exception):
+            pass
+
+        started = time.monotonic()
+
+        def yield_point():
+            if time.monotonic() - started > 0.05:
+                raise Superseded()
+        {slow_query}
+        coordinator = QueryCoordinator()
+        for _ in range(3):
+            started = time.monotonic()
+            try:
+                with coordinator.running(yield_point):
+                    {collect_call}
+            except Superseded:
+                pass
+        time.sleep(1)
+        print('superseded', coordinator.superseded)
+    """).format(slow_query=SLOW_QUERY, collect_call=collect_call)
+    return subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, capture_output=True, text=True, timeout=120)
+
+
+def test_collect_outside_coordinator_is_plain_collect():
+    lf = pl.LazyFrame({'a': [3, 1, 2]}).sort('a')
+    assert collect(lf).equals(lf.collect())
+
+
+def test_collect_inside_coordinator_returns_result():
+    lf = pl.LazyFrame({'a': [3, 1, 2]}).sort('a')
+    coordinator = QueryCoordinator()
+    with coordinator.running(lambda: None):
+        assert collect(lf).equals(lf.collect())
+    assert coordinator.superseded == 0
+
+
+def test_superseded_collect_raises_and_is_counted():
+    def yield_point():
+        raise Superseded()
+
+    lf = pl.LazyFrame({'a': range(3_000_000)}).select(pl.col('a').sort().cum_sum())
+    coordinator = QueryCoordinator()
+    with pytest.raises(Superseded):
+        with coordinator.running(yield_point):
+            while True:
+                collect(lf)
+    assert coordinator.superseded == 1
+
+
+def test_superseded_collect_keeps_process_alive():
+    result = run_superseded("coordinator.collect(lf)")
+    assert result.returncode == 0, result.stderr
+    assert 'panicked' not in result.stderr
+    assert 'superseded 3' in result.stdout
+
+
+def test_superseded_batch_keeps_process_alive():
+    result = run_superseded("coordinator.collect_all([lf, lf.select(pl.len()), lf.head(5)])")
+    assert result.returncode == 0, result.stderr
+    assert 'panicked' not in result.stderr
+    assert 'superseded 3' in result.stdout
+
+
+@pytest.mark.parametrize('coordinated', [False, True])
+def test_collect_all_matches_separate_collects(coordinated):
+    base = pl.LazyFrame({'a': [3, 1, 2, 5], 'b': ['x', 'y', 'x', 'y']})
+    lfs = [base.sort('a'), base.group_by('b').agg(pl.col('a').sum()).sort('b'), base.select(pl.len())]
+    if coordinated:
+        with QueryCoordinator().running(lambda: None):
+            frames = collect_all(lfs)
+    else:
+        frames = collect_all(lfs)
+    assert [frame.to_dicts() for frame in frames] == [lf.collect().to_dicts() for lf in lfs]
+
+
+def test_run_queries_finishes_each_plan_in_order():
+    base = pl.LazyFrame({'a': [3, 1, 2]})
+    plans = [
+        QueryPlan(base.select(pl.col('a').sum()), lambda frame: frame.item()),
+        QueryPlan(base.sort('a'), lambda frame: frame['a'].to_list()),
+    ]
+    assert run_queries(plans) == [6, [1, 2, 3]]
+
+
+def hold_slot(scheduler: QueryScheduler, priority: str, release: threading.Event, order: list | None = None) -> threading.Thread:
+    def run():
+        with scheduler.slot(priority):
+            if order is not None:
+                order.append(priority)
+            release.wait(5)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, seconds: float = 5):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def test_scheduler_admits_by_priority_then_arrival():
+    scheduler = QueryScheduler(max_concurrent=1)
+    release_first = threading.Event()
+    first = hold_slot(scheduler, 'page', release_first)
+    wait_until(lambda: scheduler._running == 1)
+    order = []
+    released_at_once = threading.Event()
+    released_at_once.set()
+    waiting = []
+    for priority in ['prefetch', 'insights', 'facets', 'page']:
+        waiting.append(hold_slot(scheduler, priority, released_at_once, order))
+        wait_until(lambda: len(scheduler._waiting) == len(waiting))
+    release_first.set()
+    for thread in [first, *waiting]:
+        thread.join()
+    assert order == ['page', 'facets', 'insights', 'prefetch']
+    assert scheduler.admitted['page'] == 2
+
+
+def test_scheduler_caps_concurrent_queries():
+    scheduler = QueryScheduler(max_concurrent=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run():
+        with scheduler.slot('page'):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert scheduler._running == 0 and scheduler._waiting == []
+
+
+def test_background_queries_leave_a_slot_for_foreground_ones():
+    scheduler = QueryScheduler(max_concurrent=2)
+    release = threading.Event()
+    prefetches = [hold_slot(scheduler, 'prefetch', release) for _ in range(2)]
+    wait_until(lambda: scheduler._running == 1 and len(scheduler._waiting) == 1)
+    with scheduler.slot('page', timeout=0.5):
+        assert scheduler._running == 2
+    release.set()
+    for thread in prefetches:
+        thread.join()
+    assert scheduler.admitted['prefetch'] == 2
+    assert scheduler._running == 0 and scheduler._running_background == 0
+
+
+def test_slot_timeout_sheds_and_leaves_the_queue():
+    scheduler = QueryScheduler(max_concurrent=1)
+    release = threading.Event()
+    holder = hold_slot(scheduler, 'page', release)
+    wait_until(lambda: scheduler._running == 1)
+    with pytest.raises(QueryShed):
+        with scheduler.slot('insights', timeout=0.05):
+            pass
+    release.set()
+    holder.join()
+    assert scheduler.shed['insights'] == 1
+    assert scheduler._waiting == []
+    with scheduler.slot('insights', timeout=0.05):
+        pass
+
+
+def test_overloaded_is_a_pure_check():
+    scheduler = QueryScheduler(max_concurrent=1, shed_queue_seconds={'prefetch': 0.0})
+    assert not scheduler.overloaded('prefetch')
+    release = threading.Event()
+    holder = hold_slot(scheduler, 'page', release)
+    wait_until(lambda: scheduler._running == 1)
+    scheduler.recent_queue_seconds = 1.0
+    assert scheduler.overloaded('prefetch')
+    assert not scheduler.overloaded('page')
+    assert scheduler.shed['prefetch'] == 0
+    scheduler.record_shed('prefetch')
+    assert scheduler.shed['prefetch'] == 1
+    release.set()
+    holder.join()
+    assert not scheduler.overloaded('prefetch')
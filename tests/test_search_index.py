@@ -0,0 +1,37 @@
+import warnings
+
+import polars as pl
+import pytest
+
+from search_index import FIELD_SEPARATOR, TrigramIndex, search_predicate
+
+FRAME = pl.DataFrame({
+    'Project Name': ['Robot Kit', 'robotic arm', None, 'ab', 'A very long project name about board games and robots'],
+    'Creator': ['Ann', 'Bob', 'Rob', 'Cy', 'Dee'],
+})
+COLUMNS = ['Project Name', 'Creator']
+
+
+def trigram_index(frame: pl.DataFrame) -> TrigramIndex:
+    text = TrigramIndex.searchable_text(frame, COLUMNS)
+    postings = TrigramIndex.build_postings(text)
+    return TrigramIndex(COLUMNS, text, dict(zip(postings.get_column('gram').to_list(), postings.get_column('rows'))))
+
+
+def test_postings_hold_every_trigram_within_a_field():
+    text = TrigramIndex.searchable_text(FRAME, COLUMNS)
+    expected = {}
+    for row, value in enumerate(text.to_list()):
+        for field in value.split(FIELD_SEPARATOR):
+            for offset in range(len(field) - 2):
+                expected.setdefault(field[offset:offset + 3], set()).add(row)
+    postings = TrigramIndex.build_postings(text)
+    assert {gram: rows for gram, rows in postings.iter_rows()} == {gram: sorted(rows) for gram, rows in expected.items()}
+
+
+@pytest.mark.parametrize('search', ['robot', 'rob*', '"robot kit"', 'ann', 'ab', 'board robots', 'zzz'])
+def test_index_matches_the_search_predicate(search):
+    expected = FRAME.select(search_predicate(COLUMNS, search).fill_null(False)).to_series()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        assert trigram_index(FRAME).select(search).to_list() == expected.to_list()